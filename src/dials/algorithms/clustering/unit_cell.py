@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import collections
+import concurrent.futures
+import contextlib
 import logging
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Optional
 
 import numpy as np
-import scipy.spatial.distance as ssd
 from scipy.cluster import hierarchy
 
 from cctbx import crystal, uctbx
@@ -181,12 +182,96 @@ def __str__(self):
         return "\n".join(text)
 
 
+_worker_g6_cells = None
+
+
+def _init_ncdist_worker(g6_cells):
+    global _worker_g6_cells
+    _worker_g6_cells = g6_cells
+
+
+def _ncdist_worker(args):
+    i, others = args
+    return _ncdist_from(_worker_g6_cells, i, others)
+
+
+def _ncdist_from(g6_cells, i, others):
+    """The NCDist distances from cell i to each of the cells in others"""
+    g6_i = g6_cells[i]
+    return np.array([NCDist(g6_i, g6_cells[j]) for j in others], dtype=np.float64)
+
+
+def _single_linkage(g6_cells: np.ndarray, nproc: int = 1) -> np.ndarray:
+    """
+    Single-linkage clustering of G6 cells with the NCDist metric.
+
+    This gives the same linkage matrix as scipy.cluster.hierarchy.linkage with
+    method="single", but finds the minimum spanning tree with Prim's algorithm
+    one row of distances at a time, rather than from the full condensed
+    distance matrix, so that the memory used is linear in the number of cells.
+    The distances for each row may be calculated with nproc processes.
+    """
+    n = len(g6_cells)
+    linkage_matrix = np.zeros((n - 1, 4))
+    merged = np.zeros(n, dtype=bool)
+    min_dist = np.full(n, np.inf)
+
+    with contextlib.ExitStack() as stack:
+        pool = None
+        if nproc > 1:
+            pool = stack.enter_context(
+                concurrent.futures.ProcessPoolExecutor(
+                    max_workers=nproc,
+                    initializer=_init_ncdist_worker,
+                    initargs=(g6_cells,),
+                )
+            )
+        x = 0
+        for k in range(n - 1):
+            merged[x] = True
+            others = np.flatnonzero(~merged)
+            if pool is not None and len(others) >= 2 * nproc:
+                chunks = np.array_split(others, nproc)
+                dist = np.concatenate(
+                    list(pool.map(_ncdist_worker, [(x, c) for c in chunks]))
+                )
+            else:
+                dist = _ncdist_from(g6_cells, x, others)
+            min_dist[others] = np.minimum(min_dist[others], dist)
+            y = others[np.argmin(min_dist[others])]
+            linkage_matrix[k, :3] = (x, y, min_dist[y])
+            x = y
+
+    # Sort the merges by distance and label the clusters as scipy does
+    linkage_matrix = linkage_matrix[np.argsort(linkage_matrix[:, 2], kind="mergesort")]
+    parent = np.arange(2 * n - 1)
+    size = np.ones(2 * n - 1, dtype=int)
+
+    def find(i):
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    for k, (x, y) in enumerate(linkage_matrix[:, :2].astype(int)):
+        x_root, y_root = find(x), find(y)
+        linkage_matrix[k, 0] = min(x_root, y_root)
+        linkage_matrix[k, 1] = max(x_root, y_root)
+        size[n + k] = size[x_root] + size[y_root]
+        linkage_matrix[k, 3] = size[n + k]
+        parent[x_root] = parent[y_root] = n + k
+    return linkage_matrix
+
+
 def cluster_unit_cells(
     crystal_symmetries: list[crystal.symmetry],
     lattice_ids: Optional[list[int]] = None,
     threshold: int = 10000,
     ax: Optional["matplotlib.axes.Axes"] = None,
     no_plot: bool = True,
+    nproc: int = 1,
 ) -> Optional[ClusteringResult]:
     if not lattice_ids:
         lattice_ids = list(range(len(crystal_symmetries)))
@@ -205,13 +290,9 @@ def cluster_unit_cells(
         "Using Andrews-Bernstein distance from Andrews & Bernstein "
         "J Appl Cryst 47:346 (2014)"
     )
-    metric = NCDist
-    pair_distances = ssd.pdist(g6_cells, metric=metric)
-    if len(pair_distances) > 0:
+    if len(g6_cells) > 1:
+        linkage_matrix = _single_linkage(g6_cells, nproc=nproc)
         logger.info("Distances have been calculated")
-        linkage_matrix = hierarchy.linkage(
-            pair_distances, method="single", metric=metric
-        )
         cluster_ids = hierarchy.fcluster(
             linkage_matrix, threshold, criterion="distance"
         )
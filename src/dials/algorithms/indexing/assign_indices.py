@@ -1,11 +1,42 @@
 from __future__ import annotations
 
+import numpy as np
+
 from cctbx.array_family import flex
+from dxtbx import flumpy
 
 import dials_algorithms_indexing_ext as ext
 from dials.algorithms.indexing import DialsIndexError
 
 
+def count_indexed_for_candidates(
+    reciprocal_lattice_points, A_matrices, tolerance=0.3, max_elements=10_000_000
+):
+    """Count the reflections indexed by each of a set of candidate A matrices.
+
+    The fractional miller indices h = A^-1 . rlp are computed for all
+    candidates at once, in chunks of candidates bounded by max_elements, and a
+    reflection is counted as indexed if h is within tolerance of a (non-zero)
+    integer miller index. Unlike AssignIndicesGlobal, no attempt is made to
+    resolve reflections that are assigned the same miller index, so this is a
+    cheap upper bound on the number of reflections that would be indexed.
+
+    Returns:
+        A numpy array of the number of indexed reflections for each candidate
+    """
+    rlps = flumpy.to_numpy(reciprocal_lattice_points).reshape(-1, 3)
+    A_inv = np.linalg.inv(np.array([tuple(A) for A in A_matrices]).reshape(-1, 3, 3))
+    n_indexed = np.zeros(len(A_inv), dtype=np.int64)
+    chunk = max(1, max_elements // max(1, 3 * len(rlps)))
+    for i in range(0, len(A_inv), chunk):
+        hkl = np.einsum("mij,nj->mni", A_inv[i : i + chunk], rlps)
+        nearest = np.rint(hkl)
+        indexed = np.sum((hkl - nearest) ** 2, axis=-1) <= tolerance**2
+        indexed &= np.any(nearest != 0, axis=-1)
+        n_indexed[i : i + chunk] = np.count_nonzero(indexed, axis=1)
+    return n_indexed
+
+
 class AssignIndicesStrategy:
     def __init__(self, d_min=None):
         self._d_min = d_min
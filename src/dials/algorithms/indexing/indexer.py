@@ -266,6 +266,37 @@
       .type = float
       .help = Minimum acceptable RMSD for choosing candidate basis solutions \
               (in pixels)
+    candidate_evaluation
+      .expert_level = 2
+    {
+      method = *serial threads processes
+        .type = choice
+        .help = How to refine the candidate basis solutions. With threads or \
+                processes, up to indexing.nproc candidates are refined at once. \
+                With processes, the module-level outlier identification is \
+                used, so overrides of StillsIndexer.identify_outliers in \
+                subclasses are not applied.
+      min_fraction_indexed = None
+        .type = float(value_min=0, value_max=1)
+        .help = Candidates that index less than this fraction of the unindexed \
+                reflections before refinement are not refined.
+      max_initial_rmsd_px = None
+        .type = float(value_min=0)
+        .help = Candidates with an RMSD (in pixels) above this value before \
+                refinement are not refined.
+      stop
+        .help = Stop evaluating further candidates once a candidate meets \
+                these criteria.
+      {
+        rmsd_px = None
+          .type = float(value_min=0)
+          .help = Stop once a candidate has an RMSD (in pixels) below this value.
+        min_indexed = None
+          .type = int(value_min=0)
+          .help = Additionally require at least this many indexed reflections \
+                  before stopping.
+      }
+    }
     ewald_proximal_volume_max = 0.0025
       .type = float
       .help = Maximum acceptable ewald proximal volume when choosing candidate \
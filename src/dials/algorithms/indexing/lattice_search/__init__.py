@@ -5,6 +5,7 @@
 import math
 from io import StringIO
 
+import numpy as np
 import pkg_resources
 
 import libtbx.phil
@@ -13,6 +14,7 @@
 from scitbx.array_family import flex
 
 from dials.algorithms.indexing import indexer
+from dials.algorithms.indexing.assign_indices import count_indexed_for_candidates
 from dials.algorithms.indexing.basis_vector_search import combinations, optimise
 
 from .low_res_spot_match import LowResSpotMatch
@@ -38,6 +40,12 @@
         .help = "Maximum number of putative crystal models to test. Default"
                 "for rotation sequences: 50, for still images: 5"
         .expert_level = 1
+    candidate_batch_size = 100
+        .type = int(value_min=1)
+        .help = "Number of candidate orientation matrices to pre-screen at a"
+                "time. Within each batch, candidates are tested in order of"
+                "decreasing number of indexed reflections."
+        .expert_level = 2
     sys_absent_threshold = 0.9
         .type = float(value_min=0.0, value_max=1.0)
     solution_scorer = filter *weighted
@@ -160,6 +168,88 @@ def find_lattices(self):
                 )
         return experiments
 
+    def _prescreen_candidates(self, candidate_orientation_matrices, reflections):
+        """Rank a batch of candidate orientation matrices by n_indexed.
+
+        The number of reflections indexed by each candidate is estimated in a
+        single vectorised pass, candidates that index no reflections are
+        discarded and the remainder are returned in order of decreasing
+        n_indexed, so that the more expensive per-candidate processing is
+        spent on the most promising candidates first.
+        """
+        if self.params.index_assignment.method == "local":
+            return candidate_orientation_matrices
+        n_indexed = count_indexed_for_candidates(
+            reflections["rlp"],
+            [cm.get_A() for cm in candidate_orientation_matrices],
+            tolerance=self.params.index_assignment.simple.hkl_tolerance,
+        )
+        order = np.argsort(-n_indexed, kind="stable")
+        return [candidate_orientation_matrices[i] for i in order if n_indexed[i]]
+
+    def _prepare_candidate(self, cm, reflections):
+        experiments = ExperimentList()
+        for expt in self.experiments:
+            experiments.append(
+                Experiment(
+                    imageset=expt.imageset,
+                    beam=expt.beam,
+                    detector=expt.detector,
+                    goniometer=expt.goniometer,
+                    scan=expt.scan,
+                    crystal=cm,
+                )
+            )
+        refl = reflections.copy()
+        self.index_reflections(experiments, refl)
+        if refl.get_flags(refl.flags.indexed).count(True) == 0:
+            return None
+
+        from rstbx.dps_core.cell_assessment import SmallUnitCellVolume
+
+        from dials.algorithms.indexing import non_primitive_basis
+
+        threshold = self.params.basis_vector_combinations.sys_absent_threshold
+        if threshold and (
+            self._symmetry_handler.target_symmetry_primitive is None
+            or self._symmetry_handler.target_symmetry_primitive.unit_cell() is None
+        ):
+            try:
+                non_primitive_basis.correct(
+                    experiments, refl, self._assign_indices, threshold
+                )
+                if refl.get_flags(refl.flags.indexed).count(True) == 0:
+                    return None
+            except SmallUnitCellVolume:
+                logger.debug(
+                    "correct_non_primitive_basis SmallUnitCellVolume error for unit cell %s:",
+                    experiments[0].crystal.get_unit_cell(),
+                )
+                return None
+            except RuntimeError as e:
+                if "Krivy-Gruber iteration limit exceeded" in str(e):
+                    logger.debug(
+                        "correct_non_primitive_basis Krivy-Gruber iteration limit exceeded error for unit cell %s:",
+                        experiments[0].crystal.get_unit_cell(),
+                    )
+                    return None
+                raise
+            if (
+                experiments[0].crystal.get_unit_cell().volume()
+                < self.params.min_cell_volume
+            ):
+                return None
+
+        if self.params.known_symmetry.space_group is not None:
+            new_crystal, _ = self._symmetry_handler.apply_symmetry(
+                experiments[0].crystal
+            )
+            if new_crystal is None:
+                return None
+            experiments[0].crystal.update(new_crystal)
+
+        return experiments, refl
+
     def choose_best_orientation_matrix(self, candidate_orientation_matrices):
         from dials.algorithms.indexing import model_evaluation
 
@@ -181,87 +271,39 @@ def choose_best_orientation_matrix(self, candidate_orientation_matrices):
                 n_indexed_cutoff=filter_params.n_indexed_cutoff,
             )
 
-        args = []
-
-        for cm in candidate_orientation_matrices:
-            sel = self.reflections["id"] == -1
-            if self.d_min is not None:
-                sel &= 1 / self.reflections["rlp"].norms() > self.d_min
-            xo, yo, zo = self.reflections["xyzobs.mm.value"].parts()
-            imageset_id = self.reflections["imageset_id"]
-            experiments = ExperimentList()
-            for i_expt, expt in enumerate(self.experiments):
-                # XXX Not sure if we still need this loop over self.experiments
-                if expt.scan is not None and expt.scan.has_property("oscillation"):
-                    start, end = expt.scan.get_oscillation_range()
-                    if (end - start) > 360:
-                        # only use reflections from the first 360 degrees of the scan
-                        sel.set_selected(
-                            (imageset_id == i_expt)
-                            & (zo > ((start * math.pi / 180) + 2 * math.pi)),
-                            False,
-                        )
-                experiments.append(
-                    Experiment(
-                        imageset=expt.imageset,
-                        beam=expt.beam,
-                        detector=expt.detector,
-                        goniometer=expt.goniometer,
-                        scan=expt.scan,
-                        crystal=cm,
-                    )
-                )
-            refl = self.reflections.select(sel)
-            self.index_reflections(experiments, refl)
-            if refl.get_flags(refl.flags.indexed).count(True) == 0:
-                continue
-
-            from rstbx.dps_core.cell_assessment import SmallUnitCellVolume
-
-            from dials.algorithms.indexing import non_primitive_basis
-
-            threshold = self.params.basis_vector_combinations.sys_absent_threshold
-            if threshold and (
-                self._symmetry_handler.target_symmetry_primitive is None
-                or self._symmetry_handler.target_symmetry_primitive.unit_cell() is None
-            ):
-                try:
-                    non_primitive_basis.correct(
-                        experiments, refl, self._assign_indices, threshold
-                    )
-                    if refl.get_flags(refl.flags.indexed).count(True) == 0:
-                        continue
-                except SmallUnitCellVolume:
-                    logger.debug(
-                        "correct_non_primitive_basis SmallUnitCellVolume error for unit cell %s:",
-                        experiments[0].crystal.get_unit_cell(),
+        sel = self.reflections["id"] == -1
+        if self.d_min is not None:
+            sel &= 1 / self.reflections["rlp"].norms() > self.d_min
+        zo = self.reflections["xyzobs.mm.value"].parts()[2]
+        imageset_id = self.reflections["imageset_id"]
+        for i_expt, expt in enumerate(self.experiments):
+            # XXX Not sure if we still need this loop over self.experiments
+            if expt.scan is not None and expt.scan.has_property("oscillation"):
+                start, end = expt.scan.get_oscillation_range()
+                if (end - start) > 360:
+                    # only use reflections from the first 360 degrees of the scan
+                    sel.set_selected(
+                        (imageset_id == i_expt)
+                        & (zo > ((start * math.pi / 180) + 2 * math.pi)),
+                        False,
                     )
-                    continue
-                except RuntimeError as e:
-                    if "Krivy-Gruber iteration limit exceeded" in str(e):
-                        logger.debug(
-                            "correct_non_primitive_basis Krivy-Gruber iteration limit exceeded error for unit cell %s:",
-                            experiments[0].crystal.get_unit_cell(),
-                        )
-                        continue
-                    raise
-                if (
-                    experiments[0].crystal.get_unit_cell().volume()
-                    < self.params.min_cell_volume
-                ):
-                    continue
-
-            if self.params.known_symmetry.space_group is not None:
-                new_crystal, _ = self._symmetry_handler.apply_symmetry(
-                    experiments[0].crystal
-                )
-                if new_crystal is None:
-                    continue
-                experiments[0].crystal.update(new_crystal)
+        reflections = self.reflections.select(sel)
 
-            args.append((experiments, refl))
-            if len(args) == self.params.basis_vector_combinations.max_refine:
+        max_refine = self.params.basis_vector_combinations.max_refine
+        batch_size = self.params.basis_vector_combinations.candidate_batch_size
+        candidates = iter(candidate_orientation_matrices)
+        args = []
+        while len(args) < max_refine:
+            batch = list(itertools.islice(candidates, batch_size))
+            if not batch:
                 break
+            for cm in self._prescreen_candidates(batch, reflections):
+                candidate = self._prepare_candidate(cm, reflections)
+                if candidate is None:
+                    continue
+                args.append(candidate)
+                if len(args) == max_refine:
+                    break
 
         from libtbx import easy_mp
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import concurrent.futures
 import copy
 import logging
 import math
@@ -95,6 +96,201 @@ def e_refine(params, experiments, reflections, graph_verbose=False):
     return refiner
 
 
+def identify_outliers(params, experiments, indexed):
+    if not params.indexing.stills.candidate_outlier_rejection:
+        return flex.bool(len(indexed), True)
+
+    logger.info("$$$ stills_indexer::identify_outliers")
+    refiner = e_refine(params, experiments, indexed, graph_verbose=False)
+
+    RR = refiner.predict_for_reflection_table(indexed)
+
+    px_sz = experiments[0].detector[0].get_pixel_size()
+
+    class Match:
+        pass
+
+    matches = []
+    for item in RR.rows():
+        m = Match()
+        m.x_obs = item["xyzobs.px.value"][0] * px_sz[0]
+        m.y_obs = item["xyzobs.px.value"][1] * px_sz[1]
+        m.x_calc = item["xyzcal.px"][0] * px_sz[0]
+        m.y_calc = item["xyzcal.px"][1] * px_sz[1]
+        m.miller_index = item["miller_index"]
+        matches.append(m)
+
+    import iotbx.phil
+    from rstbx.phil.phil_preferences import indexing_api_defs
+
+    hardcoded_phil = iotbx.phil.parse(input_string=indexing_api_defs).extract()
+
+    from rstbx.indexing_api.outlier_procedure import OutlierPlotPDF
+
+    # comment this in if PDF graph is desired:
+    # hardcoded_phil.indexing.outlier_detection.pdf = "outlier.pdf"
+    # new code for outlier rejection inline here
+    if hardcoded_phil.indexing.outlier_detection.pdf is not None:
+        hardcoded_phil.__inject__(
+            "writer", OutlierPlotPDF(hardcoded_phil.indexing.outlier_detection.pdf)
+        )
+
+    # execute Sauter and Poon (2010) algorithm
+    from rstbx.indexing_api import outlier_detection
+
+    od = outlier_detection.find_outliers_from_matches(
+        matches,
+        verbose=params.refinement.reflections.outlier.sauter_poon.verbose,
+        horizon_phil=hardcoded_phil,
+    )
+
+    if hardcoded_phil.indexing.outlier_detection.pdf is not None:
+        od.make_graphs(canvas=hardcoded_phil.writer.R.c, left_margin=0.5)
+        hardcoded_phil.writer.R.c.showPage()
+        hardcoded_phil.writer.R.c.save()
+
+    return od.get_cache_status()
+
+
+class CandidateInfo(libtbx.group_args):
+    pass
+
+
+def _meets_stopping_criteria(candidate, stop):
+    """Whether a candidate is good enough to stop evaluating further candidates."""
+    if stop.rmsd_px is None or candidate.rmsd is None:
+        return False
+    if candidate.rmsd > stop.rmsd_px:
+        return False
+    if stop.min_indexed is not None and candidate.n_indexed < stop.min_indexed:
+        return False
+    return True
+
+
+def refine_candidate(
+    params,
+    symmetry_handler,
+    icm,
+    experiments,
+    indexed,
+    identify_outliers=identify_outliers,
+):
+    """Refine a candidate crystal model with stills outlier rejection.
+
+    This is a free function, so that candidates can be evaluated in a separate
+    process. If a symmetry handler is given and the candidates are refined in
+    P1, candidates that diverge from the target symmetry are rejected. The
+    outlier identification can be replaced by passing identify_outliers, e.g.
+    the bound StillsIndexer.identify_outliers method so that overrides of it are
+    used.
+
+    Returns:
+        A CandidateInfo for the refined candidate, or None if it was rejected
+    """
+    try:
+        logger.info(
+            "$$$ stills_indexer::choose_best_orientation_matrix, candidate %d initial outlier identification",
+            icm,
+        )
+        acceptance_flags = identify_outliers(params, experiments, indexed)
+        # create a new "indexed" list with outliers thrown out:
+        indexed = indexed.select(acceptance_flags)
+
+        logger.info(
+            "$$$ stills_indexer::choose_best_orientation_matrix, candidate %d refinement before outlier rejection",
+            icm,
+        )
+        R = e_refine(
+            params=params,
+            experiments=experiments,
+            reflections=indexed,
+            graph_verbose=False,
+        )
+        ref_experiments = R.get_experiments()
+
+        # try to improve the outcome with a second round of outlier rejection post-initial refinement:
+        acceptance_flags = identify_outliers(params, ref_experiments, indexed)
+
+        # insert a round of Nave-outlier rejection on top of the r.m.s.d. rejection
+        nv0 = NaveParameters(
+            params=params,
+            experiments=ref_experiments,
+            reflections=indexed,
+            refinery=R,
+            graph_verbose=False,
+        )
+        nv0()
+        acceptance_flags_nv0 = nv0.nv_acceptance_flags
+        indexed = indexed.select(acceptance_flags & acceptance_flags_nv0)
+
+        logger.info(
+            "$$$ stills_indexer::choose_best_orientation_matrix, candidate %d after positional and delta-psi outlier rejection",
+            icm,
+        )
+        R = e_refine(
+            params=params,
+            experiments=ref_experiments,
+            reflections=indexed,
+            graph_verbose=False,
+        )
+        ref_experiments = R.get_experiments()
+
+        nv = NaveParameters(
+            params=params,
+            experiments=ref_experiments,
+            reflections=indexed,
+            refinery=R,
+            graph_verbose=False,
+        )
+        crystal_model = nv()
+        assert (
+            len(crystal_model) == 1
+        ), "$$$ stills_indexer::choose_best_orientation_matrix, Only one crystal at this stage"
+        crystal_model = crystal_model[0]
+
+        # Drop candidates that after refinement can no longer be converted to the known target space group
+        if (
+            not params.indexing.stills.refine_candidates_with_known_symmetry
+            and symmetry_handler is not None
+        ):
+            (
+                new_crystal,
+                cb_op_to_primitive,
+            ) = symmetry_handler.apply_symmetry(crystal_model)
+            if new_crystal is None:
+                logger.info(
+                    "P1 refinement yielded model diverged from target, candidate %d",
+                    icm,
+                )
+                return None
+
+        rmsd, _ = calc_2D_rmsd_and_displacements(
+            R.predict_for_reflection_table(indexed)
+        )
+    except Exception as e:
+        logger.info(
+            "Couldn't refine candidate %d, %s: %s",
+            icm,
+            e.__class__.__name__,
+            str(e),
+        )
+        return None
+    logger.info(
+        "$$$ stills_indexer::choose_best_orientation_matrix, candidate %d done",
+        icm,
+    )
+    return CandidateInfo(
+        icm=icm,
+        crystal=crystal_model,
+        green_curve_area=nv.green_curve_area,
+        ewald_proximal_volume=nv.ewald_proximal_volume(),
+        n_indexed=len(indexed),
+        rmsd=rmsd,
+        indexed=indexed,
+        experiments=ref_experiments,
+    )
+
+
 class StillsIndexer(Indexer):
     """Class for indexing stills"""
 
@@ -496,168 +692,28 @@ def choose_best_orientation_matrix(self, candidate_orientation_matrices):
         logger.info("Selecting the best orientation matrix")
         logger.info("*" * 80)
 
-        class CandidateInfo(libtbx.group_args):
-            pass
-
-        candidates = []
-
         params = copy.deepcopy(self.all_params)
+        evaluation = self.params.stills.candidate_evaluation
 
+        # Cheap pre-scoring pass: index the reflections with each candidate and
+        # discard candidates that are not worth refining
+        prescored = []
         for icm, cm in enumerate(candidate_orientation_matrices):
             if icm >= self.params.basis_vector_combinations.max_refine:
                 break
-            # Index reflections in P1
-            sel = self.reflections["id"] == -1
-            refl = self.reflections.select(sel)
-            experiments = self.experiment_list_for_crystal(cm)
-            self.index_reflections(experiments, refl)
-            indexed = refl.select(refl["id"] >= 0)
-            indexed = indexed.select(indexed.get_flags(indexed.flags.indexed))
-
-            # If target symmetry supplied, try to apply it.  Then, apply the change of basis to the reflections
-            # indexed in P1 to the target setting
-            if (
-                self.params.stills.refine_candidates_with_known_symmetry
-                and self.params.known_symmetry.space_group is not None
-            ):
-                new_crystal, cb_op = self._symmetry_handler.apply_symmetry(cm)
-                if new_crystal is None:
-                    logger.info("Cannot convert to target symmetry, candidate %d", icm)
-                    continue
-                cm = new_crystal.change_basis(cb_op)
-                experiments = self.experiment_list_for_crystal(cm)
-
-                if not cb_op.is_identity_op():
-                    indexed["miller_index"] = cb_op.apply(indexed["miller_index"])
-
-            if params.indexing.stills.refine_all_candidates:
-                try:
-                    logger.info(
-                        "$$$ stills_indexer::choose_best_orientation_matrix, candidate %d initial outlier identification",
-                        icm,
-                    )
-                    acceptance_flags = self.identify_outliers(
-                        params, experiments, indexed
-                    )
-                    # create a new "indexed" list with outliers thrown out:
-                    indexed = indexed.select(acceptance_flags)
-
-                    logger.info(
-                        "$$$ stills_indexer::choose_best_orientation_matrix, candidate %d refinement before outlier rejection",
-                        icm,
-                    )
-                    R = e_refine(
-                        params=params,
-                        experiments=experiments,
-                        reflections=indexed,
-                        graph_verbose=False,
-                    )
-                    ref_experiments = R.get_experiments()
-
-                    # try to improve the outcome with a second round of outlier rejection post-initial refinement:
-                    acceptance_flags = self.identify_outliers(
-                        params, ref_experiments, indexed
-                    )
-
-                    # insert a round of Nave-outlier rejection on top of the r.m.s.d. rejection
-                    nv0 = NaveParameters(
-                        params=params,
-                        experiments=ref_experiments,
-                        reflections=indexed,
-                        refinery=R,
-                        graph_verbose=False,
-                    )
-                    nv0()
-                    acceptance_flags_nv0 = nv0.nv_acceptance_flags
-                    indexed = indexed.select(acceptance_flags & acceptance_flags_nv0)
-
-                    logger.info(
-                        "$$$ stills_indexer::choose_best_orientation_matrix, candidate %d after positional and delta-psi outlier rejection",
-                        icm,
-                    )
-                    R = e_refine(
-                        params=params,
-                        experiments=ref_experiments,
-                        reflections=indexed,
-                        graph_verbose=False,
-                    )
-                    ref_experiments = R.get_experiments()
+            candidate = self._prescore_candidate(icm, cm, params)
+            if candidate is not None:
+                prescored.append(candidate)
 
-                    nv = NaveParameters(
-                        params=params,
-                        experiments=ref_experiments,
-                        reflections=indexed,
-                        refinery=R,
-                        graph_verbose=False,
-                    )
-                    crystal_model = nv()
-                    assert (
-                        len(crystal_model) == 1
-                    ), "$$$ stills_indexer::choose_best_orientation_matrix, Only one crystal at this stage"
-                    crystal_model = crystal_model[0]
-
-                    # Drop candidates that after refinement can no longer be converted to the known target space group
-                    if (
-                        not self.params.stills.refine_candidates_with_known_symmetry
-                        and self.params.known_symmetry.space_group is not None
-                    ):
-                        (
-                            new_crystal,
-                            cb_op_to_primitive,
-                        ) = self._symmetry_handler.apply_symmetry(crystal_model)
-                        if new_crystal is None:
-                            logger.info(
-                                "P1 refinement yielded model diverged from target, candidate %d",
-                                icm,
-                            )
-                            continue
-
-                    rmsd, _ = calc_2D_rmsd_and_displacements(
-                        R.predict_for_reflection_table(indexed)
-                    )
-                except Exception as e:
-                    logger.info(
-                        "Couldn't refine candidate %d, %s: %s",
-                        icm,
-                        e.__class__.__name__,
-                        str(e),
-                    )
-                else:
-                    logger.info(
-                        "$$$ stills_indexer::choose_best_orientation_matrix, candidate %d done",
-                        icm,
-                    )
-                    candidates.append(
-                        CandidateInfo(
-                            crystal=crystal_model,
-                            green_curve_area=nv.green_curve_area,
-                            ewald_proximal_volume=nv.ewald_proximal_volume(),
-                            n_indexed=len(indexed),
-                            rmsd=rmsd,
-                            indexed=indexed,
-                            experiments=ref_experiments,
-                        )
-                    )
-            else:
-                from dials.algorithms.refinement.prediction.managed_predictors import (
-                    ExperimentsPredictorFactory,
-                )
+        if params.indexing.stills.refine_all_candidates:
+            candidates = self._refine_candidates(prescored, params)
+        else:
+            candidates = prescored
+            for i, candidate in enumerate(candidates):
+                if _meets_stopping_criteria(candidate, evaluation.stop):
+                    candidates = candidates[: i + 1]
+                    break
 
-                ref_predictor = ExperimentsPredictorFactory.from_experiments(
-                    experiments,
-                    force_stills=True,
-                    spherical_relp=params.refinement.parameterisation.spherical_relp_model,
-                )
-                rmsd, _ = calc_2D_rmsd_and_displacements(ref_predictor(indexed))
-                candidates.append(
-                    CandidateInfo(
-                        crystal=cm,
-                        n_indexed=len(indexed),
-                        rmsd=rmsd,
-                        indexed=indexed,
-                        experiments=experiments,
-                    )
-                )
         if len(candidates) == 0:
             raise DialsIndexError("No suitable indexing solution found")
 
@@ -693,60 +749,146 @@ class CandidateInfo(libtbx.group_args):
 
         return best.crystal, best.n_indexed
 
-    def identify_outliers(self, params, experiments, indexed):
-        if not params.indexing.stills.candidate_outlier_rejection:
-            return flex.bool(len(indexed), True)
-
-        logger.info("$$$ stills_indexer::identify_outliers")
-        refiner = e_refine(params, experiments, indexed, graph_verbose=False)
-
-        RR = refiner.predict_for_reflection_table(indexed)
-
-        px_sz = experiments[0].detector[0].get_pixel_size()
-
-        class Match:
-            pass
-
-        matches = []
-        for item in RR.rows():
-            m = Match()
-            m.x_obs = item["xyzobs.px.value"][0] * px_sz[0]
-            m.y_obs = item["xyzobs.px.value"][1] * px_sz[1]
-            m.x_calc = item["xyzcal.px"][0] * px_sz[0]
-            m.y_calc = item["xyzcal.px"][1] * px_sz[1]
-            m.miller_index = item["miller_index"]
-            matches.append(m)
-
-        import iotbx.phil
-        from rstbx.phil.phil_preferences import indexing_api_defs
-
-        hardcoded_phil = iotbx.phil.parse(input_string=indexing_api_defs).extract()
+    def _prescore_candidate(self, icm, cm, params):
+        """Index the unindexed reflections with a candidate orientation matrix.
+
+        Returns a CandidateInfo with the number and fraction of reflections
+        indexed and, if needed, the rmsd of the unrefined model, or None if the
+        candidate is rejected.
+        """
+        evaluation = self.params.stills.candidate_evaluation
+
+        # Index reflections in P1
+        sel = self.reflections["id"] == -1
+        refl = self.reflections.select(sel)
+        experiments = self.experiment_list_for_crystal(cm)
+        self.index_reflections(experiments, refl)
+        indexed = refl.select(refl["id"] >= 0)
+        indexed = indexed.select(indexed.get_flags(indexed.flags.indexed))
+        fraction_indexed = len(indexed) / len(refl) if len(refl) else 0
+
+        # If target symmetry supplied, try to apply it.  Then, apply the change of basis to the reflections
+        # indexed in P1 to the target setting
+        if (
+            self.params.stills.refine_candidates_with_known_symmetry
+            and self.params.known_symmetry.space_group is not None
+        ):
+            new_crystal, cb_op = self._symmetry_handler.apply_symmetry(cm)
+            if new_crystal is None:
+                logger.info("Cannot convert to target symmetry, candidate %d", icm)
+                return None
+            cm = new_crystal.change_basis(cb_op)
+            experiments = self.experiment_list_for_crystal(cm)
 
-        from rstbx.indexing_api.outlier_procedure import OutlierPlotPDF
+            if not cb_op.is_identity_op():
+                indexed["miller_index"] = cb_op.apply(indexed["miller_index"])
 
-        # comment this in if PDF graph is desired:
-        # hardcoded_phil.indexing.outlier_detection.pdf = "outlier.pdf"
-        # new code for outlier rejection inline here
-        if hardcoded_phil.indexing.outlier_detection.pdf is not None:
-            hardcoded_phil.__inject__(
-                "writer", OutlierPlotPDF(hardcoded_phil.indexing.outlier_detection.pdf)
+        if (
+            evaluation.min_fraction_indexed is not None
+            and fraction_indexed < evaluation.min_fraction_indexed
+        ):
+            logger.info(
+                "Candidate %d indexes %.1f%% of reflections, not refining",
+                icm,
+                100 * fraction_indexed,
             )
+            return None
 
-        # execute Sauter and Poon (2010) algorithm
-        from rstbx.indexing_api import outlier_detection
+        rmsd = None
+        if (
+            not params.indexing.stills.refine_all_candidates
+            or evaluation.max_initial_rmsd_px is not None
+        ):
+            from dials.algorithms.refinement.prediction.managed_predictors import (
+                ExperimentsPredictorFactory,
+            )
 
-        od = outlier_detection.find_outliers_from_matches(
-            matches,
-            verbose=self.all_params.refinement.reflections.outlier.sauter_poon.verbose,
-            horizon_phil=hardcoded_phil,
+            ref_predictor = ExperimentsPredictorFactory.from_experiments(
+                experiments,
+                force_stills=True,
+                spherical_relp=params.refinement.parameterisation.spherical_relp_model,
+            )
+            rmsd, _ = calc_2D_rmsd_and_displacements(ref_predictor(indexed))
+            if (
+                params.indexing.stills.refine_all_candidates
+                and rmsd > evaluation.max_initial_rmsd_px
+            ):
+                logger.info(
+                    "Candidate %d has initial rmsd %.2f px, not refining", icm, rmsd
+                )
+                return None
+
+        return CandidateInfo(
+            icm=icm,
+            crystal=cm,
+            n_indexed=len(indexed),
+            fraction_indexed=fraction_indexed,
+            rmsd=rmsd,
+            indexed=indexed,
+            experiments=experiments,
         )
 
-        if hardcoded_phil.indexing.outlier_detection.pdf is not None:
-            od.make_graphs(canvas=hardcoded_phil.writer.R.c, left_margin=0.5)
-            hardcoded_phil.writer.R.c.showPage()
-            hardcoded_phil.writer.R.c.save()
+    def _refine_candidates(self, prescored, params):
+        """Refine the pre-scored candidates, in order of the candidate list.
+
+        Candidates are refined serially, or submitted to a thread or process
+        pool of indexing.nproc workers. If stopping criteria are set, no further
+        candidates are started once one meets them. Serial and thread evaluation
+        use self.identify_outliers; a process pool cannot honour overrides of
+        it, as the indexer is not sent to the worker processes, so the
+        module-level identify_outliers is used.
+        """
+        evaluation = self.params.stills.candidate_evaluation
+        if self.params.known_symmetry.space_group is not None:
+            symmetry_handler = self._symmetry_handler
+        else:
+            symmetry_handler = None
+        args = [
+            (
+                params,
+                symmetry_handler,
+                candidate.icm,
+                candidate.experiments,
+                candidate.indexed,
+            )
+            for candidate in prescored
+        ]
 
-        return od.get_cache_status()
+        candidates = []
+        if evaluation.method == "serial" or self.params.nproc == 1:
+            for arg in args:
+                candidate = refine_candidate(*arg, self.identify_outliers)
+                if candidate is None:
+                    continue
+                candidates.append(candidate)
+                if _meets_stopping_criteria(candidate, evaluation.stop):
+                    break
+            return candidates
+
+        if evaluation.method == "threads":
+            # refinement may modify the parameters, so each thread needs a copy
+            args = [
+                (copy.deepcopy(arg[0]), *arg[1:], self.identify_outliers)
+                for arg in args
+            ]
+            Executor = concurrent.futures.ThreadPoolExecutor
+        else:
+            Executor = concurrent.futures.ProcessPoolExecutor
+        with Executor(max_workers=self.params.nproc) as pool:
+            futures = [pool.submit(refine_candidate, *arg) for arg in args]
+            for i, future in enumerate(futures):
+                candidate = future.result()
+                if candidate is None:
+                    continue
+                candidates.append(candidate)
+                if _meets_stopping_criteria(candidate, evaluation.stop):
+                    for pending in futures[i + 1 :]:
+                        pending.cancel()
+                    break
+        return candidates
+
+    def identify_outliers(self, params, experiments, indexed):
+        return identify_outliers(params, experiments, indexed)
 
     def refine(self, experiments, reflections):
         acceptance_flags = self.identify_outliers(
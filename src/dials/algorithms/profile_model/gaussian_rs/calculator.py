@@ -8,8 +8,8 @@
 
 from __future__ import annotations
 
-import collections
-import copy
+import concurrent.futures
+import itertools
 import logging
 import math
 
@@ -127,32 +127,8 @@ def _calculate_tau_and_zeta(
         Returns:
             (list of tau, list of zeta)
         """
-        from dials.algorithms.shoebox import MaskCode
-
-        mask_code = MaskCode.Valid | MaskCode.Foreground
-
-        # Calculate the list of frames and z coords
-        sbox = reflections["shoebox"]
-        bbox = reflections["bbox"]
-        phi = reflections["xyzcal.mm"].parts()[2]
-
-        # Calculate the zeta list
-        zeta = reflections["zeta"]
-
-        # Calculate the list of tau values
-        tau = []
-        zeta2 = []
-        for s, b, p, z in zip(sbox, bbox, phi, zeta):
-            for z0, f in enumerate(range(b[4], b[5])):
-                phi0 = scan.get_angle_from_array_index(int(f), deg=False)
-                phi1 = scan.get_angle_from_array_index(int(f) + 1, deg=False)
-                m = s.mask[z0 : z0 + 1, :, :]
-                if m.count(mask_code) > 0:
-                    tau.append((phi1 + phi0) / 2.0 - p)
-                    zeta2.append(z)
-
-        # Return the list of tau and zeta
-        return flex.double(tau), flex.double(zeta2)
+        tau, zeta, _, _ = _calculate_tau_and_zeta(scan, reflections)
+        return flumpy.from_numpy(tau), flumpy.from_numpy(zeta)
 
     def __call__(self, sigma_m):
         """Calculate the fraction of observed intensity for each observation.
@@ -256,32 +232,8 @@ def _calculate_tau_and_zeta(
             Returns:
                 (list of tau, list of zeta)
             """
-            from dials.algorithms.shoebox import MaskCode
-
-            mask_code = MaskCode.Valid | MaskCode.Foreground
-
-            # Calculate the list of frames and z coords
-            sbox = reflections["shoebox"]
-            bbox = reflections["bbox"]
-            phi = reflections["xyzcal.mm"].parts()[2]
-
-            # Calculate the zeta list
-            zeta = reflections["zeta"]
-
-            # Calculate the list of tau values
-            tau = []
-            zeta2 = []
-            for s, b, p, z in zip(sbox, bbox, phi, zeta):
-                for z0, f in enumerate(range(b[4], b[5])):
-                    phi0 = scan.get_angle_from_array_index(int(f), deg=False)
-                    phi1 = scan.get_angle_from_array_index(int(f) + 1, deg=False)
-                    m = s.mask[z0 : z0 + 1, :, :]
-                    if m.count(mask_code) > 0:
-                        tau.append((phi1 + phi0) / 2.0 - p)
-                        zeta2.append(z)
-
-            # Return the list of tau and zeta
-            return flex.double(tau), flex.double(zeta2)
+            tau, zeta, _, _ = _calculate_tau_and_zeta(scan, reflections)
+            return flumpy.from_numpy(tau), flumpy.from_numpy(zeta)
 
     class ExtendedEstimator:
         """Try to estimate using knowledge of intensities"""
@@ -315,13 +267,9 @@ def __init__(
                     "Something went wrong. Zero pixels selected for estimation of profile parameters."
                 )
 
-            # Compute intensity
-            self.K = flex.double()
-            self.nj = []
-            for i0, i1 in zip(self.indices[:-1], self.indices[1:]):
-                nj = n[i0:i1]
-                self.K.append(flex.sum(nj))
-                self.nj.append(nj)
+            # Compute the total intensity of each reflection
+            self.n = n
+            self.K = np.add.reduceat(n, indices[:-1])
 
             # Set the starting values to try 1, 3 degrees seems sensible for
             # crystal mosaic spread
@@ -353,14 +301,14 @@ def target(self, log_sigma):
             b = scitbx.math.erf(self.e2 / sigma_m)
 
             # Calculate the fraction of observed reflection intensity
-            zi = (a - b) / 2.0
+            zi = flumpy.to_numpy((a - b) / 2.0)
 
             # Set any points <= 0 to 1e-10 (otherwise will get a floating
             # point error in log calculation below).
-            assert zi.all_ge(0)
+            assert np.all(zi >= 0)
             mask = zi < TINY
-            assert mask.count(True) < len(mask)
-            zi.set_selected(mask, TINY)
+            assert np.count_nonzero(mask) < len(mask)
+            zi[mask] = TINY
 
             # Compute the likelihood
             #
@@ -379,13 +327,10 @@ def target(self, log_sigma):
             # as a prior for sigma, which accounts for which reflections were actually
             # recorded.
             #
-            L = 0
-            for kj, nj, i0, i1 in zip(
-                self.K, self.nj, self.indices[:-1], self.indices[1:]
-            ):
-                zj = zi[i0:i1]
-                logZ = math.log(flex.sum(zj))
-                L += flex.sum(nj * flex.log(zj)) - kj * logZ + logZ
+            # The per-reflection sums are evaluated as segment reductions over
+            # the contiguous frame ranges given by self.indices
+            logZ = np.log(np.add.reduceat(zi, self.indices[:-1]))
+            L = np.sum(self.n * np.log(zi)) - np.sum((self.K - 1) * logZ)
             logger.debug("Sigma M: %f, log(L): %f", sigma_m * 180 / math.pi, L)
 
             # Return the logarithm of r
@@ -401,46 +346,12 @@ def _calculate_tau_and_zeta(
                 experiment The experiment object.
 
             Returns:
-                (list of tau, list of zeta)
+                (list of tau, list of zeta, list of counts, reflection offsets)
             """
-            from dials.algorithms.shoebox import MaskCode
-
-            mask_code = MaskCode.Valid | MaskCode.Foreground
-
-            # Calculate the list of frames and z coords
-            sbox = reflections["shoebox"]
-            phi = reflections["xyzcal.mm"].parts()[2]
-
-            # Calculate the zeta list
-            zeta = reflections["zeta"]
-
-            # Calculate the list of tau values
-            tau = []
-            zeta2 = []
-            num = []
-            indices = [0]
-            for s, p, z in zip(sbox, phi, zeta):
-                b = s.bbox
-                for z0, f in enumerate(range(b[4], b[5])):
-                    phi0 = scan.get_angle_from_array_index(int(f), deg=False)
-                    phi1 = scan.get_angle_from_array_index(int(f) + 1, deg=False)
-                    d = s.data[z0 : z0 + 1, :, :]
-                    m = s.mask[z0 : z0 + 1, :, :]
-                    d = flex.sum(d.as_1d().select(m.as_1d() == mask_code))
-                    if d > 0:
-                        tau.append((phi1 + phi0) / 2.0 - p)
-                        zeta2.append(z)
-                        num.append(d)
-                if len(zeta2) > indices[-1]:
-                    indices.append(len(zeta2))
-
-            # Return the list of tau and zeta
-            return (
-                flex.double(tau),
-                flex.double(zeta2),
-                flex.double(num),
-                flex.size_t(indices),
+            tau, zeta, num, indices = _calculate_tau_and_zeta(
+                scan, reflections, use_intensity=True
             )
+            return flumpy.from_numpy(tau), flumpy.from_numpy(zeta), num, indices
 
     def __init__(
         self, crystal, beam, detector, goniometer, scan, reflections, algorithm="basic"
@@ -581,8 +492,13 @@ def __init__(
         min_zeta=0.05,
         algorithm="basic",
         centroid_definition="s1",
+        nproc=1,
     ):
-        """Calculate the profile model."""
+        """Calculate the profile model.
+
+        The per-frame estimates are independent of each other and are
+        distributed over nproc processes in blocks of contiguous frames.
+        """
         from dxtbx.model.experiment_list import Experiment
 
         # Check input has what we want
@@ -608,58 +524,64 @@ def __init__(
         mask = flex.abs(zeta) >= min_zeta
         reflections = reflections.select(mask)
 
-        # Split the reflections into partials
-        reflections = copy.deepcopy(reflections)
+        # Split the reflections into partials. The selection above is already a
+        # copy of the input table, so the split can be done in place.
         reflections.split_partials_with_shoebox()
 
-        # Get a list of reflections for each frame
-        bbox = reflections["bbox"]
-        index_list = collections.defaultdict(list)
-        for i, (x0, x1, y0, y1, z0, z1) in enumerate(bbox):
-            assert z1 == z0 + 1
-            index_list[z0].append(i)
-        reflection_list = {
-            key: reflections.select(flex.size_t(value))
-            for key, value in index_list.items()
-        }
+        # Sort the partials by frame so that each frame (and each block of
+        # frames) is a contiguous slice of the table
+        frame = flumpy.to_numpy(reflections["bbox"].parts()[4])
+        assert (flumpy.to_numpy(reflections["bbox"].parts()[5]) == frame + 1).all()
+        order = np.argsort(frame, kind="stable")
+        reflections = reflections.select(flex.size_t(order.astype(np.uint64)))
+        frame = frame[order]
 
         # The range of frames
         z0, z1 = scan.get_array_range()
-        min_z = min(index_list)
-        max_z = max(index_list)
-        assert z0 == min_z
-        assert z1 == max_z + 1
+        assert len(frame) > 0
+        assert z0 == frame[0]
+        assert z1 == frame[-1] + 1
+        offsets = np.searchsorted(frame, np.arange(z0, z1 + 1))
+
+        # Compute for all frames, splitting the scan into blocks of contiguous
+        # frames that can be processed independently
+        frames = np.arange(z0, z1)
+        models = (crystal, beam, detector, goniometer, scan)
+        if nproc > 1:
+            blocks = np.array_split(np.arange(len(frames)), min(len(frames), nproc * 4))
+            with concurrent.futures.ProcessPoolExecutor(max_workers=nproc) as pool:
+                futures = [
+                    pool.submit(
+                        _compute_frame_sigmas,
+                        models,
+                        reflections[int(offsets[b[0]]) : int(offsets[b[-1] + 1])],
+                        np.diff(offsets[b[0] : b[-1] + 2]).tolist(),
+                    )
+                    for b in blocks
+                ]
+                results = [future.result() for future in futures]
+        else:
+            results = [
+                _compute_frame_sigmas(models, reflections, np.diff(offsets).tolist())
+            ]
+        results = list(itertools.chain.from_iterable(results))
+        assert len(results) == len(frames)
 
-        # Compute for all frames
         self._num = []
         sigma_b = flex.double()
         sigma_m = flex.double()
-        for i in range(z0, z1):
-            # Get reflections at the index
-            reflections = reflection_list[i]
-
-            self._num.append(len(reflections))
-
-            # Calculate the E.S.D of the beam divergence
-            beam_divergence = ComputeEsdBeamDivergence(detector, reflections)
-
-            # Set the sigma b
-            sigma_b.append(beam_divergence.sigma())
-
-            # Calculate the E.S.D of the reflecting range
-            reflecting_range = ComputeEsdReflectingRange(
-                crystal, beam, detector, goniometer, scan, reflections
-            )
-
+        for i, (num, sb, sm) in zip(frames, results):
+            self._num.append(num)
             logger.info(
                 "Computing profile model for frame %d: sigma_b = %.4f degrees, sigma_m = %.4f degrees",
                 i,
-                beam_divergence.sigma() * 180 / math.pi,
-                reflecting_range.sigma() * 180 / math.pi,
+                sb * 180 / math.pi,
+                sm * 180 / math.pi,
             )
 
             # Set the sigmas
-            sigma_m.append(reflecting_range.sigma())
+            sigma_b.append(sb)
+            sigma_m.append(sm)
 
         def convolve(data, kernel):
             assert len(kernel) & 1
@@ -726,6 +648,135 @@ def sigma_m(self):
         return self._sigma_m
 
 
+def _compute_frame_sigmas(models, reflections, frame_sizes):
+    """Compute sigma_b and sigma_m for a block of contiguous frames.
+
+    Params:
+        models The (crystal, beam, detector, goniometer, scan) models
+        reflections The single-frame partials of the block, sorted by frame
+        frame_sizes The number of partials on each frame of the block
+
+    Returns:
+        A list of (number of reflections, sigma_b, sigma_m) for each frame
+    """
+    crystal, beam, detector, goniometer, scan = models
+    results = []
+    first = 0
+    for size in frame_sizes:
+        # Get reflections at the index
+        frame_reflections = reflections[first : first + size]
+        first += size
+
+        # Calculate the E.S.D of the beam divergence
+        beam_divergence = ComputeEsdBeamDivergence(detector, frame_reflections)
+
+        # Calculate the E.S.D of the reflecting range
+        reflecting_range = ComputeEsdReflectingRange(
+            crystal, beam, detector, goniometer, scan, frame_reflections
+        )
+        results.append((size, beam_divergence.sigma(), reflecting_range.sigma()))
+    return results
+
+
+def _segment_sum(values, sizes):
+    """Sum consecutive segments of values with the given (possibly zero) sizes."""
+    result = np.zeros(len(sizes), dtype=values.dtype)
+    nonempty = sizes > 0
+    if np.any(nonempty):
+        offsets = np.cumsum(sizes) - sizes
+        result[nonempty] = np.add.reduceat(values, offsets[nonempty])
+    return result
+
+
+def _calculate_tau_and_zeta(scan, reflections, use_intensity=False):
+    """Calculate the per-frame tau and zeta values for a set of reflections.
+
+    Each shoebox frame containing valid foreground pixels (or, if use_intensity
+    is set, with a positive foreground intensity) contributes one tau value,
+    the distance of the frame centre from the reflection's calculated
+    rotation angle. The masks of all shoeboxes are reduced per frame in a
+    single pass rather than frame by frame.
+
+    Params:
+        scan The scan model
+        reflections The list of reflections
+        use_intensity Select frames by summed foreground intensity
+
+    Returns:
+        (tau, zeta, summed intensity, reflection offsets) as numpy arrays. The
+        offsets delimit the contiguous frames of each contributing reflection.
+    """
+    from dials.algorithms.shoebox import MaskCode
+
+    mask_code = MaskCode.Valid | MaskCode.Foreground
+
+    sbox = reflections["shoebox"]
+    phi = flumpy.to_numpy(reflections["xyzcal.mm"].parts()[2])
+    zeta = flumpy.to_numpy(reflections["zeta"])
+
+    # Gather the shoebox masks (and data) into single flat arrays, recording
+    # the frame range and frame size of each shoebox
+    n_refl = len(reflections)
+    first_frame = np.zeros(n_refl, dtype=np.int64)
+    num_frames = np.zeros(n_refl, dtype=np.int64)
+    frame_size = np.zeros(n_refl, dtype=np.int64)
+    foreground = []
+    data = []
+    for i, s in enumerate(sbox):
+        mask = flumpy.to_numpy(s.mask)
+        first_frame[i] = s.bbox[4]
+        num_frames[i] = mask.shape[0]
+        frame_size[i] = mask.shape[1] * mask.shape[2]
+        foreground.append((mask == mask_code).ravel())
+        if use_intensity:
+            data.append(flumpy.to_numpy(s.data).ravel())
+
+    if num_frames.sum() == 0:
+        empty = np.array([], dtype=np.float64)
+        return empty, empty, empty, np.zeros(1, dtype=np.int64)
+
+    # Per-frame reductions over the flattened shoebox pixels
+    pixels_per_frame = np.repeat(frame_size, num_frames)
+    foreground = np.concatenate(foreground)
+    if use_intensity:
+        counts = _segment_sum(
+            np.where(foreground, np.concatenate(data), 0).astype(np.float64),
+            pixels_per_frame,
+        )
+        selection = counts > 0
+    else:
+        counts = _segment_sum(foreground.astype(np.int64), pixels_per_frame)
+        selection = counts > 0
+        counts = counts.astype(np.float64)
+
+    # The frame number and parent reflection of each shoebox frame
+    refl_index = np.repeat(np.arange(n_refl), num_frames)
+    frame = (
+        np.arange(num_frames.sum())
+        - np.repeat(np.cumsum(num_frames) - num_frames, num_frames)
+        + first_frame[refl_index]
+    )
+
+    # Look up the rotation angle at the centre of each frame, evaluating the
+    # scan only once per distinct frame
+    f0, f1 = frame.min(), frame.max() + 1
+    angles = np.array(
+        [scan.get_angle_from_array_index(int(f), deg=False) for f in range(f0, f1 + 1)]
+    )
+    mid_angles = (angles[:-1] + angles[1:]) / 2.0
+
+    frame = frame[selection]
+    refl_index = refl_index[selection]
+    tau = mid_angles[frame - f0] - phi[refl_index]
+    zeta = zeta[refl_index].astype(np.float64)
+
+    # Offsets of the contiguous selected frames of each reflection
+    frames_per_refl = np.bincount(refl_index, minlength=n_refl)
+    indices = np.concatenate(([0], np.cumsum(frames_per_refl[frames_per_refl > 0])))
+
+    return tau, zeta, counts[selection], indices
+
+
 def _select_reflections_for_sigma_calc(reflections, min_number_of_refl=10000):
     """Determine a subset of reflections to use for sigma_m calculation."""
     n_ref = reflections.size()
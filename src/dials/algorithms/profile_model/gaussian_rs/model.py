@@ -18,6 +18,12 @@
         .type = bool
         .help = "Calculate a scan varying model"
 
+    nproc = 1
+        .type = int(value_min=1)
+        .help = "The number of processes to use when calculating a scan varying"
+                "model. The frames of the scan are divided into blocks which"
+                "are processed independently."
+
     min_spots
       .help = "if (total_reflections > overall or reflections_per_degree >"
               "per_degree) then do the profile modelling."
@@ -381,20 +387,30 @@ def create_from_reflections(
             )
 
         if not params.gaussian_rs.scan_varying:
-            Calculator = ProfileModelCalculator
+            calculator = ProfileModelCalculator(
+                reflections,
+                crystal,
+                beam,
+                detector,
+                goniometer,
+                scan,
+                params.gaussian_rs.filter.min_zeta,
+                algorithm=params.gaussian_rs.sigma_m_algorithm,
+                centroid_definition=params.gaussian_rs.centroid_definition,
+            )
         else:
-            Calculator = ScanVaryingProfileModelCalculator
-        calculator = Calculator(
-            reflections,
-            crystal,
-            beam,
-            detector,
-            goniometer,
-            scan,
-            params.gaussian_rs.filter.min_zeta,
-            algorithm=params.gaussian_rs.sigma_m_algorithm,
-            centroid_definition=params.gaussian_rs.centroid_definition,
-        )
+            calculator = ScanVaryingProfileModelCalculator(
+                reflections,
+                crystal,
+                beam,
+                detector,
+                goniometer,
+                scan,
+                params.gaussian_rs.filter.min_zeta,
+                algorithm=params.gaussian_rs.sigma_m_algorithm,
+                centroid_definition=params.gaussian_rs.centroid_definition,
+                nproc=params.gaussian_rs.nproc,
+            )
         return cls(
             params=params,
             n_sigma=params.gaussian_rs.parameters.n_sigma,
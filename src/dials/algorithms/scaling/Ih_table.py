@@ -20,18 +20,14 @@
 
 from dials.algorithms.scaling.error_model.error_model import BasicErrorModel
 from dials.array_family import flex
+from dials.util import asu_index_cache
 
 
 def map_indices_to_asu(miller_indices, space_group, anomalous=False):
     """Map the indices to the asymmetric unit."""
-    crystal_symmetry = crystal.symmetry(space_group=space_group)
-    miller_set = miller.set(
-        crystal_symmetry=crystal_symmetry,
-        indices=miller_indices,
-        anomalous_flag=anomalous,
+    return asu_index_cache.map_indices_to_asu(
+        miller_indices, space_group, anomalous=anomalous
     )
-    miller_set_in_asu = miller_set.map_to_asu()
-    return miller_set_in_asu.indices()
 
 
 def get_sorted_asu_indices(asu_indices, space_group, anomalous=False):
@@ -473,17 +469,61 @@ def as_miller_array(
         return _reflection_table_to_iobs(joint_table, unit_cell, self.space_group)
 
 
-class TargetAsuDictCache(object):
+def pack_miller_indices(miller_indices) -> np.array:
+    """Pack miller indices into single int64 keys, for vectorised matching.
+
+    Each component is stored in a 21-bit field, which allows indices in the
+    range -2**20 <= h, k, l < 2**20.
+    """
+    hkl = flumpy.to_numpy(miller_indices).astype(np.int64).reshape(-1, 3)
+    assert np.all(np.abs(hkl) < 2**20), "Miller index too large to pack"
+    hkl += 2**20
+    return (hkl[:, 0] << 42) | (hkl[:, 1] << 21) | hkl[:, 2]
+
+
+class AsuIndexLookup:
+    """
+    A vectorised lookup of miller indices against a set of target indices.
+
+    The target indices are packed and sorted once, after which arrays of
+    indices can be matched against the target with a binary search, avoiding
+    the construction of (and per-reflection lookups in) a python dictionary.
+    """
+
+    def __init__(self, target_miller_indices):
+        keys = pack_miller_indices(target_miller_indices)
+        self._order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[self._order]
+
+    def find(self, miller_indices) -> np.array:
+        """
+        Return the location in the target of each of the miller indices.
+
+        Indices not in the target are given a location of -1. If an index
+        occurs more than once in the target, the location of the last
+        occurrence is returned.
+        """
+        keys = pack_miller_indices(miller_indices)
+        pos = np.searchsorted(self._sorted_keys, keys, side="right") - 1
+        found = pos >= 0
+        found[found] = self._sorted_keys[pos[found]] == keys[found]
+        locations = np.full(keys.size, -1, dtype=np.int64)
+        locations[found] = self._order[pos[found]]
+        return locations
+
+
+class TargetAsuLookupCache(object):
+    """Cache the lookup and Ih values of target Ih_tables, keyed by table id."""
+
     instances = {}
 
     def __new__(cls, target_Ih_table):
         id_ = id(target_Ih_table)
         if id_ not in cls.instances:
-            cls.instances[id_] = dict(
-                zip(
-                    target_Ih_table.blocked_data_list[0].asu_miller_index,
-                    target_Ih_table.blocked_data_list[0].Ih_values,
-                )
+            block = target_Ih_table.blocked_data_list[0]
+            cls.instances[id_] = (
+                AsuIndexLookup(block.asu_miller_index),
+                block.Ih_values.copy(),
             )
         return cls.instances[id_]
 
@@ -689,23 +729,12 @@ def match_Ih_values_to_target(self, target_Ih_table: IhTable) -> None:
         matching reflection is found, then the values are removed from the table.
         """
         assert target_Ih_table.n_work_blocks == 1
-        target_asu_Ih_dict = TargetAsuDictCache(target_Ih_table)
+        target_lookup, target_Ih_values = TargetAsuLookupCache(target_Ih_table)
+        locations = target_lookup.find(self.asu_miller_index)
         new_Ih_values = np.zeros(self.size, dtype=float)
-        location_in_unscaled_array = 0
-        sorted_asu_indices, permuted = get_sorted_asu_indices(
-            self.asu_miller_index,
-            target_Ih_table.space_group,
-            anomalous=target_Ih_table.anomalous,
-        )
-        for j, miller_idx in enumerate(OrderedSet(sorted_asu_indices)):
-            n_in_group = self._csc_h_index_matrix.getcol(j).count_nonzero()
-            if miller_idx in target_asu_Ih_dict:
-                i = location_in_unscaled_array
-                new_Ih_values[np.arange(i, i + n_in_group, dtype=np.uint64)] = np.full(
-                    n_in_group, target_asu_Ih_dict[miller_idx]
-                )
-            location_in_unscaled_array += n_in_group
-        self.Ih_table.loc[flumpy.to_numpy(permuted), "Ih_values"] = new_Ih_values
+        matched = locations >= 0
+        new_Ih_values[matched] = target_Ih_values[locations[matched]]
+        self.Ih_table.loc[:, "Ih_values"] = new_Ih_values
         sel = self.Ih_values != 0.0
         new_table = self.select(sel)
         # now set attributes to update object
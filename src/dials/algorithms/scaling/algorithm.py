@@ -16,7 +16,12 @@
     ScalingSummaryContextManager,
 )
 from dials.algorithms.scaling.scale_and_filter import AnalysisResults, log_cycle_results
-from dials.algorithms.scaling.scaler_factory import MultiScalerFactory, create_scaler
+from dials.algorithms.scaling.scaler import MultiScaler
+from dials.algorithms.scaling.scaler_factory import (
+    MultiScalerFactory,
+    SingleScalerFactory,
+    create_scaler,
+)
 from dials.algorithms.scaling.scaling_library import (
     create_datastructures_for_reference_file,
     create_scaling_model,
@@ -26,6 +31,7 @@
     set_image_ranges_in_scaling_models,
 )
 from dials.algorithms.scaling.scaling_utilities import (
+    BadDatasetForScalingException,
     DialsMergingStatisticsError,
     log_memory_usage,
 )
@@ -426,6 +432,12 @@ def run(self):
                 for table in self.reflections:
                     joined_reflections.extend(table)
 
+                previous_image_ranges = dict(
+                    zip(
+                        self.experiments.identifiers(),
+                        get_valid_image_ranges(self.experiments),
+                    )
+                )
                 script = deltaccscript(
                     delta_cc_params, self.experiments, joined_reflections
                 )
@@ -458,7 +470,9 @@ def run(self):
                         [script.filtered_reflection_table]
                     )
                     if self.params.scaling_options.full_matrix:
-                        results = self._run_final_scale_cycle(results)
+                        results = self._run_final_scale_cycle(
+                            results, previous_image_ranges
+                        )
                     results.finish(termination_reason="no_more_removed")
                     break
 
@@ -474,7 +488,9 @@ def run(self):
                     logger.info(
                         "Finishing scale and filtering as have now removed more than the limit."
                     )
-                    results = self._run_final_scale_cycle(results)
+                    results = self._run_final_scale_cycle(
+                        results, previous_image_ranges
+                    )
                     results.finish(termination_reason="max_percent_removed")
                     break
 
@@ -486,18 +502,22 @@ def run(self):
                         logger.info(
                             "Finishing scaling and filtering as completeness now below cutoff."
                         )
-                        results = self._run_final_scale_cycle(results)
+                        results = self._run_final_scale_cycle(
+                            results, previous_image_ranges
+                        )
                         results.finish(termination_reason="below_completeness_limit")
                         break
 
                 if counter == self.params.filtering.deltacchalf.max_cycles:
                     logger.info("Finishing as reached max number of cycles.")
-                    results = self._run_final_scale_cycle(results)
+                    results = self._run_final_scale_cycle(
+                        results, previous_image_ranges
+                    )
                     results.finish(termination_reason="max_cycles")
                     break
 
                 # If not finished then need to create new scaler to try again
-                self._create_model_and_scaler()
+                self._update_model_and_scaler(previous_image_ranges)
             self.filtering_results = results
             # Print summary of results
             logger.info(results)
@@ -532,8 +552,80 @@ def run_scaling_cycle(self):
             logger.info(e)
         logger.info("Performed cycle of scaling.")
 
-    def _run_final_scale_cycle(self, results):
-        self._create_model_and_scaler()
+    def _update_model_and_scaler(self, previous_image_ranges):
+        """Create the scaler for the next cycle of scaling and filtering.
+
+        The scalers of datasets that were unchanged by the last round of
+        filtering are reused, keeping their configured model components,
+        outliers and model parameters, so that only the datasets which had
+        image ranges removed are reinitialised.
+        """
+        if (
+            not self.params.filtering.deltacchalf.warm_start
+            or self.scaler.id_ != "multi"
+            or self.params.reflection_selection.method == "intensity_ranges"
+        ):
+            self._create_model_and_scaler()
+            return
+        previous_scalers = {
+            scaler.experiment.identifier: scaler
+            for scaler in self.scaler.active_scalers
+        }
+        image_ranges = get_valid_image_ranges(self.experiments)
+        reused = {}
+        for expt, table, image_range in zip(
+            self.experiments, self.reflections, image_ranges
+        ):
+            scaler = previous_scalers.get(expt.identifier)
+            if (
+                scaler is not None
+                and image_range == previous_image_ranges.get(expt.identifier)
+                and table.size() == scaler.reflection_table.size()
+                and scaler._get_suitable_for_scaling_sel(table).all_eq(
+                    scaler.suitable_refl_for_scaling_sel
+                )
+            ):
+                reused[expt.identifier] = scaler
+        if not reused:
+            self._create_model_and_scaler()
+            return
+        logger.info(
+            "Reusing the scalers of %s datasets unchanged by filtering.",
+            len(reused),
+        )
+
+        # Only the models of the changed datasets need to be updated, and these
+        # are never overwritten so that minimisation resumes from the current
+        # model parameters.
+        changed_experiments = [
+            expt for expt in self.experiments if expt.identifier not in reused
+        ]
+        for expt in changed_experiments:
+            expt.scaling_model.update(self.params)
+        set_image_ranges_in_scaling_models(changed_experiments)
+
+        single_scalers = []
+        removed = []
+        for expt, table in zip(self.experiments, self.reflections):
+            scaler = reused.get(expt.identifier)
+            if scaler is not None:
+                scaler.reset_reflection_table(table)
+                single_scalers.append(scaler)
+                continue
+            try:
+                scaler = SingleScalerFactory.create(
+                    self.params, expt, table, for_multi=True
+                )
+            except BadDatasetForScalingException as e:
+                logger.info(e)
+                removed.append(expt.identifier)
+            else:
+                single_scalers.append(scaler)
+        self.scaler = MultiScaler(single_scalers)
+        self.scaler.removed_datasets.extend(removed)
+
+    def _run_final_scale_cycle(self, results, previous_image_ranges):
+        self._update_model_and_scaler(previous_image_ranges)
         super().run()
         results.add_final_stats(self.merging_statistics_result)
         for table in self.reflections:
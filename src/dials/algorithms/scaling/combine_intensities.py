@@ -7,11 +7,11 @@
 import logging
 
 import boost_adaptbx.boost.python
-from cctbx import crystal, miller
+from cctbx import miller
 
 from dials.algorithms.scaling.scaling_utilities import DialsMergingStatisticsError
 from dials.array_family import flex
-from dials.util import tabulate
+from dials.util import asu_index_cache, tabulate
 
 miller_ext = boost_adaptbx.boost.python.import_ext("cctbx_miller_ext")
 logger = logging.getLogger("dials")
@@ -40,12 +40,7 @@ def fast_merging_stats(array):
 
 def map_indices_to_asu(miller_indices, space_group):
     """Map the indices to the asymmetric unit."""
-    crystal_symmetry = crystal.symmetry(space_group=space_group)
-    miller_set = miller.set(
-        crystal_symmetry=crystal_symmetry, indices=miller_indices, anomalous_flag=False
-    )
-    miller_set_in_asu = miller_set.map_to_asu()
-    return miller_set_in_asu.indices()
+    return asu_index_cache.map_indices_to_asu(miller_indices, space_group)
 
 
 def _make_reflection_table_from_scaler(scaler):
@@ -30,6 +30,9 @@
   parameter_values=      (values to test, only optional if parameter= selects a
                           boolean command-line parameter)
 
+The runs for each option and fold are independent of each other, and can be
+spread over several processes with nproc=.
+
 For example
 cross_validation_mode=multi parameter=physical.absorption_correction
 cross_validation_mode=multi parameter=physical.decay_interval parameter_values="5.0 10.0 15.0"
@@ -38,6 +41,7 @@
 
 from __future__ import annotations
 
+import copy
 import itertools
 import logging
 import time
@@ -78,6 +82,11 @@
               "allowed is 1/free_set_percentage; if set greater than this then"
               "the repetition will finish after 1/free_set_percentage folds."
       .expert_level = 2
+    nproc = 1
+      .type = int(value_min=1)
+      .help = "Number of processes over which to spread the independent runs "
+              "for each configuration and free set offset."
+      .expert_level = 2
   }
 """
 )
@@ -89,6 +98,7 @@ def cross_validate(params, cross_validator):
     start_time = time.time()
     free_set_percentage = cross_validator.get_free_set_percentage(params)
     options_dict = {}
+    jobs = []
 
     if params.cross_validation.cross_validation_mode == "single":
         # just run the setup nfolds times
@@ -96,7 +106,7 @@ def cross_validate(params, cross_validator):
         for n in range(params.cross_validation.nfolds):
             if n < 100.0 / free_set_percentage:
                 params = cross_validator.set_free_set_offset(params, n)
-                cross_validator.run_script(params, config_no=0)
+                jobs.append((copy.deepcopy(params), 0))
 
     elif params.cross_validation.cross_validation_mode == "multi":
         # run each option nfolds times
@@ -157,11 +167,23 @@ def cross_validate(params, cross_validator):
             for n in range(params.cross_validation.nfolds):
                 if n < 100.0 / free_set_percentage:
                     params = cross_validator.set_free_set_offset(params, n)
-                    cross_validator.run_script(params, config_no=i)
+                    jobs.append((copy.deepcopy(params), i))
 
     else:
         raise ValueError("Error in interpreting mode and options.")
 
+    nproc = params.cross_validation.nproc
+    if nproc > 1 and len(jobs) > 1:
+        logger.info(
+            "Running %s cross-validation jobs on %s processes",
+            len(jobs),
+            min(nproc, len(jobs)),
+        )
+        cross_validator.run_scripts(jobs, nproc)
+    else:
+        for job_params, config_no in jobs:
+            cross_validator.run_script(job_params, config_no=config_no)
+
     st = cross_validator.interpret_results()
     logger.info("Summary of the cross validation analysis: \n %s", st.format())
 
@@ -5,7 +5,9 @@
 
 from __future__ import annotations
 
+import concurrent.futures
 import itertools
+import logging
 from copy import deepcopy
 
 import pkg_resources
@@ -14,6 +16,21 @@
 from libtbx.table_utils import simple_table
 from scitbx.array_family import flex
 
+logger = logging.getLogger("dials")
+
+_worker_cross_validator = None
+
+
+def _init_cross_validation_worker(cross_validator):
+    global _worker_cross_validator
+    _worker_cross_validator = cross_validator
+    # The logs of concurrent runs would be interleaved, so are not shown
+    logger.disabled = True
+
+
+def _cross_validation_worker(params):
+    return _worker_cross_validator.calculate_results(params)
+
 
 class CrossValidator:
     """Abstract class defining common methods for cross validation and methods
@@ -37,6 +54,27 @@ def run_script(self, params, config_no):
         """Run the appropriate command line script with the params, get the
         free/work set results and add to the results dict. Indicate the
         configuration number being run."""
+        results = self.calculate_results(params)
+        self.add_results_to_results_dict(config_no, results)
+
+    def run_scripts(self, jobs, nproc):
+        """Run the script for a list of (params, config_no) jobs, spread over
+        nproc processes, and add the results to the results dict in order.
+        The experiments and reflections are sent once to each process."""
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(nproc, len(jobs)),
+            initializer=_init_cross_validation_worker,
+            initargs=(self,),
+        ) as pool:
+            all_results = pool.map(
+                _cross_validation_worker, [params for params, _ in jobs]
+            )
+            for (_, config_no), results in zip(jobs, all_results):
+                self.add_results_to_results_dict(config_no, results)
+
+    def calculate_results(self, params):
+        """Run the appropriate command line script with the params and return
+        the free/work set results"""
         raise NotImplementedError()
 
     def get_results_from_script(self, script):
@@ -211,9 +249,9 @@ def get_free_set_percentage(self, params):
         """Inspect the free set percentage in the correct place in the scope"""
         return params.scaling_options.free_set_percentage
 
-    def run_script(self, params, config_no):
-        """Run the scaling script with the params, get the free/work set results
-        and add to the results dict"""
+    def calculate_results(self, params):
+        """Run the scaling script with the params and return the free/work set
+        results"""
         from dials.algorithms.scaling.algorithm import ScalingAlgorithm
 
         params.scaling_options.__setattr__("use_free_set", True)
@@ -223,5 +261,4 @@ def run_script(self, params, config_no):
             reflections=deepcopy(self.reflections),
         )
         algorithm.run()
-        results = self.get_results_from_script(algorithm)
-        self.add_results_to_results_dict(config_no, results)
+        return self.get_results_from_script(algorithm)
@@ -8,11 +8,11 @@
 from math import ceil, exp, log
 
 import numpy as np
+from scipy.sparse import csr_matrix
 from scipy.stats import norm
 
 from dxtbx import flumpy
 from iotbx import phil
-from scitbx import sparse
 
 from dials.array_family import flex
 from dials.util import tabulate
@@ -249,15 +249,17 @@ def _create_summation_matrix(self):
         This routine attempts to bin into bins equally spaced in log(intensity),
         to give a representative sample across all intensities. To avoid
         undersampling, it is required that there are at least 100 reflections
-        per intensity bin unless there are very few reflections."""
+        per intensity bin unless there are very few reflections.
+
+        The bin of each reflection is recorded in self.bin_index (-1 for
+        reflections not in any bin), which is used for summations in bins."""
         n = self.Ih_table.size
         self.binning_info["n_reflections"] = n
-        summation_matrix = sparse.matrix(n, self.n_bins)
         # calculate expected intensity value in pixels on scale of each image
         Ih = self.Ih_table.Ih_values * self.Ih_table.inverse_scale_factors
         if "partiality" in self.Ih_table.Ih_table:
             Ih *= self.Ih_table.Ih_table["partiality"].to_numpy()
-        size_order = flex.sort_permutation(flumpy.from_numpy(Ih), reverse=True)
+        size_order = np.argsort(-Ih, kind="stable")
         Imax = Ih.max()
         min_Ih = Ih.min()
         Imin = max(1.0, min_Ih)  # avoid log issues
@@ -267,8 +269,9 @@ def _create_summation_matrix(self):
         ]
         boundaries[-1] = min_Ih - 0.01
         self.binning_info["bin_boundaries"] = np.array(boundaries)
-        self.binning_info["refl_per_bin"] = np.array([], dtype=float).reshape((0,))
 
+        bin_index = np.full(n, -1, dtype=np.int64)
+        refl_per_bin = np.zeros(self.n_bins, dtype=float)
         n_cumul = 0
         if Ih.size > 100 * self.min_reflections_required:
             self.min_reflections_required = int(Ih.size / 100.0)
@@ -277,78 +280,62 @@ def _create_summation_matrix(self):
             maximum = self.binning_info["bin_boundaries"][i]
             minimum = self.binning_info["bin_boundaries"][i + 1]
             sel1 = Ih <= maximum
-            sel2 = Ih > minimum
-            sel = sel1 & sel2
-            # isel = sel.iselection()
-            n_in_bin = np.count_nonzero(sel)  # isel.size()
+            sel = sel1 & (Ih > minimum)
+            n_in_bin = np.count_nonzero(sel)
             if n_in_bin < min_per_bin:  # need more in this bin
                 m = n_cumul + min_per_bin
                 if m < n:  # still some refl left to use
-                    idx = size_order[m]
-                    intensity = Ih[idx]
+                    intensity = Ih[size_order[m]]
                     self.binning_info["bin_boundaries"][i + 1] = intensity
                     minimum = self.binning_info["bin_boundaries"][i + 1]
                     sel = sel1 & (Ih > minimum)
-                    # isel = sel.iselection()
-                    n_in_bin = np.count_nonzero(sel)  # isel.size()
-            self.binning_info["refl_per_bin"] = np.append(
-                self.binning_info["refl_per_bin"], [n_in_bin]
-            )
-            for j in np.nonzero(sel)[0]:  # isel:
-                summation_matrix[int(j), i] = 1
+                    n_in_bin = np.count_nonzero(sel)
+            # the bins are consecutive intensity ranges, so do not overlap
+            refl_per_bin[i] = n_in_bin
+            bin_index[sel] = i
             n_cumul += n_in_bin
-        cols_to_del = []
-        for i, col in enumerate(summation_matrix.cols()):
-            if col.non_zeroes < min_per_bin - 5:
-                cols_to_del.append(i)
-        n_new_cols = summation_matrix.n_cols - len(cols_to_del)
-        if n_new_cols == self.n_bins:
-            for i in range(len(self.binning_info["bin_boundaries"]) - 1):
-                maximum = self.binning_info["bin_boundaries"][i]
-                minimum = self.binning_info["bin_boundaries"][i + 1]
-                sel1 = Ih <= maximum
-                sel2 = Ih > minimum
-                sel = sel1 & sel2
-                self.binning_info["mean_intensities"] = np.append(
-                    self.binning_info["mean_intensities"], [np.mean(Ih[sel])]
-                )
-            return summation_matrix
-        new_sum_matrix = sparse.matrix(summation_matrix.n_rows, n_new_cols)
-        next_col = 0
-        refl_per_bin = np.array([], dtype=float).reshape((0,))
-        new_bounds = np.array([], dtype=float).reshape((0,))
-        for i, col in enumerate(summation_matrix.cols()):
-            if i not in cols_to_del:
-                new_sum_matrix[:, next_col] = col
-                next_col += 1
-                new_bounds = np.append(
-                    new_bounds, [self.binning_info["bin_boundaries"][i]]
-                )
-                refl_per_bin = np.append(
-                    refl_per_bin, [self.binning_info["refl_per_bin"][i]]
-                )
-        self.binning_info["refl_per_bin"] = refl_per_bin
-        new_bounds = np.append(new_bounds, [self.binning_info["bin_boundaries"][-1]])
-        self.binning_info["bin_boundaries"] = new_bounds
-        for i in range(len(new_bounds) - 1):
-            maximum = new_bounds[i]
-            minimum = new_bounds[i + 1]
-            sel1 = Ih <= maximum
-            sel2 = Ih > minimum
-            sel = sel1 & sel2
-            self.binning_info["mean_intensities"] = np.append(
-                self.binning_info["mean_intensities"], [np.mean(Ih[sel])]
+
+        # remove any undersampled bins, relabelling the remaining bins
+        keep = refl_per_bin >= min_per_bin - 5
+        if not keep.all():
+            new_index = np.cumsum(keep) - 1
+            in_kept_bin = bin_index >= 0
+            in_kept_bin[in_kept_bin] = keep[bin_index[in_kept_bin]]
+            bin_index = np.where(in_kept_bin, new_index[bin_index], -1)
+            self.binning_info["bin_boundaries"] = np.append(
+                self.binning_info["bin_boundaries"][:-1][keep],
+                [self.binning_info["bin_boundaries"][-1]],
             )
-        return new_sum_matrix
+        self.binning_info["refl_per_bin"] = refl_per_bin[keep]
+        n_bins = int(np.count_nonzero(keep))
+        self.bin_index = bin_index
+        self._binned = bin_index >= 0
+
+        new_bounds = self.binning_info["bin_boundaries"]
+        self.binning_info["mean_intensities"] = np.array(
+            [
+                np.mean(Ih[(Ih <= new_bounds[i]) & (Ih > new_bounds[i + 1])])
+                for i in range(len(new_bounds) - 1)
+            ],
+            dtype=float,
+        )
+        rows = np.nonzero(self._binned)[0]
+        return csr_matrix(
+            (np.full(rows.size, 1.0), (rows, bin_index[rows])), shape=(n, n_bins)
+        )
+
+    def sum_in_bins(self, values: np.array) -> np.array:
+        """Sum an array of per-reflection values within each intensity bin."""
+        return np.bincount(
+            self.bin_index[self._binned],
+            weights=values[self._binned],
+            minlength=self.binning_info["refl_per_bin"].size,
+        )
 
     def calculate_bin_variances(self) -> np.array:
         """Calculate the variance of each bin."""
-        sum_deltasq = flumpy.to_numpy(
-            flumpy.from_numpy(np.square(self.delta_hl)) * self.summation_matrix
-        )
-        sum_delta_sq = np.square(
-            flumpy.to_numpy(flumpy.from_numpy(self.delta_hl) * self.summation_matrix)
-        )
+        sum_deltasq = self.sum_in_bins(np.square(self.delta_hl))
+        sum_delta_sq = np.square(self.sum_in_bins(self.delta_hl))
         bin_vars = (sum_deltasq / self.binning_info["refl_per_bin"]) - (
             sum_delta_sq / np.square(self.binning_info["refl_per_bin"])
         )
@@ -165,7 +165,7 @@ def calculate_gradients(self, apm):
         g_hl = Ih_table.inverse_scale_factors
         weights = self.error_model.binner.weights
         bin_vars = self.error_model.binner.bin_variances
-        sum_matrix = self.error_model.binner.summation_matrix
+        binner = self.error_model.binner
         bin_counts = self.error_model.binner.binning_info["refl_per_bin"]
         dsig_dc = (
             b
@@ -180,14 +180,9 @@ def calculate_gradients(self, apm):
         dphi_by_dvar = -2.0 * (
             np.full(bin_vars.size, 0.5) - bin_vars + (1.0 / (2.0 * np.square(bin_vars)))
         )
-        term1 = flumpy.to_numpy(
-            flumpy.from_numpy(2.0 * self.error_model.binner.delta_hl * deriv)
-            * sum_matrix
-        )
-        term2a = flumpy.to_numpy(
-            flumpy.from_numpy(self.error_model.binner.delta_hl) * sum_matrix
-        )
-        term2b = flumpy.to_numpy(flumpy.from_numpy(deriv) * sum_matrix)
+        term1 = binner.sum_in_bins(2.0 * binner.delta_hl * deriv)
+        term2a = binner.sum_in_bins(binner.delta_hl)
+        term2b = binner.sum_in_bins(deriv)
         grad = dphi_by_dvar * (
             (term1 / bin_counts) - (2.0 * term2a * term2b / np.square(bin_counts))
         )
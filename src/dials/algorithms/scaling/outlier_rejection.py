@@ -18,7 +18,7 @@
 from dxtbx import flumpy
 from scitbx.array_family import flex
 
-from dials.algorithms.scaling.Ih_table import IhTable
+from dials.algorithms.scaling.Ih_table import AsuIndexLookup, IhTable
 from dials.util.normalisation import quasi_normalisation
 from dials_scaling_ext import determine_outlier_indices, limit_outlier_weights
 
@@ -240,19 +240,14 @@ def _do_outlier_rejection(self):
         """Add indices (w.r.t. the Ih_table data) to self._outlier_indices."""
         Ih_table = self._Ih_table_block
         target = self._target_Ih_table_block
-        target_asu_Ih_dict = dict(
-            zip(target.asu_miller_index, zip(target.Ih_values, target.variances))
+        locations = AsuIndexLookup(target.asu_miller_index).find(
+            Ih_table.asu_miller_index
         )
+        matched = locations >= 0
         target_Ih_value = np.zeros(Ih_table.size)
         target_Ih_sigmasq = np.zeros(Ih_table.size)
-        for j, miller_idx in enumerate(Ih_table.asu_miller_index):
-            try:
-                vals = target_asu_Ih_dict[miller_idx]
-            except KeyError:
-                pass
-            else:
-                target_Ih_value[j] = vals[0]
-                target_Ih_sigmasq[j] = vals[1]
+        target_Ih_value[matched] = target.Ih_values[locations[matched]]
+        target_Ih_sigmasq[matched] = target.variances[locations[matched]]
 
         nz_sel = target_Ih_value != 0.0
         target_Ih_value = target_Ih_value[nz_sel]
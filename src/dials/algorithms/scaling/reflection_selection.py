@@ -65,12 +65,13 @@
 from __future__ import annotations
 
 import logging
+import time
 from math import floor
 
 import numpy as np
+from scipy.sparse import csc_matrix
 
 from dxtbx import flumpy
-from scitbx import sparse
 
 from dials.algorithms.scaling.scaling_utilities import (
     BadDatasetForScalingException,
@@ -82,12 +83,6 @@
 logger = logging.getLogger("dials")
 
 
-def _build_class_matrix(class_index, class_matrix, offset=0):
-    for i, val in enumerate(class_index, start=offset):
-        class_matrix[val, i] = 1.0
-    return class_matrix
-
-
 def _select_groups_on_Isigma_cutoff(Ih_table, cutoff=2.0):
     """Select groups with multiplicity>1, Isigma>cutoff"""
     sumIsigm = Ih_table.sum_in_groups(
@@ -125,26 +120,29 @@ def _select_groups_on_Isigma_cutoff(Ih_table, cutoff=2.0):
 def _perform_quasi_random_selection(
     Ih_table, n_datasets, min_per_class, min_total, max_total
 ):
-    class_matrix = sparse.matrix(n_datasets, Ih_table.size)
-    class_matrix = _build_class_matrix(
-        flumpy.from_numpy(Ih_table.Ih_table["dataset_id"].to_numpy()), class_matrix
+    # matrix of dataset index vs reflections, summed to give the matrix of
+    # dataset index vs asu groups
+    class_matrix = csc_matrix(
+        (
+            np.full(Ih_table.size, 1.0),
+            (Ih_table.Ih_table["dataset_id"].to_numpy(), np.arange(Ih_table.size)),
+        ),
+        shape=(n_datasets, Ih_table.size),
     )
-    segments_in_groups = class_matrix * Ih_table.h_index_matrix
-    total = flex.double(segments_in_groups.n_cols, 0)
-    for i, col in enumerate(segments_in_groups.cols()):
-        total[i] = col.non_zeroes
-    perm = flex.sort_permutation(total, reverse=True)
-    sorted_class_matrix = segments_in_groups.select_columns(perm)
-    # matrix of segment index vs asu groups
+    segments_in_groups = csc_matrix(Ih_table.sum_in_groups(class_matrix))
+    segments_in_groups.eliminate_zeros()
+    total = np.diff(segments_in_groups.indptr)
+    perm = np.argsort(-total, kind="stable")
+    sorted_class_matrix = segments_in_groups[:, perm]
 
     # now want to fill up until good coverage across board
     total_in_classes, cols_not_used = _loop_over_class_matrix(
         sorted_class_matrix, min_per_class, min_total, max_total
     )
 
-    cols_used = flex.bool(sorted_class_matrix.n_cols, True)
-    cols_used.set_selected(cols_not_used, False)
-    actual_cols_used = perm.select(cols_used)
+    cols_used = np.full(sorted_class_matrix.shape[1], True)
+    cols_used[flumpy.to_numpy(cols_not_used)] = False
+    actual_cols_used = perm[cols_used]
 
     # now need to get reflection selection
     reduced_Ih = Ih_table.select_on_groups(actual_cols_used)
@@ -166,6 +164,7 @@ def select_connected_reflections_across_datasets(
 ):
     """Select highly connected reflections across datasets."""
     assert Ih_table.n_work_blocks == 1
+    start_time = time.time()
     Ih_table = Ih_table.Ih_table_blocks[0]
     sel_Ih_table = _select_groups_on_Isigma_cutoff(Ih_table, Isigma_cutoff)
 
@@ -247,47 +246,97 @@ def select_connected_reflections_across_datasets(
     else:
         logger.info(tabulate(summary_rows, summary_header))
         logger.debug(tabulate(rows, header))
+    logger.info(
+        "Time taken for cross-dataset reflection selection %.2fs",
+        time.time() - start_time,
+    )
 
     return indices, dataset_ids
 
 
+class _ClassCandidates:
+    """
+    Track the columns of a sorted class matrix that are available for selection.
+
+    For each class (row), the columns with a nonzero entry in that class are
+    held in column order, forming a queue of candidates for that class. Columns
+    are taken from the front of the queues, skipping columns that have already
+    been used via another class, so that finding the next column for a class is
+    amortised constant time rather than a scan over all unused columns.
+    """
+
+    def __init__(self, class_matrix):
+        self.csc = csc_matrix(class_matrix, dtype=np.float64)
+        self.csc.eliminate_zeros()
+        self.csc.sort_indices()
+        csr = self.csc.tocsr()
+        csr.sort_indices()
+        self._row_ptr = csr.indptr
+        self._row_cols = csr.indices
+        self._next = csr.indptr[:-1].copy()
+        self.used = np.full(self.csc.shape[1], False)
+
+    def column(self, col):
+        """Return the dense vector of the column."""
+        dense = np.zeros(self.csc.shape[0])
+        start, end = self.csc.indptr[col], self.csc.indptr[col + 1]
+        dense[self.csc.indices[start:end]] = self.csc.data[start:end]
+        return dense
+
+    def take_column(self, col):
+        """Mark a column as used and return its dense vector."""
+        self.used[col] = True
+        return self.column(col)
+
+    def take_next_for_class(self, row):
+        """Take the first unused column with an entry in this class, if any."""
+        end = self._row_ptr[row + 1]
+        i = self._next[row]
+        while i < end and self.used[self._row_cols[i]]:
+            i += 1
+        self._next[row] = i
+        if i == end:
+            return None
+        return self.take_column(self._row_cols[i])
+
+    def any_unused(self):
+        return not self.used.all()
+
+    def unused(self):
+        return flex.size_t(np.nonzero(~self.used)[0].astype(np.uint64))
+
+
 def _loop_over_class_matrix(
     sorted_class_matrix, min_per_area, min_per_bin, max_per_bin
 ):
-    """Build up the reflection set by looping over the class matrix."""
-
-    def _get_next_row_needed(total_in_classes):
-        current_min = flex.min(total_in_classes)
-        for i, val in enumerate(total_in_classes):
-            if val == current_min:
-                row_needed = i
-                break
-        return row_needed
-
-    def _add_next_column(
-        cols_not_used, row_needed, sorted_class_matrix, total_in_classes
-    ):
-        for i, col in enumerate(cols_not_used):
-            if sorted_class_matrix.col(col)[row_needed] != 0.0:
-                total_in_classes += sorted_class_matrix.col(col).as_dense_vector()
-                del cols_not_used[i]
-                return cols_not_used, total_in_classes, True
-        # else couldn't find enough of this one!
-        return cols_not_used, total_in_classes, False
-
-    total_in_classes = sorted_class_matrix.col(0).as_dense_vector()
-    deficit = flex.double(sorted_class_matrix.n_rows, 0)
-    cols_not_used = flex.size_t(range(1, sorted_class_matrix.n_cols))
+    """Build up the reflection set by looping over the class matrix.
+
+    The class matrix is a (scipy) sparse matrix of classes vs symmetry groups,
+    sorted by connectedness. Returns the number of reflections chosen in each
+    class and the indices of the columns not used.
+    """
+
+    def _add_next_column(candidates, row_needed, total_in_classes):
+        column = candidates.take_next_for_class(row_needed)
+        if column is None:
+            # couldn't find enough of this one!
+            return total_in_classes, False
+        return total_in_classes + column, True
+
+    candidates = _ClassCandidates(sorted_class_matrix)
+    n_classes = candidates.csc.shape[0]
+    total_in_classes = candidates.take_column(0)
+    deficit = np.zeros(n_classes)
     total_deficit = 0
     while (
-        flex.min(total_in_classes) < min_per_area
-        and (flex.sum(total_in_classes) - total_deficit) < max_per_bin
+        total_in_classes.min() < min_per_area
+        and (total_in_classes.sum() - total_deficit) < max_per_bin
     ):
         # first find which class need most of
-        row_needed = _get_next_row_needed(total_in_classes)
+        row_needed = int(np.argmin(total_in_classes))
         # now try to add the most-connected column that includes that class
-        cols_not_used, total_in_classes, success = _add_next_column(
-            cols_not_used, row_needed, sorted_class_matrix, total_in_classes
+        total_in_classes, success = _add_next_column(
+            candidates, row_needed, total_in_classes
         )
         # return whether successful, updated totals and which cols are left.
         if not success:
@@ -296,36 +345,34 @@ def _add_next_column(
             deficit[row_needed] = min_per_area - current_in_row
             total_deficit += min_per_area - current_in_row
             total_in_classes[row_needed] = min_per_area
-        if flex.sum(total_in_classes) > max_per_bin:
+        if total_in_classes.sum() > max_per_bin:
             # if we have reached the maximum, then finish there
-            return total_in_classes - deficit, cols_not_used
+            return flex.double(total_in_classes - deficit), candidates.unused()
     total_in_classes -= deficit
-    n = flex.sum(total_in_classes)
+    n = total_in_classes.sum()
     # if we haven't reached the minimum total, then need to add more until we
     # reach it or run out of reflections
-    if n < min_per_bin and cols_not_used:
+    if n < min_per_bin and candidates.any_unused():
         # how many have deficit? (i.e. no more left?)
-        c = sum(1 for d in deficit if d != 0.0)
-        n_classes = sorted_class_matrix.n_rows
+        c = np.count_nonzero(deficit)
         multiplier = int(floor(min_per_bin * (n_classes - c) / (n * n_classes)) + 1)
         new_limit = min_per_area * multiplier  # new limit per area
 
-        for i, d in enumerate(deficit):
-            if d != 0.0:
-                # don't want to be searching for those classes that we know dont have any left
-                total_in_classes[i] = new_limit
-                deficit[i] = d + new_limit - min_per_area
-        while cols_not_used and flex.min(total_in_classes) < new_limit:
-            row_needed = _get_next_row_needed(total_in_classes)
-            cols_not_used, total_in_classes, success = _add_next_column(
-                cols_not_used, row_needed, sorted_class_matrix, total_in_classes
+        # don't want to be searching for those classes that we know dont have any left
+        has_deficit = deficit != 0.0
+        total_in_classes[has_deficit] = new_limit
+        deficit[has_deficit] += new_limit - min_per_area
+        while candidates.any_unused() and total_in_classes.min() < new_limit:
+            row_needed = int(np.argmin(total_in_classes))
+            total_in_classes, success = _add_next_column(
+                candidates, row_needed, total_in_classes
             )
             if not success:
                 current_in_row = total_in_classes[row_needed]
                 deficit[row_needed] = new_limit - current_in_row
                 total_in_classes[row_needed] = new_limit
-        return total_in_classes - deficit, cols_not_used
-    return total_in_classes, cols_not_used
+        return flex.double(total_in_classes - deficit), candidates.unused()
+    return flex.double(total_in_classes), candidates.unused()
 
 
 def _determine_Isigma_selection(reflection_table, params):
@@ -33,6 +33,11 @@
         stdcutoff = 4.0
             .type = float
             .help = "Datasets with a ΔCC½ below (mean - stdcutoff*std) are removed"
+        warm_start = True
+            .type = bool
+            .help = "Keep the scalers of datasets unchanged by a filtering cycle, "
+                    "so that only datasets with image ranges removed are "
+                    "reinitialised for the next cycle of scaling."
     }
     output {
         scale_and_filter_results = "scale_and_filter_results.json"
@@ -44,6 +44,7 @@
     select_connected_reflections_across_datasets,
 )
 from dials.algorithms.scaling.scaling_library import (
+    choose_initial_scaling_intensities,
     merging_stats_from_scaled_array,
     scaled_data_as_miller_array,
 )
@@ -891,6 +892,37 @@ def clean_reflection_table(self):
         )
         self._reflection_table.set_flags(~bad, self.reflection_table.flags.scaled)
 
+    def reset_reflection_table(self, reflection_table):
+        """
+        Reinitialise the scaler with a new table of the same reflections.
+
+        This allows the scaler to be reused for a further round of scaling,
+        after the reflection tables have been prepared for output, keeping the
+        configured model components and the current outliers. The initial
+        intensities are restored and, as when initialising for a multi-dataset
+        scaler, the Ih_table is left to be created by the multi-dataset scaler.
+        """
+        self._reflection_table = choose_initial_scaling_intensities(
+            reflection_table, self.params.reflection_selection.intensity_choice
+        )
+        self._initial_keys = list(self._reflection_table.keys())
+        n_model_params = sum(val.n_params for val in self.components.values())
+        self._var_cov_matrix = sparse.matrix(n_model_params, n_model_params)
+        self._Ih_table = None
+        self._global_Ih_table = None
+        self._free_Ih_table = None
+        if self.params.weighting.error_model.error_model:
+            self.experiment.scaling_model.load_error_model(
+                self.params.weighting.error_model
+            )
+            self._update_error_model(
+                self.experiment.scaling_model.error_model, update_Ih=False
+            )
+        if "Imid" in self.experiment.scaling_model.configdict:
+            self._combine_intensities(self.experiment.scaling_model.configdict["Imid"])
+        self.scaling_subset_sel = None
+        self.scaling_selection = ~self.outliers
+
 
 class MultiScalerBase(ScalerBase):
     """Base class for scalers handling multiple datasets."""
@@ -1,38 +1,107 @@
 from __future__ import annotations
 
+import concurrent.futures
 
-def filter_shadowed_reflections(experiments, reflections, experiment_goniometer=False):
+import numpy as np
+
+from dxtbx import flumpy
+
+_worker_experiments = None
+
+
+def _init_shadow_worker(experiments):
+    global _worker_experiments
+    _worker_experiments = experiments
+
+
+def _project_extrema(experiments, expt_id, array_indices):
+    """The shadow polygons on each panel at each of the given array indices"""
+    expt = experiments[expt_id]
+    masker = expt.imageset.masker()
+    return [
+        masker.project_extrema(
+            expt.detector, expt.scan.get_angle_from_array_index(int(i))
+        )
+        for i in array_indices
+    ]
+
+
+def _project_extrema_worker(args):
+    expt_id, array_indices = args
+    return _project_extrema(_worker_experiments, expt_id, array_indices)
+
+
+def filter_shadowed_reflections(
+    experiments, reflections, experiment_goniometer=False, nproc=1
+):
+    """
+    Flag the reflections whose predicted positions lie within the goniometer
+    shadow on the image on which they are predicted.
+
+    The reflections are sorted once by image and panel, and the shadow is
+    projected once for each image on which reflections are predicted,
+    optionally using nproc processes.
+    """
     from dxtbx.masking import is_inside_polygon
     from scitbx.array_family import flex
 
     shadowed = flex.bool(reflections.size(), False)
-    for expt_id in range(len(experiments)):
-        expt = experiments[expt_id]
-        imageset = expt.imageset
-        masker = imageset.masker()
-        detector = expt.detector
-        sel = reflections["id"] == expt_id
-        isel = sel.iselection()
-        x, y, z = reflections["xyzcal.px"].select(isel).parts()
+    ids = flumpy.to_numpy(reflections["id"])
+    panels = flumpy.to_numpy(reflections["panel"]).astype(np.int64)
+    x, y, z = reflections["xyzcal.px"].parts()
+    image = np.floor(flumpy.to_numpy(z))
+
+    # Group the reflections of each experiment by image and panel
+    groups = []
+    for expt_id, expt in enumerate(experiments):
         start, end = expt.scan.get_array_range()
-        for i in range(start, end):
-            shadow = masker.project_extrema(
-                detector, expt.scan.get_angle_from_array_index(i)
+        n_panels = len(expt.detector)
+        isel = np.flatnonzero((ids == expt_id) & (image >= start) & (image < end))
+        key = (image[isel].astype(np.int64) - start) * n_panels + panels[isel]
+        order = np.argsort(key, kind="stable")
+        isel = isel[order]
+        keys, group_starts = np.unique(key[order], return_index=True)
+        group_ends = np.append(group_starts[1:], len(isel))
+        groups.append(
+            (isel, keys // n_panels + start, keys % n_panels, group_starts, group_ends)
+        )
+
+    # Project the shadow once for each image on which there are reflections,
+    # sharing the images of each experiment between the processes
+    chunks = []
+    for expt_id, (_, array_indices, _, _, _) in enumerate(groups):
+        array_indices = np.unique(array_indices)
+        if len(array_indices):
+            n_chunks = min(len(array_indices), 4 * nproc) if nproc > 1 else 1
+            chunks.extend(
+                (expt_id, chunk) for chunk in np.array_split(array_indices, n_chunks)
+            )
+    if nproc > 1 and len(chunks) > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=nproc,
+            initializer=_init_shadow_worker,
+            initargs=(experiments,),
+        ) as pool:
+            results = list(pool.map(_project_extrema_worker, chunks))
+    else:
+        results = [_project_extrema(experiments, *chunk) for chunk in chunks]
+    shadows = {}
+    for (expt_id, array_indices), chunk_shadows in zip(chunks, results):
+        shadows.update(zip(((expt_id, i) for i in array_indices), chunk_shadows))
+
+    for expt_id, (isel, array_indices, p_ids, group_starts, group_ends) in enumerate(
+        groups
+    ):
+        for i, p_id, group_start, group_end in zip(
+            array_indices, p_ids, group_starts, group_ends
+        ):
+            shadow = shadows[(expt_id, i)][p_id]
+            if shadow.size() < 4:
+                continue
+            group_isel = flex.size_t(isel[group_start:group_end].astype(np.uint64))
+            inside = is_inside_polygon(
+                shadow, flex.vec2_double(x.select(group_isel), y.select(group_isel))
             )
-            img_sel = (z >= i) & (z < (i + 1))
-            img_isel = img_sel.iselection()
-            for p_id in range(len(detector)):
-                panel = reflections["panel"].select(img_isel)
-                if shadow[p_id].size() < 4:
-                    continue
-                panel_isel = img_isel.select(panel == p_id)
-                inside = is_inside_polygon(
-                    shadow[p_id],
-                    flex.vec2_double(
-                        x.select(isel.select(panel_isel)),
-                        y.select(isel.select(panel_isel)),
-                    ),
-                )
-                shadowed.set_selected(panel_isel, inside)
+            shadowed.set_selected(group_isel, inside)
 
     return shadowed
@@ -17,6 +17,7 @@
 from cctbx.array_family import flex
 
 from dials.algorithms.scaling.scaling_library import ExtendedDatasetStatistics
+from dials.util import asu_index_cache
 
 logger = logging.getLogger(__name__)
 
@@ -287,11 +288,11 @@ def _compute_rij_wij_ccweights(self):
         # this once per cb_op instead of on-the-fly every time we need it.
         indices = {}
         epsilons = {}
-        space_group_type = self._data.space_group().type()
         for cb_op in self.sym_ops:
             cb_op = sgtbx.change_of_basis_op(cb_op)
-            indices_reindexed = cb_op.apply(self._data.indices())
-            miller.map_to_asu(space_group_type, False, indices_reindexed)
+            indices_reindexed = asu_index_cache.map_indices_to_asu(
+                self._data.indices(), self._data.space_group(), cb_op
+            )
             cb_op_str = cb_op.as_xyz()
             indices[cb_op_str] = indices_reindexed
             epsilons[cb_op_str] = self._patterson_group.epsilon(indices_reindexed)
@@ -363,11 +364,11 @@ def _compute_rij_wij(self, use_cache=True):
         # this once per cb_op instead of on-the-fly every time we need it.
         indices = {}
         epsilons = {}
-        space_group_type = self._data.space_group().type()
         for cb_op in self.sym_ops:
             cb_op = sgtbx.change_of_basis_op(cb_op)
-            indices_reindexed = cb_op.apply(self._data.indices())
-            miller.map_to_asu(space_group_type, False, indices_reindexed)
+            indices_reindexed = asu_index_cache.map_indices_to_asu(
+                self._data.indices(), self._data.space_group(), cb_op
+            )
             cb_op_str = cb_op.as_xyz()
             indices[cb_op_str] = np.array(
                 [
@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import concurrent.futures
 import json
 import logging
 import math
 
+import numpy as np
 import scipy.stats
 
 import libtbx
@@ -15,6 +17,7 @@
 
 import dials.util
 from dials.algorithms.symmetry import symmetry_base
+from dials.util import asu_index_cache
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +43,7 @@ def __init__(
         relative_length_tolerance=None,
         absolute_angle_tolerance=None,
         best_monoclinic_beta=True,
+        nproc=1,
     ):
         """Initialise a LaueGroupAnalysis object.
 
@@ -66,7 +70,10 @@ def __init__(
           best_monoclinic_beta (bool): If True, then for monoclinic centered cells, I2
             will be preferred over C2 if it gives a less oblique cell (i.e. smaller
             beta angle).
+          nproc (int): The number of processes to use for scoring the symmetry
+            elements.
         """
+        self._nproc = nproc
         super().__init__(
             intensities,
             normalisation=normalisation,
@@ -143,19 +150,35 @@ def _estimate_cc_sig_fac(self):
             self.cc_sig_fac = 0
             return
 
-        mean_ccs = flex.double()
-        rms_ccs = flex.double()
-        ns = flex.double()
-        for n in range(min_n_group, max_n_group + 1):
-            ns.append(n)
-            ccs = flex.double()
-            for i in range(200):
-                isel = flex.random_selection(a.size(), n)
-                corr = CorrelationCoefficientAccumulator(a.select(isel), b.select(isel))
-                ccs.append(corr.coefficient())
-
-            mean_ccs.append(flex.mean(ccs))
-            rms_ccs.append(flex.mean(flex.pow2(ccs)) ** 0.5)
+        # Take the random subsets of each size n as the first n pairs of random
+        # orderings of max_n_group pairs, so that the correlation coefficients for
+        # all subset sizes follow from cumulative sums. As the subsets of different
+        # sizes are then not independent, use more draws than the 200 per size
+        # that would otherwise be needed for a comparably stable fit.
+        # The generator is seeded from the flex random number generator, so that
+        # results remain reproducible for a given flex.set_random_seed().
+        n_draws = 1000
+        rng = np.random.default_rng(flex.random_size_t(1, 2**31)[0])
+        a_np = a.as_numpy_array()
+        b_np = b.as_numpy_array()
+        isel = np.array(
+            [rng.choice(a_np.size, max_n_group, replace=False) for _ in range(n_draws)]
+        )
+        a_sel = a_np[isel]
+        b_sel = b_np[isel]
+        n = np.arange(1, max_n_group + 1)
+        sum_x = np.cumsum(a_sel, axis=1)
+        sum_y = np.cumsum(b_sel, axis=1)
+        sum_xy = np.cumsum(a_sel * b_sel, axis=1)
+        sum_x_sq = np.cumsum(a_sel * a_sel, axis=1)
+        sum_y_sq = np.cumsum(b_sel * b_sel, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ccs = (n * sum_xy - sum_x * sum_y) / (
+                np.sqrt(n * sum_x_sq - sum_x**2) * np.sqrt(n * sum_y_sq - sum_y**2)
+            )
+        ccs = ccs[:, min_n_group - 1 :]
+        ns = flex.double(n[min_n_group - 1 :].astype(np.float64))
+        rms_ccs = flex.double(np.sqrt(np.mean(ccs**2, axis=0)))
 
         x = 1 / flex.pow(ns, 0.5)
         y = rms_ccs
@@ -179,9 +202,9 @@ def _estimate_cc_true(self):
 
         # (ii)
 
-        reindexed_intensities = self.intensities.change_basis(
-            sgtbx.change_of_basis_op("-x,-y,-z")
-        ).map_to_asu()
+        reindexed_intensities = _reindex_to_asu(
+            self.intensities, sgtbx.change_of_basis_op("-x,-y,-z")
+        )
         x, y = self.intensities.common_sets(
             reindexed_intensities, assert_is_similar_symmetry=False
         )
@@ -211,15 +234,32 @@ def _estimate_cc_true(self):
         logger.debug("cc_true: %g", self.cc_true)
 
     def _score_symmetry_elements(self):
-        self.sym_op_scores = []
-        for smx in self.lattice_group.smx():
-            if smx.r().info().sense() < 0:
-                continue
-            self.sym_op_scores.append(
+        sym_ops = [
+            smx for smx in self.lattice_group.smx() if smx.r().info().sense() >= 0
+        ]
+        if self._nproc > 1 and len(sym_ops) > 1:
+            # Send the intensities to each worker once, rather than with every
+            # symmetry element
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(self._nproc, len(sym_ops)),
+                initializer=_init_score_symmetry_element_worker,
+                initargs=(self.intensities,),
+            ) as pool:
+                self.sym_op_scores = list(
+                    pool.map(
+                        _score_symmetry_element_worker,
+                        sym_ops,
+                        [self.cc_true] * len(sym_ops),
+                        [self.cc_sig_fac] * len(sym_ops),
+                    )
+                )
+        else:
+            self.sym_op_scores = [
                 ScoreSymmetryElement(
                     self.intensities, smx, self.cc_true, self.cc_sig_fac
                 )
-            )
+                for smx in sym_ops
+            ]
 
     def _score_laue_groups(self):
         subgroup_scores = [
@@ -411,6 +451,33 @@ def as_json(self, filename=None, indent=2):
         return json_str
 
 
+def _reindex_to_asu(intensities, cb_op):
+    """Equivalent to intensities.change_basis(cb_op).map_to_asu(), using the
+    shared cache of indices mapped to the asymmetric unit."""
+    crystal_symmetry = intensities.crystal_symmetry().change_basis(cb_op)
+    indices = asu_index_cache.map_indices_to_asu(
+        intensities.indices(),
+        crystal_symmetry.space_group(),
+        cb_op,
+        anomalous=bool(intensities.anomalous_flag()),
+    )
+    return intensities.customized_copy(
+        crystal_symmetry=crystal_symmetry, indices=indices
+    )
+
+
+_worker_intensities = None
+
+
+def _init_score_symmetry_element_worker(intensities):
+    global _worker_intensities
+    _worker_intensities = intensities
+
+
+def _score_symmetry_element_worker(sym_op, cc_true, cc_sig_fac):
+    return ScoreSymmetryElement(_worker_intensities, sym_op, cc_true, cc_sig_fac)
+
+
 class ScoreCorrelationCoefficient:
     def __init__(self, cc, sigma_cc, expected_cc, lower_bound=-1, upper_bound=1, k=2):
         self.cc = cc
@@ -510,7 +577,7 @@ def __init__(self, intensities, sym_op, cc_true, cc_sig_fac):
         for cb_op in cb_ops:
             if cb_op.is_identity_op():
                 cb_op = sgtbx.change_of_basis_op("-x,-y,-z")
-            reindexed_intensities = intensities.change_basis(cb_op).map_to_asu()
+            reindexed_intensities = _reindex_to_asu(intensities, cb_op)
             x, y = intensities.common_sets(
                 reindexed_intensities, assert_is_similar_symmetry=False
             )
@@ -28,6 +28,9 @@
 threshold = 5000
   .type = float(value_min=0)
   .help = 'Threshold value for the clustering'
+nproc = 1
+  .type = int(value_min=1)
+  .help = 'The number of processes used to calculate the distances between cells'
 plot {
   show = False
     .type = bool
@@ -184,6 +187,7 @@ def do_cluster_analysis(crystal_symmetries, params):
         threshold=params.threshold,
         ax=ax,
         no_plot=no_plot,
+        nproc=params.nproc,
     )
     print(clustering)
 
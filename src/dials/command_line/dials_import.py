@@ -21,7 +21,11 @@
 
 from dials.util import Sorry, log, show_mail_handle_errors
 from dials.util.multi_dataset_handling import generate_experiment_identifiers
-from dials.util.options import ArgumentParser, flatten_experiments
+from dials.util.options import (
+    ArgumentParser,
+    flatten_experiments,
+    read_experiments_from_filenames,
+)
 from dials.util.version import dials_version
 
 logger = logging.getLogger("dials.command_line.import")
@@ -149,6 +153,13 @@ def _pickle_load(fh):
       .type = bool
       .help = "If False, raise an error if multiple sequences are found"
 
+    nproc = 1
+      .type = int(value_min=1)
+      .help = "The number of processes used to read the image headers. Still"
+              "images may then be imported as more than one imageset, and"
+              "equal beam and detector models of still images read by"
+              "different processes are not shared."
+
   }
 
   include scope dials.util.options.format_phil_scope
@@ -227,8 +238,10 @@ def _extract_or_read_imagesets(params):
                     % params.input.experiments
                 )
         elif len(params.input.directory) > 0:
-            experiments = ExperimentListFactory.from_filenames(
-                params.input.directory, format_kwargs=format_kwargs
+            experiments = read_experiments_from_filenames(
+                params.input.directory,
+                nproc=params.input.nproc,
+                format_kwargs=format_kwargs,
             )
             if len(experiments) == 0:
                 raise Sorry(
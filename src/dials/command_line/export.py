@@ -201,6 +201,16 @@
       .type = str
       .help = "Short name for source, perhaps the acronym"
 
+    compression = *gzip lzf none
+      .type = choice
+      .help = "The HDF5 compression filter applied to the reflection columns"
+      .expert_level = 1
+
+    chunk_size = 65536
+      .type = int(value_min=1)
+      .help = "The number of reflections in each chunk of the reflection columns"
+      .expert_level = 1
+
   }
 
   mmcif {
@@ -39,6 +39,11 @@
     .type = bool
     .help = "Ignore dynamic shadowing"
 
+  nproc = 1
+    .type = int(value_min=1)
+    .help = "The number of processes used to project the dynamic shadow, if"
+            "shadows are not ignored"
+
   buffer_size = 0
     .type = int
     .help = "Calculate predictions within a buffer zone of n images either"
@@ -127,7 +132,10 @@ def run(self, args=None):
                     f"Unable to read image data. Please check {e.filename} is accessible"
                 )
             shadowed = filter_shadowed_reflections(
-                experiments, predicted_all, experiment_goniometer=True
+                experiments,
+                predicted_all,
+                experiment_goniometer=True,
+                nproc=params.nproc,
             )
             predicted_all = predicted_all.select(~shadowed)
 
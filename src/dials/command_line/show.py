@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import concurrent.futures
+import contextlib
 import os
 import sys
 
@@ -56,6 +58,14 @@
   show_raw = False
     .type = bool
     .help = "Show statistics on the distribution of values in each raw image"
+  per_panel = False
+    .type = bool
+    .help = "Show the statistics for each panel separately, rather than for all"
+            "panels of the image together"
+  nproc = 1
+    .type = int(value_min=1)
+    .help = "The number of processes used to read the images and calculate"
+            "the statistics"
 }
 max_reflections = None
   .type = int
@@ -225,10 +235,20 @@ def run(args=None):
         print(show_experiments(experiments, show_scan_varying=params.show_scan_varying))
 
         if params.image_statistics.show_raw:
-            show_image_statistics(experiments, "raw")
+            show_image_statistics(
+                experiments,
+                "raw",
+                nproc=params.image_statistics.nproc,
+                per_panel=params.image_statistics.per_panel,
+            )
 
         if params.image_statistics.show_corrected:
-            show_image_statistics(experiments, "corrected")
+            show_image_statistics(
+                experiments,
+                "corrected",
+                nproc=params.image_statistics.nproc,
+                per_panel=params.image_statistics.per_panel,
+            )
 
         if params.show_shared_models:
             print()
@@ -312,7 +332,40 @@ def show_experiments(experiments, show_scan_varying=False):
     return "\n".join(text)
 
 
-def show_image_statistics(experiments, im_type):
+def _image_statistics(imageset, i, raw, per_panel):
+    """Calculate the five number summary of the values in one image, either for
+    all panels together, or for each panel in turn"""
+    identifier = os.path.basename(imageset.get_image_identifier(i))
+    if raw:
+        pnl_data = imageset.get_raw_data(i)
+    else:
+        pnl_data = imageset.get_corrected_data(i)
+    if not isinstance(pnl_data, tuple):
+        pnl_data = (pnl_data,)
+    if per_panel:
+        return identifier, [five_number_summary(p.as_1d()) for p in pnl_data]
+    flat_data = pnl_data[0].as_1d()
+    for p in pnl_data[1:]:
+        flat_data.extend(p.as_1d())
+    return identifier, [five_number_summary(flat_data)]
+
+
+_worker_experiments = None
+
+
+def _init_image_statistics_worker(experiments_json):
+    global _worker_experiments
+    _worker_experiments = ExperimentListFactory.from_json(
+        experiments_json, check_format=True
+    )
+
+
+def _image_statistics_worker(args):
+    i_expt, i, raw, per_panel = args
+    return _image_statistics(_worker_experiments[i_expt].imageset, i, raw, per_panel)
+
+
+def show_image_statistics(experiments, im_type, nproc=1, per_panel=False):
     if im_type == "raw":
         raw = True
     elif im_type == "corrected":
@@ -331,25 +384,43 @@ def show_image_statistics(experiments, im_type):
             f"Unable to read image data. Please check {e.filename} is accessible"
         )
 
+    images = [
+        (i_expt, i)
+        for i_expt, expt in enumerate(experiments)
+        for i in range(len(expt.imageset))
+    ]
     print(f"Five number summary of the {im_type} images")
-    for i_expt, expt in enumerate(experiments):
-        for i in range(len(expt.imageset)):
-            identifier = os.path.basename(expt.imageset.get_image_identifier(i))
-            if raw:
-                pnl_data = expt.imageset.get_raw_data(i)
-            else:
-                pnl_data = expt.imageset.get_corrected_data(i)
-            if not isinstance(pnl_data, tuple):
-                pnl_data = (pnl_data,)
-            flat_data = pnl_data[0].as_1d()
-            for p in pnl_data[1:]:
-                flat_data.extend(p.as_1d())
-            fns = five_number_summary(flat_data)
-            print(
-                "{}: Min: {:.1f} Q1: {:.1f} Med: {:.1f} Q3: {:.1f} Max: {:.1f}".format(
-                    identifier, *fns
+    with contextlib.ExitStack() as stack:
+        if nproc > 1 and len(images) > 1:
+            # Each worker process loads the experiments once, then the results
+            # are printed in image order as they become available
+            pool = stack.enter_context(
+                concurrent.futures.ProcessPoolExecutor(
+                    max_workers=nproc,
+                    initializer=_init_image_statistics_worker,
+                    initargs=(experiments.as_json(),),
                 )
             )
+            results = pool.map(
+                _image_statistics_worker,
+                [(i_expt, i, raw, per_panel) for i_expt, i in images],
+            )
+        else:
+            results = (
+                _image_statistics(experiments[i_expt].imageset, i, raw, per_panel)
+                for i_expt, i in images
+            )
+        for identifier, summaries in results:
+            for i_panel, fns in enumerate(summaries):
+                if per_panel:
+                    label = f"{identifier} panel {i_panel}"
+                else:
+                    label = identifier
+                print(
+                    "{}: Min: {:.1f} Q1: {:.1f} Med: {:.1f} Q3: {:.1f} Max: {:.1f}".format(
+                        label, *fns
+                    )
+                )
 
 
 def model_connectivity(experiments):
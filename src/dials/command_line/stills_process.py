@@ -4,6 +4,7 @@
 import copy
 import glob
 import logging
+import multiprocessing
 import os
 import pickle
 import sys
@@ -11,6 +12,7 @@
 import time
 from io import BytesIO
 
+from dxtbx import flumpy
 from dxtbx.model.experiment_list import (
     Experiment,
     ExperimentList,
@@ -121,6 +123,22 @@ def _control_phil_str():
               concatenated list of all the successful events examined by that process. \
               If False, output a separate experiment/reflection file per image (generates a \
               lot of files).
+    composite_chunk {
+      images = None
+        .type = int(value_min=1)
+        .help = If composite_output is True, write the composite files after \
+                this many images and start a new set of composite files. The \
+                chunk number is appended to the composite tag of each file,  \
+                and each image tag is listed with its chunk in the file      \
+                idx-<process>_composite_index.txt. If None, and size_mb is   \
+                None, the composite files are only written when all images   \
+                have been processed.
+      size_mb = None
+        .type = float(value_min=0)
+        .help = If composite_output is True, write the composite files and   \
+                start a new set of composite files once the estimated size   \
+                of the accumulated reflections exceeds this many megabytes.
+    }
     logging_dir = None
       .type = str
       .help = Directory output log files will be placed
@@ -178,6 +196,12 @@ def _control_phil_str():
               then each group of 25 process will send their results to 4     \
               processes and only N*4 files will be created. Ideally, match   \
               stride to the number of processors per node.
+    batch_size = 1
+      .type = int(value_min=1)
+      .help = For MPI with more than two ranks, the number of images the  \
+              server sends to a client rank per request. Clients request   \
+              their next batch before processing the current one, so that \
+              the round trip to the server overlaps with processing.
     debug
       .expert_level = 2
     {
@@ -714,7 +738,7 @@ def do_work(i, item_list, processor=None, finalize=True):
                     imagesets = experiments.imagesets()
                     if len(imagesets) == 0 or len(imagesets[0]) == 0:
                         logger.info("Zero length imageset in file: %s", filename)
-                        return
+                        continue
                     if len(imagesets) > 1:
                         raise Abort(f"Found more than one imageset in file: {filename}")
                     if len(imagesets[0]) > 1:
@@ -790,18 +814,28 @@ def process_this_event(nevent):
                 if rank == 0:
                     # server process
                     num_iter = len(iterable)
-                    for item_num, item in enumerate(iterable):
-                        print(
-                            "Processing %d / %d shots" % (item_num, num_iter),
-                            flush=True,
-                        )
-                        if process_fractions and not process_this_event(item_num):
-                            continue
-
+                    items = iter(enumerate(iterable))
+                    while True:
+                        batch = []
+                        for item_num, item in items:
+                            print(
+                                "Processing %d / %d shots" % (item_num, num_iter),
+                                flush=True,
+                            )
+                            if process_fractions and not process_this_event(item_num):
+                                continue
+                            batch.append(item)
+                            if len(batch) == params.mp.batch_size:
+                                break
+                        if not batch:
+                            break
                         print("Getting next available process")
                         rankreq = comm.recv(source=MPI.ANY_SOURCE)
-                        print(f"Process {rankreq} is ready, sending {item[0]}\n")
-                        comm.send(item, dest=rankreq)
+                        print(
+                            f"Process {rankreq} is ready, sending {len(batch)} "
+                            f"shots starting with {batch[0][0]}\n"
+                        )
+                        comm.send(batch, dest=rankreq)
                     # send a stop command to each process
                     print("MPI DONE, sending stops\n")
                     for rankreq in range(size - 1):
@@ -812,35 +846,59 @@ def process_this_event(nevent):
 
                 else:
                     # client process
-                    while True:
-                        # inform the server this process is ready for an event
+                    # inform the server this process is ready for an event
+                    print("Rank %d getting next task" % rank)
+                    comm.send(rank, dest=0)
+                    print("Rank %d waiting for response" % rank)
+                    batch = comm.recv(source=0)
+                    while batch != "endrun":
+                        # request the next batch before processing this one, so
+                        # that it is ready as soon as this batch is done
                         print("Rank %d getting next task" % rank)
-                        comm.send(rank, dest=0)
-                        print("Rank %d waiting for response" % rank)
-                        item = comm.recv(source=0)
-                        if item == "endrun":
-                            print("Rank %d received endrun" % rank)
-                            break
+                        request = comm.isend(rank, dest=0)
                         print("Rank %d beginning processing" % rank)
-                        try:
-                            processor = do_work(rank, [item], processor, finalize=False)
-                        except Exception as e:
-                            print(
-                                "Rank %d unhandled exception processing event" % rank,
-                                str(e),
-                            )
+                        for item in batch:
+                            try:
+                                do_work(rank, [item], processor, finalize=False)
+                            except Exception as e:
+                                print(
+                                    "Rank %d unhandled exception processing event"
+                                    % rank,
+                                    str(e),
+                                )
                         print("Rank %d event processed" % rank)
+                        request.wait()
+                        print("Rank %d waiting for response" % rank)
+                        batch = comm.recv(source=0)
+                    print("Rank %d received endrun" % rank)
                 processor.finalize()
         else:
-            from dxtbx.command_line.image_average import splitit
-
             if params.mp.nproc == 1:
                 do_work(0, iterable)
             else:
+                # Rather than handing each process a fixed chunk of the images,
+                # processes take the next unprocessed image from a shared
+                # counter whenever they are free, so that a run of slow images
+                # does not leave the other processes idle.
+                next_item = multiprocessing.Value("l", 0)
+
+                def do_work_dynamic(i):
+                    processor = Processor(
+                        copy.deepcopy(params), composite_tag="%04d" % i, rank=i
+                    )
+                    while True:
+                        with next_item.get_lock():
+                            item_num = next_item.value
+                            next_item.value += 1
+                        if item_num >= len(iterable):
+                            break
+                        do_work(i, [iterable[item_num]], processor, finalize=False)
+                    processor.finalize()
+
                 result = list(
                     easy_mp.multi_core_run(
-                        myfunction=do_work,
-                        argstuples=list(enumerate(splitit(iterable, params.mp.nproc))),
+                        myfunction=do_work_dynamic,
+                        argstuples=[(i,) for i in range(params.mp.nproc)],
                         nproc=params.mp.nproc,
                     )
                 )
@@ -867,6 +925,18 @@ def process_this_event(nevent):
             )
 
 
+def _reflection_table_nbytes(table):
+    """Estimate the memory used by the columns of a reflection table, ignoring
+    columns that can't be viewed as numpy arrays, such as shoeboxes"""
+    nbytes = 0
+    for key in table.keys():
+        try:
+            nbytes += flumpy.to_numpy(table[key]).nbytes
+        except (TypeError, ValueError, RuntimeError):
+            pass
+    return nbytes
+
+
 class Processor:
     def __init__(self, params, composite_tag=None, rank=0):
         self.params = params
@@ -905,18 +975,56 @@ def __init__(self, params, composite_tag=None, rank=0):
         if params.output.composite_output:
             assert composite_tag is not None
 
-            self.all_imported_experiments = ExperimentList()
-            self.all_strong_reflections = flex.reflection_table()
-            self.all_indexed_experiments = ExperimentList()
-            self.all_indexed_reflections = flex.reflection_table()
-            self.all_integrated_experiments = ExperimentList()
-            self.all_integrated_reflections = flex.reflection_table()
-            self.all_int_pickle_filenames = []
-            self.all_int_pickles = []
-            self.all_coset_experiments = ExperimentList()
-            self.all_coset_reflections = flex.reflection_table()
-
-            self.setup_filenames(composite_tag)
+            chunk = params.output.composite_chunk
+            if chunk.images is not None or chunk.size_mb is not None:
+                self.composite_chunk = 0
+            else:
+                self.composite_chunk = None
+            self.reset_composite()
+
+    def reset_composite(self):
+        """Start a new, empty set of composite output files"""
+        self.all_imported_experiments = ExperimentList()
+        self.all_strong_reflections = flex.reflection_table()
+        self.all_indexed_experiments = ExperimentList()
+        self.all_indexed_reflections = flex.reflection_table()
+        self.all_integrated_experiments = ExperimentList()
+        self.all_integrated_reflections = flex.reflection_table()
+        self.all_int_pickle_filenames = []
+        self.all_int_pickles = []
+        self.all_coset_experiments = ExperimentList()
+        self.all_coset_reflections = flex.reflection_table()
+        self.composite_image_tags = []
+
+        if self.composite_chunk is None:
+            self.composite_output_tag = self.composite_tag
+        else:
+            self.composite_output_tag = "%s_%04d" % (
+                self.composite_tag,
+                self.composite_chunk,
+            )
+        self.setup_filenames(self.composite_output_tag)
+
+    def composite_chunk_is_full(self):
+        """Whether the current composite output has reached the size at which
+        it should be written to disk"""
+        chunk = self.params.output.composite_chunk
+        if self.composite_chunk is None or not self.composite_image_tags:
+            return False
+        if chunk.images is not None and len(self.composite_image_tags) >= chunk.images:
+            return True
+        if chunk.size_mb is not None:
+            nbytes = sum(
+                _reflection_table_nbytes(table)
+                for table in (
+                    self.all_strong_reflections,
+                    self.all_indexed_reflections,
+                    self.all_integrated_reflections,
+                    self.all_coset_reflections,
+                )
+            )
+            return nbytes >= chunk.size_mb * 1024**2
+        return False
 
     def setup_filenames(self, tag):
         # before processing, set output paths according to the templates
@@ -1021,6 +1129,13 @@ def process_experiments(self, tag, experiments):
         self.tag = tag
         self.debug_start(tag)
 
+        if self.params.output.composite_output:
+            if self.composite_chunk_is_full():
+                self.write_composite()
+                self.composite_chunk += 1
+                self.reset_composite()
+            self.composite_image_tags.append(tag)
+
         if self.params.output.experiments_filename:
             if self.params.output.composite_output:
                 self.all_imported_experiments.extend(experiments)
@@ -1729,6 +1844,7 @@ def finalize(self):
                             coset_reflections,
                             int_pickles,
                             int_pickle_filenames,
+                            image_tags,
                         ) = comm.recv(source=MPI.ANY_SOURCE)
                         logger.info("Rank %d received data from rank %d", rank, sender)
 
@@ -1781,6 +1897,7 @@ def extend_with_bookkeeping(
 
                         self.all_int_pickles.extend(int_pickles)
                         self.all_int_pickle_filenames.extend(int_pickle_filenames)
+                        self.composite_image_tags.extend(image_tags)
 
                 else:
                     destrank = (rank // stride) * stride
@@ -1802,6 +1919,7 @@ def extend_with_bookkeeping(
                             self.all_coset_reflections,
                             self.all_int_pickles,
                             self.all_int_pickle_filenames,
+                            self.composite_image_tags,
                         ),
                         dest=destrank,
                     )
@@ -1812,97 +1930,110 @@ def extend_with_bookkeeping(
                         self.all_integrated_experiments
                     ) = self.all_integrated_reflections = self.all_coset_experiments = (
                         self.all_coset_reflections
-                    ) = self.all_int_pickles = self.all_integrated_reflections = []
+                    ) = self.all_int_pickles = self.all_integrated_reflections = (
+                        self.composite_image_tags
+                    ) = []
 
-            # Dump composite files to disk
-            if (
-                len(self.all_imported_experiments) > 0
-                and self.params.output.experiments_filename
-            ):
-                self.all_imported_experiments.as_json(
-                    self.params.output.experiments_filename
-                )
+            self.write_composite()
 
-            if (
-                len(self.all_strong_reflections) > 0
-                and self.params.output.strong_filename
-            ):
-                self.save_reflections(
-                    self.all_strong_reflections, self.params.output.strong_filename
-                )
+    def write_composite(self):
+        """Write the accumulated composite output to disk"""
+        if self.composite_chunk is not None and self.composite_image_tags:
+            # Record which composite files hold the results for each image
+            index_filename = os.path.join(
+                self.params.output.output_dir,
+                "idx-%s_composite_index.txt" % self.composite_tag,
+            )
+            with open(index_filename, "w" if self.composite_chunk == 0 else "a") as f:
+                for tag in self.composite_image_tags:
+                    f.write(f"{tag} idx-{self.composite_output_tag}\n")
 
-            if (
-                len(self.all_indexed_experiments) > 0
-                and self.params.output.refined_experiments_filename
-            ):
-                self.all_indexed_experiments.as_json(
-                    self.params.output.refined_experiments_filename
-                )
+        # Dump composite files to disk
+        if (
+            len(self.all_imported_experiments) > 0
+            and self.params.output.experiments_filename
+        ):
+            self.all_imported_experiments.as_json(
+                self.params.output.experiments_filename
+            )
 
-            if (
-                len(self.all_indexed_reflections) > 0
-                and self.params.output.indexed_filename
-            ):
-                self.save_reflections(
-                    self.all_indexed_reflections, self.params.output.indexed_filename
-                )
+        if len(self.all_strong_reflections) > 0 and self.params.output.strong_filename:
+            self.save_reflections(
+                self.all_strong_reflections, self.params.output.strong_filename
+            )
+
+        if (
+            len(self.all_indexed_experiments) > 0
+            and self.params.output.refined_experiments_filename
+        ):
+            self.all_indexed_experiments.as_json(
+                self.params.output.refined_experiments_filename
+            )
+
+        if (
+            len(self.all_indexed_reflections) > 0
+            and self.params.output.indexed_filename
+        ):
+            self.save_reflections(
+                self.all_indexed_reflections, self.params.output.indexed_filename
+            )
+
+        if (
+            len(self.all_integrated_experiments) > 0
+            and self.params.output.integrated_experiments_filename
+        ):
+            self.all_integrated_experiments.as_json(
+                self.params.output.integrated_experiments_filename
+            )
+
+        if (
+            len(self.all_integrated_reflections) > 0
+            and self.params.output.integrated_filename
+        ):
+            self.save_reflections(
+                self.all_integrated_reflections,
+                self.params.output.integrated_filename,
+            )
 
+        if self.params.dispatch.coset:
             if (
-                len(self.all_integrated_experiments) > 0
-                and self.params.output.integrated_experiments_filename
+                len(self.all_coset_experiments) > 0
+                and self.params.output.coset_experiments_filename
             ):
-                self.all_integrated_experiments.as_json(
-                    self.params.output.integrated_experiments_filename
+                self.all_coset_experiments.as_json(
+                    self.params.output.coset_experiments_filename
                 )
 
             if (
-                len(self.all_integrated_reflections) > 0
-                and self.params.output.integrated_filename
+                len(self.all_coset_reflections) > 0
+                and self.params.output.coset_filename
             ):
                 self.save_reflections(
-                    self.all_integrated_reflections,
-                    self.params.output.integrated_filename,
+                    self.all_coset_reflections, self.params.output.coset_filename
                 )
 
-            if self.params.dispatch.coset:
-                if (
-                    len(self.all_coset_experiments) > 0
-                    and self.params.output.coset_experiments_filename
-                ):
-                    self.all_coset_experiments.as_json(
-                        self.params.output.coset_experiments_filename
-                    )
-
-                if (
-                    len(self.all_coset_reflections) > 0
-                    and self.params.output.coset_filename
-                ):
-                    self.save_reflections(
-                        self.all_coset_reflections, self.params.output.coset_filename
-                    )
-
-            # Create a tar archive of the integration dictionary pickles
-            if len(self.all_int_pickles) > 0 and self.params.output.integration_pickle:
-                tar_template_integration_pickle = (
-                    self.params.output.integration_pickle.replace("%d", "%s")
-                )
-                outfile = (
-                    os.path.join(
-                        self.params.output.output_dir,
-                        tar_template_integration_pickle % ("x", self.composite_tag),
-                    )
-                    + ".tar"
+        # Create a tar archive of the integration dictionary pickles
+        if len(self.all_int_pickles) > 0 and self.params.output.integration_pickle:
+            tar_template_integration_pickle = (
+                self.params.output.integration_pickle.replace("%d", "%s")
+            )
+            outfile = (
+                os.path.join(
+                    self.params.output.output_dir,
+                    tar_template_integration_pickle % ("x", self.composite_output_tag),
                 )
-                tar = tarfile.TarFile(outfile, "w")
-                for i, (fname, d) in enumerate(
-                    zip(self.all_int_pickle_filenames, self.all_int_pickles)
-                ):
-                    string = BytesIO(pickle.dumps(d, protocol=2))
-                    info = tarfile.TarInfo(name=fname)
-                    info.size = string.getbuffer().nbytes
-                    info.mtime = time.time()
-                    tar.addfile(tarinfo=info, fileobj=string)
-                tar.close()
+                + ".tar"
+            )
+            tar = tarfile.TarFile(outfile, "w")
+            for i, (fname, d) in enumerate(
+                zip(self.all_int_pickle_filenames, self.all_int_pickles)
+            ):
+                string = BytesIO(pickle.dumps(d, protocol=2))
+                info = tarfile.TarInfo(name=fname)
+                info.size = string.getbuffer().nbytes
+                info.mtime = time.time()
+                tar.addfile(tarinfo=info, fileobj=string)
+            tar.close()
 
 
 @dials.util.show_mail_handle_errors()
@@ -43,6 +43,7 @@
     update_imageset_ids,
 )
 from dials.util.options import ArgumentParser, reflections_and_experiments_from_files
+from dials.util.system import CPU_COUNT
 from dials.util.version import dials_version
 
 logger = logging.getLogger("dials.command_line.symmetry")
@@ -94,6 +95,11 @@
   .help = "If True, then for monoclinic centered cells, I2 will be preferred over C2 if"
           "it gives a less oblique cell (i.e. smaller beta angle)."
 
+nproc = Auto
+  .type = int(value_min=1)
+  .help = "Number of processes to use for scoring the symmetry elements of the"
+          "lattice group. If Auto, use all available processors."
+
 systematic_absences {
 
   check = True
@@ -417,6 +423,7 @@ def symmetry(experiments, reflection_tables, params=None):
             relative_length_tolerance=params.relative_length_tolerance,
             absolute_angle_tolerance=params.absolute_angle_tolerance,
             best_monoclinic_beta=params.best_monoclinic_beta,
+            nproc=CPU_COUNT if params.nproc is Auto else params.nproc,
         )
         logger.info("")
         logger.info(result)
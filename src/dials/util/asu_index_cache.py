@@ -0,0 +1,106 @@
+"""
+A process-wide cache of Miller indices mapped to the asymmetric unit.
+
+Symmetry analysis and scaling repeatedly reindex the same Miller indices by the
+same change of basis operators and map them to the asymmetric unit of the same
+space groups. The results are cached here, keyed on the space group, the change
+of basis operator, the anomalous flag and a digest of the input indices. The
+least recently used entries are evicted once the cached indices exceed a
+memory limit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict, namedtuple
+
+from cctbx import miller, sgtbx
+from dxtbx import flumpy
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxbytes", "currbytes"])
+
+# The size in bytes of a single Miller index
+_MILLER_INDEX_BYTES = 12
+
+
+class _AsuIndexCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.clear()
+
+    def clear(self):
+        self._entries = OrderedDict()
+        self._n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return result
+
+    def put(self, key, indices):
+        n_bytes = indices.size() * _MILLER_INDEX_BYTES
+        if n_bytes > self.max_bytes:
+            return
+        self._entries[key] = indices
+        self._n_bytes += n_bytes
+        while self._n_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._n_bytes -= evicted.size() * _MILLER_INDEX_BYTES
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.max_bytes, self._n_bytes)
+
+
+_cache = _AsuIndexCache(max_bytes=256 * 1024**2)
+
+
+def map_indices_to_asu(miller_indices, space_group, cb_op=None, anomalous=False):
+    """Reindex Miller indices and map them to the asymmetric unit.
+
+    Args:
+        miller_indices (cctbx.array_family.flex.miller_index): The input indices.
+        space_group (cctbx.sgtbx.space_group): The space group of the
+            asymmetric unit, i.e. in the basis after reindexing.
+        cb_op (cctbx.sgtbx.change_of_basis_op): An optional change of basis
+            operator to apply to the indices before mapping to the asu.
+        anomalous (bool): Whether to keep Friedel mates separate.
+
+    Returns:
+        cctbx.array_family.flex.miller_index: A new array of the indices in
+        the asymmetric unit, which the caller is free to modify.
+    """
+    if isinstance(cb_op, str):
+        cb_op = sgtbx.change_of_basis_op(cb_op)
+    space_group_type = space_group.type()
+    key = (
+        space_group_type.hall_symbol(),
+        None if cb_op is None else cb_op.as_xyz(),
+        bool(anomalous),
+        miller_indices.size(),
+        hashlib.blake2b(flumpy.to_numpy(miller_indices), digest_size=16).digest(),
+    )
+    result = _cache.get(key)
+    if result is None:
+        if cb_op is None:
+            result = miller_indices.deep_copy()
+        else:
+            result = cb_op.apply(miller_indices)
+        miller.map_to_asu(space_group_type, bool(anomalous), result)
+        _cache.put(key, result)
+    return result.deep_copy()
+
+
+def cache_info():
+    """Return the hits, misses and size in bytes of the cache."""
+    return _cache.info()
+
+
+def clear_cache():
+    """Remove all entries from the cache."""
+    _cache.clear()
@@ -42,7 +42,8 @@ namespace dials { namespace util { namespace boost_python {
 
     class_<ResolutionMaskGenerator>("ResolutionMaskGenerator", no_init)
       .def(init<const BeamBase &, const Panel &>())
-      .def("apply", &ResolutionMaskGenerator::apply);
+      .def("apply", &ResolutionMaskGenerator::apply)
+      .def("resolution", &ResolutionMaskGenerator::resolution);
 
     python_streambuf_wrapper::wrap();
     python_ostream_wrapper::wrap();
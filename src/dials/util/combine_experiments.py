@@ -6,8 +6,11 @@
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
 
+import numpy as np
+
 import dxtbx.model
 import dxtbx.model.compare as compare
+from dxtbx import flumpy
 from dxtbx.model.experiment_list import (
     BeamComparison,
     DetectorComparison,
@@ -488,6 +491,9 @@ def combine_experiments(params, experiment_lists, reflection_tables):
     global_id = 0
     skipped_expts_min_refl = 0
     skipped_expts_max_refl = 0
+    # Map each imageset in the combined list to its position in
+    # experiments.imagesets(), so that lookups are constant time
+    new_imageset_ids = {}
 
     # loop through the input, building up the global lists
     nrefs_per_exp = []
@@ -496,13 +502,29 @@ def combine_experiments(params, experiment_lists, reflection_tables):
         ids_map = dict(refs.experiment_identifiers())
         # Keep track of mapping of imageset_ids old->new within this experimentlist
         imageset_result_map = {}
+        old_imageset_ids = {iset: n for n, iset in enumerate(exps.imagesets())}
 
         for k in refs.experiment_identifiers().keys():
             del refs.experiment_identifiers()[k]
+
+        # Sort the reflections by id once, so that the reflections belonging to
+        # each experiment form a contiguous block of the sort order. The stable
+        # sort preserves the input order of reflections within each block.
+        table_ids = flumpy.to_numpy(refs["id"])
+        order = np.argsort(table_ids, kind="stable")
+        sorted_ids = table_ids[order]
+        exp_ids = np.arange(len(exps))
+        starts = np.searchsorted(sorted_ids, exp_ids, side="left")
+        ends = np.searchsorted(sorted_ids, exp_ids, side="right")
+        has_imageset_id = "imageset_id" in refs
+        if has_imageset_id:
+            sorted_imageset_ids = flumpy.to_numpy(refs["imageset_id"])[order]
+
+        # The blocks of reflections to keep, with their new id and imageset_id
+        blocks = []
         for i, exp in enumerate(exps):
-            sel = refs["id"] == i
-            sub_ref = refs.select(sel)
-            n_sub_ref = len(sub_ref)
+            start, end = starts[i], ends[i]
+            n_sub_ref = int(end - start)
             if (
                 params.output.min_reflections_per_experiment is not None
                 and n_sub_ref < params.output.min_reflections_per_experiment
@@ -517,13 +539,6 @@ def combine_experiments(params, experiment_lists, reflection_tables):
                 continue
 
             nrefs_per_exp.append(n_sub_ref)
-            sub_ref["id"] = flex.int(len(sub_ref), global_id)
-
-            # now update identifiers if set.
-            if i in ids_map:
-                sub_ref.experiment_identifiers()[global_id] = ids_map[i]
-            if params.output.delete_shoeboxes and "shoebox" in sub_ref:
-                del sub_ref["shoebox"]
 
             try:
                 experiments.append(combine(exp))
@@ -536,35 +551,95 @@ def combine_experiments(params, experiment_lists, reflection_tables):
                         index, i, str(e)
                     )
                 )
+            if experiments[-1].imageset is not None:
+                new_imageset_ids.setdefault(
+                    experiments[-1].imageset, len(new_imageset_ids)
+                )
 
             # Rewrite imageset_id, if the experiment has an imageset
-            if exp.imageset and "imageset_id" in sub_ref:
+            new_imageset_id = None
+            if exp.imageset and has_imageset_id:
                 # Get the index of the imageset for this experiment and record how it changed
-                new_imageset_id = experiments.imagesets().index(
-                    experiments[-1].imageset
-                )
-                old_imageset_id = exps.imagesets().index(exp.imageset)
-                imageset_result_map[old_imageset_id] = new_imageset_id
+                new_imageset_id = new_imageset_ids[experiments[-1].imageset]
+                imageset_result_map[old_imageset_ids[exp.imageset]] = new_imageset_id
 
                 # Check for invalid(?) imageset_id indices... and leave if they are wrong
-                if len(set(sub_ref["imageset_id"])) != 1:
+                block_imageset_ids = sorted_imageset_ids[start:end]
+                if (
+                    n_sub_ref == 0
+                    or (block_imageset_ids != block_imageset_ids[0]).any()
+                ):
                     logger.warning(
                         "Warning: Experiment %d reflections appear to have come from multiple imagesets - output may be incorrect",
                         i,
                     )
-                else:
-                    sub_ref["imageset_id"] = flex.int(len(sub_ref), new_imageset_id)
-
-            reflections.extend(sub_ref)
+                    new_imageset_id = None
 
+            blocks.append((i, start, end, global_id, new_imageset_id))
             global_id += 1
 
+        # Extract all of the retained reflections with a single selection
+        if blocks:
+            lengths = np.array([end - start for _, start, end, _, _ in blocks])
+            sub_ref = refs.select(
+                flex.size_t(
+                    np.concatenate(
+                        [order[start:end] for _, start, end, _, _ in blocks]
+                    ).astype(np.uint64)
+                )
+            )
+            sub_ref["id"] = flumpy.from_numpy(
+                np.repeat(
+                    np.array([gid for _, _, _, gid, _ in blocks], dtype=np.int32),
+                    lengths,
+                )
+            )
+
+            # now update identifiers if set.
+            for i, _, _, gid, _ in blocks:
+                if i in ids_map:
+                    sub_ref.experiment_identifiers()[gid] = ids_map[i]
+            if params.output.delete_shoeboxes and "shoebox" in sub_ref:
+                del sub_ref["shoebox"]
+
+            if has_imageset_id:
+                new_ids = flumpy.to_numpy(sub_ref["imageset_id"]).copy()
+                offset = 0
+                for (_, _, _, _, new_imageset_id), n in zip(blocks, lengths):
+                    if new_imageset_id is not None:
+                        new_ids[offset : offset + n] = new_imageset_id
+                    offset += n
+                sub_ref["imageset_id"] = flumpy.from_numpy(new_ids)
+
+            reflections.extend(sub_ref)
+
         # Include unindexed reflections, if we can safely remap their imagesets
         if "imageset_id" in reflections:
-            unindexed_refs = refs.select(refs["id"] == -1)
-            for old_id in set(unindexed_refs["imageset_id"]):
-                subs = unindexed_refs.select(unindexed_refs["imageset_id"] == old_id)
-                subs["imageset_id"] = flex.int(len(subs), imageset_result_map[old_id])
+            start, end = np.searchsorted(sorted_ids, [-1, 0], side="left")
+            unindexed = order[start:end]
+            unindexed_imageset_ids = flumpy.to_numpy(refs["imageset_id"])[unindexed]
+            # Group by old imageset_id, keeping the input order within each group
+            by_imageset = np.argsort(unindexed_imageset_ids, kind="stable")
+            sorted_unindexed_ids = unindexed_imageset_ids[by_imageset]
+            groups = []
+            new_ids = []
+            for old_id in set(unindexed_imageset_ids.tolist()):
+                group_start, group_end = np.searchsorted(
+                    sorted_unindexed_ids, [old_id, old_id + 1], side="left"
+                )
+                groups.append(unindexed[by_imageset[group_start:group_end]])
+                new_ids.append(
+                    np.full(
+                        group_end - group_start,
+                        imageset_result_map[old_id],
+                        dtype=np.int32,
+                    )
+                )
+            if groups:
+                subs = refs.select(
+                    flex.size_t(np.concatenate(groups).astype(np.uint64))
+                )
+                subs["imageset_id"] = flumpy.from_numpy(np.concatenate(new_ids))
                 reflections.extend(subs)
 
     # Finished building global lists
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import sys
+
+from dxtbx import flumpy
+
+from dials.util.ioutil import write_formatted_rows
+
 
 def export_text(integrated_data):
     """Export contents of a dials reflection table as text."""
 
-    h, k, l = zip(*integrated_data["miller_index"])
+    hkl = flumpy.to_numpy(integrated_data["miller_index"]).reshape(-1, 3)
 
     # FIXME Currently outputting either summation or profile fitting. Should do
     # both?
@@ -18,5 +24,8 @@ def export_text(integrated_data):
     i *= lp
     v *= lp
 
-    for _h, _k, _l, _i, _v in zip(h, k, l, i, v):
-        print("%4d %4d %4d %f %f" % (_h, _k, _l, _i, _v))
+    write_formatted_rows(
+        sys.stdout,
+        "%4d %4d %4d %f %f\n",
+        (hkl[:, 0], hkl[:, 1], hkl[:, 2], flumpy.to_numpy(i), flumpy.to_numpy(v)),
+    )
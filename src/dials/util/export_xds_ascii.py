@@ -2,11 +2,15 @@
 
 import copy
 import logging
+import math
 import os
 
+import numpy as np
+
 import dxtbx.model  # noqa: F401
 import libtbx.phil  # noqa: F401
 from cctbx.miller import map_to_asu
+from dxtbx import flumpy
 from rstbx.cftbx.coordinate_frame_helpers import align_reference_frame
 from scitbx import matrix
 
@@ -16,6 +20,7 @@
     FilteringReductionMethods,
     filter_reflection_table,
 )
+from dials.util.ioutil import write_formatted_rows
 
 try:
     from typing import Tuple  # noqa: F401
@@ -46,6 +51,78 @@ def export_xds_ascii(integrated_data, experiment_list, params, var_model=(1, 0))
             _export_experiment(filename, experiment_data, experiment, params, var_model)
 
 
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _cross(a, b):
+    return (
+        a[1] * b[2] - b[1] * a[2],
+        a[2] * b[0] - b[2] * a[0],
+        a[0] * b[1] - b[0] * a[1],
+    )
+
+
+def _normalize(a):
+    length = np.sqrt(_dot(a, a))
+    return tuple(ai / length for ai in a)
+
+
+def _rotate(v, axis, cos_angle, sin_angle):
+    d = _dot(axis, v)
+    cross = _cross(axis, v)
+    return tuple(
+        vi * cos_angle + ni * d * (1 - cos_angle) + ci * sin_angle
+        for vi, ni, ci in zip(v, axis, cross)
+    )
+
+
+def _calculate_psi(hkl, phi, UB, axis, s0):
+    """Calculate the psi angle (in degrees) of each reflection.
+
+    The vector operations are applied to whole columns in the same order as
+    the scitbx.matrix operations they replace, so the results are unchanged.
+
+    Args:
+        hkl: An (n, 3) numpy array of miller indices
+        phi: A numpy array of rotation angles in degrees
+        UB: The UB matrix in the output coordinate frame
+        axis: The rotation axis in the output coordinate frame
+        s0: The beam vector in the output coordinate frame
+    """
+    h, k, l = (hkl[:, i] for i in range(3))
+    n = axis.normalize().elems
+    angle = phi * (math.pi / 180)
+    cos_angle = np.fromiter(map(math.cos, angle), dtype=float, count=angle.size)
+    sin_angle = np.fromiter(map(math.sin, angle), dtype=float, count=angle.size)
+
+    X = tuple(UB[3 * i] * h + UB[3 * i + 1] * k + UB[3 * i + 2] * l for i in range(3))
+    X = _rotate(X, n, cos_angle, sin_angle)
+    s = tuple(s0i + Xi for s0i, Xi in zip(s0, X))
+    g = _normalize(_cross(s, s0))
+
+    # find component of beam perpendicular to f, e
+    e = tuple(-ei for ei in _normalize(tuple(si + s0i for si, s0i in zip(s, s0))))
+    hkl_equal = (h == k) & (k == l)
+    u = (
+        np.where(hkl_equal, h, k - l),
+        np.where(hkl_equal, -h, l - h),
+        np.where(hkl_equal, 0, h - k),
+    )
+    UBi = UB.inverse()
+    q = tuple(UBi[j] * u[0] + UBi[3 + j] * u[1] + UBi[6 + j] * u[2] for j in range(3))
+    q = _rotate(_normalize(q), n, cos_angle, sin_angle)
+
+    cos_psi = _dot(q, g) / np.sqrt(_dot(q, q) * _dot(g, g))
+    psi = np.fromiter(
+        (math.acos(max(-1, min(1, c))) for c in cos_psi.tolist()),
+        dtype=float,
+        count=cos_psi.size,
+    ) * (180 / math.pi)
+    psi[_dot(q, e) < 0] *= -1
+    return psi
+
+
 def _export_experiment(
     filename: str,
     integrated_data: flex.reflection_table,
@@ -90,14 +167,12 @@ def _export_experiment(
     ) = FilteringReductionMethods.calculate_lp_qe_correction_and_filter(integrated_data)
 
     # sort data before output
-    nref = len(integrated_data["miller_index"])
-    indices = flex.size_t_range(nref)
-
     unique = copy.deepcopy(integrated_data["miller_index"])
 
     map_to_asu(experiment.crystal.get_space_group().type(), False, unique)
 
-    perm = sorted(indices, key=lambda k: unique[k])
+    h, k, l = flumpy.to_numpy(unique).reshape(-1, 3).T
+    perm = np.lexsort((l, k, h)).astype(np.uint64)
     integrated_data = integrated_data.select(flex.size_t(perm))
 
     if experiment.goniometer is None:
@@ -227,49 +302,28 @@ def _export_experiment(
     # then write the data records
 
     s0 = Rd * matrix.col(experiment.beam.get_s0())
-
-    for j in range(nref):
-        x, y, z = integrated_data["xyzcal.px"][j]
-        phi = phi_start + z * phi_range
-        h, k, l = miller_index[j]
-        X = (UB * (h, k, l)).rotate(axis, phi, deg=True)
-        s = s0 + X
-        g = s.cross(s0).normalize()
-
-        # find component of beam perpendicular to f, e
-        e = -(s + s0).normalize()
-        if h == k and k == l:
-            u = (h, -h, 0)
-        else:
-            u = (k - l, l - h, h - k)
-        q = (
-            (matrix.col(u).transpose() * UB.inverse())
-            .normalize()
-            .transpose()
-            .rotate(axis, phi, deg=True)
-        )
-
-        psi = q.angle(g, deg=True)
-        if q.dot(e) < 0:
-            psi *= -1
-
-        fout.write(
-            "%d %d %d %f %f %f %f %f %f %.1f %.1f %f\n"
-            % (
-                h,
-                k,
-                l,
-                I[j],
-                sigI[j],
-                x,
-                y,
-                z,
-                scl[j],
-                partiality[j],
-                prof_corr[j],
-                psi,
-            )
-        )
+    x, y, z = (flumpy.to_numpy(c) for c in integrated_data["xyzcal.px"].parts())
+    hkl = flumpy.to_numpy(miller_index).reshape(-1, 3)
+    psi = _calculate_psi(hkl, phi_start + z * phi_range, UB, axis, s0)
+
+    write_formatted_rows(
+        fout,
+        "%d %d %d %f %f %f %f %f %f %.1f %.1f %f\n",
+        (
+            hkl[:, 0],
+            hkl[:, 1],
+            hkl[:, 2],
+            flumpy.to_numpy(I),
+            flumpy.to_numpy(sigI),
+            x,
+            y,
+            z,
+            flumpy.to_numpy(scl),
+            flumpy.to_numpy(partiality),
+            flumpy.to_numpy(prof_corr),
+            psi,
+        ),
+    )
 
     fout.write("!END_OF_DATA\n")
     fout.close()
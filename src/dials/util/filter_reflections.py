@@ -44,10 +44,12 @@
 from __future__ import annotations
 
 import logging
-from collections import defaultdict
 from typing import Any, List, Type
 
+import numpy as np
+
 from cctbx import crystal, miller
+from dxtbx import flumpy
 
 from dials.algorithms.scaling.outlier_rejection import reject_outliers
 from dials.array_family import flex
@@ -820,136 +822,170 @@ def sum_partial_reflections(reflection_table):
 
     for intensity in intensities:
         sel = sel & (reflection_table["intensity." + intensity + ".variance"] > 0)
-    isel = sel.iselection()
-
-    # create map of partial_id to reflections
-    delete = flex.size_t()
-    partial_map = defaultdict(list)
-    for j in isel:
-        partial_map[reflection_table["partial_id"][j]].append(j)
-
-    # now work through this map - get total partiality for every reflection;
-    # here only consider reflections with > 1 component;
-    partial_ids = []
-    for p_id in partial_map:
-        if len(partial_map[p_id]) > 1:
-            partial_ids.append(p_id)
-
-    header = ["Partial id", "Partiality"]
-    for i in intensities:
-        header.extend([str(i) + " intensity", str(i) + " variance"])
-    rows = []
-
-    # Now loop through 'matched' partials, summing and then deleting before return
-    for p_id in partial_ids:
-        j = partial_map[p_id]
-        for i in j:
-            data = [str(p_id), str(reflection_table["partiality"][i])]
-            for intensity in intensities:
-                data.extend(
-                    [
-                        str(reflection_table["intensity." + intensity + ".value"][i]),
-                        str(
-                            reflection_table["intensity." + intensity + ".variance"][i]
-                        ),
-                    ]
-                )
-            rows.append(data)
+    isel = flumpy.to_numpy(sel.iselection())
+
+    # group the reflections by partial_id, keeping the input order within each
+    # group; here only consider reflections with > 1 component
+    partial_ids = flumpy.to_numpy(reflection_table["partial_id"])[isel]
+    order = np.argsort(partial_ids, kind="stable")
+    isel = isel[order]
+    _, starts, counts = np.unique(
+        partial_ids[order], return_index=True, return_counts=True
+    )
+    multiple = counts > 1
+    isel = isel[np.repeat(multiple, counts)]
+    counts = counts[multiple]
+    starts = np.cumsum(counts) - counts
 
-        # do the summing of the partiality values separately to allow looping
-        # over multiple times
-        total_partiality = sum(reflection_table["partiality"][i] for i in j)
-        if "prf" in intensities:
-            reflection_table = _sum_prf_partials(reflection_table, j)
-        if "sum" in intensities:
-            reflection_table = _sum_sum_partials(reflection_table, j)
-        if "scale" in intensities:
-            reflection_table = _sum_scale_partials(reflection_table, j)
-        # FIXME now that the partials have been summed, should fractioncalc be set
-        # to one (except for summation case?)
-        reflection_table["partiality"][j[0]] = total_partiality
-        delete.extend(flex.size_t(j[1:]))
-        data = ["combined " + str(p_id), str(total_partiality)]
+    # Formatting this table can be sloooow for large numbers of reflections, so skip
+    # this unless debug output has been requested
+    debug = logger.getEffectiveLevel() <= logging.DEBUG
+    if debug:
+        header = ["Partial id", "Partiality"]
+        for i in intensities:
+            header.extend([str(i) + " intensity", str(i) + " variance"])
+        columns = ["partial_id", "partiality"]
         for intensity in intensities:
-            data.extend(
+            columns.extend(
                 [
-                    str(reflection_table["intensity." + intensity + ".value"][j[0]]),
-                    str(reflection_table["intensity." + intensity + ".variance"][j[0]]),
+                    "intensity." + intensity + ".value",
+                    "intensity." + intensity + ".variance",
                 ]
             )
-        rows.append(data)
-    reflection_table.del_selected(delete)
+        components = [
+            flumpy.to_numpy(reflection_table[c])[isel].tolist() for c in columns
+        ]
+
+    # Now sum the 'matched' partials into the first entry of each group, and
+    # delete the others before return. Sum the partiality values separately to
+    # allow looping over multiple times
+    first = isel[starts]
+    total_partiality = _sum_partial_groups(
+        flumpy.to_numpy(reflection_table["partiality"])[isel], starts
+    )
+    if "prf" in intensities:
+        reflection_table = _sum_prf_partials(reflection_table, isel, starts)
+    if "sum" in intensities:
+        reflection_table = _sum_sum_partials(reflection_table, isel, starts)
+    if "scale" in intensities:
+        reflection_table = _sum_scale_partials(reflection_table, isel, starts)
+    # FIXME now that the partials have been summed, should fractioncalc be set
+    # to one (except for summation case?)
+    reflection_table["partiality"].set_selected(
+        flex.size_t(first.astype(np.uint64)), flex.double(total_partiality)
+    )
+    if debug:
+        combined = [
+            flumpy.to_numpy(reflection_table[c])[first].tolist() for c in columns[2:]
+        ]
+    delete = np.ones(len(isel), dtype=bool)
+    delete[starts] = False
+    reflection_table.del_selected(flex.size_t(isel[delete].astype(np.uint64)))
     if nrefl > reflection_table.size():
         logger.info(
             "Combined %s partial reflections with other partial reflections",
             nrefl - reflection_table.size(),
         )
 
-    # Formatting this table can be sloooow for large numbers of reflections, so skip
-    # this unless debug output has been requested
-    if logger.getEffectiveLevel() <= logging.DEBUG:
+    if debug:
+        rows = []
+        partiality = total_partiality.tolist()
+        # list the groups in order of their first reflection
+        for n in np.argsort(first, kind="stable").tolist():
+            start = int(starts[n])
+            for i in range(start, start + int(counts[n])):
+                rows.append([str(c[i]) for c in components])
+            data = ["combined " + str(components[0][start]), str(partiality[n])]
+            data.extend(str(c[n]) for c in combined)
+            rows.append(data)
         logger.debug("\nSummary of combination of partial reflections")
         logger.debug(tabulate(rows, header))
     return reflection_table
 
 
+def _sum_partial_groups(values, group_starts):
+    """Sum the values of each group of partials, in order.
+
+    The groups are contiguous runs of values beginning at group_starts. The
+    components are accumulated one position at a time, so that the results are
+    identical to summing over each group in a loop.
+    """
+    group_starts = np.asarray(group_starts, dtype=np.int64)
+    counts = np.diff(np.append(group_starts, len(values)))
+    total = values[group_starts]
+    for k in range(1, counts.max(initial=1)):
+        groups = np.flatnonzero(counts > k)
+        total[groups] += values[group_starts[groups] + k]
+    return total
+
+
 # FIXME what are the correct weights to use for the different cases? - why
 # weighting by (I/sig(I))^2 not just 1/variance for prf. See tests?
 
 
-def _sum_prf_partials(reflection_table, partials_isel_for_pid):
-    """Sum prf partials and set the updated value in the first entry."""
-    j = partials_isel_for_pid
-    value = reflection_table["intensity.prf.value"][j[0]]
-    variance = reflection_table["intensity.prf.variance"][j[0]]
+def _sum_prf_partials(reflection_table, partials_isel_for_pid, group_starts=(0,)):
+    """Sum prf partials and set the updated value in the first entry.
+
+    partials_isel_for_pid holds the rows of each group of partials in turn,
+    with the groups beginning at the positions given by group_starts.
+    """
+    isel = np.asarray(partials_isel_for_pid)
+    group_starts = np.asarray(group_starts, dtype=np.int64)
+    value = flumpy.to_numpy(reflection_table["intensity.prf.value"])[isel]
+    variance = flumpy.to_numpy(reflection_table["intensity.prf.variance"])[isel]
     weight = value * value / variance
-    value *= weight
-    variance *= weight
-    total_weight = weight
-    for i in j[1:]:
-        _value = reflection_table["intensity.prf.value"][i]
-        _variance = reflection_table["intensity.prf.variance"][i]
-        _weight = _value * _value / _variance
-        value += _weight * _value
-        variance += _weight * _variance
-        total_weight += _weight
+    total_weight = _sum_partial_groups(weight, group_starts)
+    value_sum = _sum_partial_groups(weight * value, group_starts)
+    variance_sum = _sum_partial_groups(weight * variance, group_starts)
     # now write these back into original reflection
-    if total_weight:
-        reflection_table["intensity.prf.value"][j[0]] = value / total_weight
-        reflection_table["intensity.prf.variance"][j[0]] = variance / total_weight
-    else:
-        variance = sum(reflection_table["intensity.prf.variance"][_j] for _j in j)
-        reflection_table["intensity.prf.value"][j[0]] = 0
-        reflection_table["intensity.prf.variance"][j[0]] = variance
+    has_weight = total_weight != 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(has_weight, value_sum / total_weight, 0.0)
+        variance = np.where(
+            has_weight,
+            variance_sum / total_weight,
+            _sum_partial_groups(variance, group_starts),
+        )
+    first = flex.size_t(isel[group_starts].astype(np.uint64))
+    reflection_table["intensity.prf.value"].set_selected(first, flex.double(value))
+    reflection_table["intensity.prf.variance"].set_selected(
+        first, flex.double(variance)
+    )
     return reflection_table
 
 
-def _sum_sum_partials(reflection_table, partials_isel_for_pid):
+def _sum_sum_partials(reflection_table, partials_isel_for_pid, group_starts=(0,)):
     """Sum sum partials and set the updated value in the first entry."""
-    j = partials_isel_for_pid
-    value = reflection_table["intensity.sum.value"][j[0]]
-    variance = reflection_table["intensity.sum.variance"][j[0]]
-    for i in j[1:]:
-        value += reflection_table["intensity.sum.value"][i]
-        variance += reflection_table["intensity.sum.variance"][i]
-    reflection_table["intensity.sum.value"][j[0]] = value
-    reflection_table["intensity.sum.variance"][j[0]] = variance
+    isel = np.asarray(partials_isel_for_pid)
+    group_starts = np.asarray(group_starts, dtype=np.int64)
+    value = flumpy.to_numpy(reflection_table["intensity.sum.value"])[isel]
+    variance = flumpy.to_numpy(reflection_table["intensity.sum.variance"])[isel]
+    first = flex.size_t(isel[group_starts].astype(np.uint64))
+    reflection_table["intensity.sum.value"].set_selected(
+        first, flex.double(_sum_partial_groups(value, group_starts))
+    )
+    reflection_table["intensity.sum.variance"].set_selected(
+        first, flex.double(_sum_partial_groups(variance, group_starts))
+    )
     return reflection_table
 
 
-def _sum_scale_partials(reflection_table, partials_isel_for_pid):
+def _sum_scale_partials(reflection_table, partials_isel_for_pid, group_starts=(0,)):
     """Sum scale partials and set the updated value in the first entry."""
     # Weight scaled intensity partials by 1/variance. See
     # https://en.wikipedia.org/wiki/Weighted_arithmetic_mean, section
     # 'Dealing with variance'
-    j = partials_isel_for_pid
-    variance = reflection_table["intensity.scale.variance"][j[0]]
-    value = reflection_table["intensity.scale.value"][j[0]] / variance
-    total_weight = 1.0 / variance
-    for i in j[1:]:
-        _variance = reflection_table["intensity.scale.variance"][i]
-        value += reflection_table["intensity.scale.value"][i] / _variance
-        total_weight += 1.0 / _variance
-    reflection_table["intensity.scale.value"][j[0]] = value / total_weight
-    reflection_table["intensity.scale.variance"][j[0]] = 1.0 / total_weight
+    isel = np.asarray(partials_isel_for_pid)
+    group_starts = np.asarray(group_starts, dtype=np.int64)
+    value = flumpy.to_numpy(reflection_table["intensity.scale.value"])[isel]
+    variance = flumpy.to_numpy(reflection_table["intensity.scale.variance"])[isel]
+    value_sum = _sum_partial_groups(value / variance, group_starts)
+    total_weight = _sum_partial_groups(1.0 / variance, group_starts)
+    first = flex.size_t(isel[group_starts].astype(np.uint64))
+    reflection_table["intensity.scale.value"].set_selected(
+        first, flex.double(value_sum / total_weight)
+    )
+    reflection_table["intensity.scale.variance"].set_selected(
+        first, flex.double(1.0 / total_weight)
+    )
     return reflection_table
@@ -674,6 +674,72 @@ def save_subset(input_: SplittingIterable) -> Optional[Tuple[str, FilePair]]:
     return None
 
 
+@dataclass
+class FileSplittingIterable(object):
+    working_directory: Path
+    fp: FilePair
+    fileindex: int
+    groupdata: GroupsForExpt
+    names: List[str]
+
+
+def save_all_subsets(input_: FileSplittingIterable) -> List[Tuple[str, FilePair]]:
+    """Split one input file pair into all of its groups.
+
+    The input files are only read once; the reflections are partitioned by
+    group in a single pass and each group subset is written to file."""
+    expts = load.experiment_list(input_.fp.expt, check_format=False)
+    refls = flex.reflection_table.from_file(input_.fp.refl)
+    groupdata = input_.groupdata
+    results = []
+
+    def write(groupindex, expts, refls):
+        exptout = (
+            input_.working_directory / f"group_{groupindex}_{input_.fileindex}.expt"
+        )
+        reflout = (
+            input_.working_directory / f"group_{groupindex}_{input_.fileindex}.refl"
+        )
+        expts.as_file(exptout)
+        refls.as_file(reflout)
+        results.append((input_.names[groupindex], FilePair(exptout, reflout)))
+
+    if groupdata.single_group is not None:
+        if expts:
+            write(groupdata.single_group, expts, refls)
+        return results
+
+    # map the table ids to group indices, then partition the reflections
+    groups_array = groupdata.groups_array.astype(np.int64)
+    identifiers_map = refls.experiment_identifiers()
+    expt_index = {identifier: i for i, identifier in enumerate(expts.identifiers())}
+    table_ids = flumpy.to_numpy(refls["id"])
+    id_to_group = np.full(max(table_ids.max(initial=-1), 0) + 1, -1, dtype=np.int64)
+    for table_id, identifier in identifiers_map:
+        if identifier in expt_index and table_id < id_to_group.size:
+            id_to_group[table_id] = groups_array[expt_index[identifier]]
+    refl_groups = np.full(table_ids.size, -1, dtype=np.int64)
+    valid = table_ids >= 0
+    refl_groups[valid] = id_to_group[table_ids[valid]]
+    order = np.argsort(refl_groups, kind="stable")
+    sorted_groups = refl_groups[order]
+
+    for groupindex in sorted(int(g) for g in groupdata.unique_group_numbers):
+        expt_sel = np.flatnonzero(groups_array == groupindex)
+        if not expt_sel.size:
+            continue
+        group_expts = ExperimentList([expts[i] for i in expt_sel])
+        start, end = np.searchsorted(sorted_groups, [groupindex, groupindex + 1])
+        group_refls = refls.select(flex.size_t(order[start:end].astype(np.uint64)))
+        group_ids = set(group_expts.identifiers())
+        for k, v in list(group_refls.experiment_identifiers()):
+            if v not in group_ids:
+                del group_refls.experiment_identifiers()[k]
+        group_refls.reset_ids()
+        write(groupindex, group_expts, group_refls)
+    return results
+
+
 class GroupingImageTemplates(object):
     """Class that takes a parsed group and determines the groupings and mappings
     required to split input data into groups.
@@ -847,12 +913,17 @@ def split_files_to_groups(
         self,
         working_directory: Path,
         data_file_pairs: List[FilePair],
-        function_to_apply: Callable[
-            [SplittingIterable], Optional[Tuple[str, FilePair]]
-        ] = save_subset,
+        function_to_apply: Optional[
+            Callable[[SplittingIterable], Optional[Tuple[str, FilePair]]]
+        ] = None,
         params: Any = None,
         prefix: str = "",
     ):
+        """Split the data files into the groups.
+
+        By default, each input file pair is read once and split into all of its
+        groups (in parallel over files). If a function_to_apply is given, it is
+        instead called once for each (file pair, group) combination."""
         expt_file_to_groupsdata: Dict[Path, GroupsForExpt] = (
             self._get_expt_file_to_groupsdata(data_file_pairs)
         )
@@ -868,6 +939,26 @@ def split_files_to_groups(
         ]
         filesdict: dict[str, List[FilePair]] = {name: [] for name in names}
 
+        if function_to_apply is None:
+            file_iterable = [
+                FileSplittingIterable(
+                    working_directory,
+                    fp,
+                    fileindex,
+                    expt_file_to_groupsdata[fp.expt],
+                    names,
+                )
+                for fileindex, fp in enumerate(data_file_pairs)
+                if expt_file_to_groupsdata[fp.expt].unique_group_numbers
+            ]
+            if file_iterable:
+                with Pool(min(self.nproc, len(file_iterable))) as pool:
+                    results = pool.map(save_all_subsets, file_iterable)
+                for file_results in results:
+                    for name, fp in file_results:
+                        filesdict[name].append(fp)
+            return filesdict
+
         input_iterable = []
         for groupindex, name in enumerate(names):
             for fileindex, fp in enumerate(data_file_pairs):
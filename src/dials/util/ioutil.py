@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import itertools
+
 
 def get_inverse_ub_matrix_from_xparm(handle):
     """Get the inverse_ub_matrix from an xparm file handle
@@ -31,3 +33,31 @@ def get_space_group_type_from_xparm(handle):
     return sgtbx.space_group_type(
         sgtbx.space_group(sgtbx.space_group_symbols(handle.space_group).hall())
     )
+
+
+def write_formatted_rows(handle, row_format, columns, chunk_size=100000):
+    """Write columnar data to a file handle as formatted text rows.
+
+    Rather than formatting and writing each row separately, the rows are
+    formatted a chunk at a time with a single %-format operation (the row format
+    repeated for each row in the chunk). The output is identical to writing
+    row_format % row for each row.
+
+    Params:
+        handle The file handle
+        row_format A %-style format string for one row, including the newline
+        columns A sequence of equal-length columns (numpy arrays or sequences)
+        chunk_size The number of rows to format and write at a time
+    """
+    columns = [
+        column.tolist() if hasattr(column, "tolist") else list(column)
+        for column in columns
+    ]
+    n_rows = len(columns[0]) if columns else 0
+    assert all(len(column) == n_rows for column in columns)
+    for start in range(0, n_rows, chunk_size):
+        end = min(start + chunk_size, n_rows)
+        rows = zip(*(column[start:end] for column in columns))
+        handle.write(
+            (row_format * (end - start)) % tuple(itertools.chain.from_iterable(rows))
+        )
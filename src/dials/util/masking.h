@@ -78,6 +78,13 @@ namespace dials { namespace util {
       }
     }
 
+    /**
+     * @returns The resolution at each pixel
+     */
+    af::versa<double, af::c_grid<2> > resolution() const {
+      return resolution_;
+    }
+
   private:
     af::versa<double, af::c_grid<2> > resolution_;
   };
@@ -8,8 +8,11 @@
 from collections import namedtuple
 from typing import Tuple
 
+import numpy as np
+
 import libtbx.phil
 from cctbx import crystal
+from dxtbx import flumpy
 from dxtbx.masking import (
     mask_untrusted_circle,
     mask_untrusted_polygon,
@@ -122,6 +125,7 @@ class Scope:
             pass
 
         cache_data = Scope()
+        cache_data.maxsize = maxsize
         cache_data.cache = []
         cache_data.hits = 0
         cache_data.misses = 0
@@ -135,7 +139,7 @@ def _wrapper_function(*args, **kwargs):
             result = f(*args, **kwargs)
             cache_data.misses += 1
             cache_data.cache.append((args, kwargs, result))
-            if len(cache_data.cache) > maxsize:
+            if len(cache_data.cache) > cache_data.maxsize:
                 cache_data.cache = cache_data.cache[1:]
             return result
 
@@ -143,12 +147,17 @@ def _generate_cache_info():
             return CacheInfo(
                 hits=cache_data.hits,
                 misses=cache_data.misses,
-                maxsize=maxsize,
+                maxsize=cache_data.maxsize,
                 currsize=len(cache_data.cache),
             )
 
+        def _resize_cache(new_maxsize):
+            cache_data.maxsize = new_maxsize
+            del cache_data.cache[: max(0, len(cache_data.cache) - new_maxsize)]
+
         _wrapper_function.__wrapped__ = f
         _wrapper_function.cache_info = _generate_cache_info
+        _wrapper_function.cache_resize = _resize_cache
 
         return _wrapper_function
 
@@ -188,7 +197,13 @@ def generate_ice_ring_resolution_ranges(beam, panel, params):
             yield (d_min, d_max)
 
 
-@lru_equality_cache(maxsize=3)
+# The number of (beam, detector) combinations for which the per-panel resolution
+# maps are kept. The cache is resized for the number of panels of the detector
+# in generate_mask, so that a multi-panel detector does not evict its own maps.
+_resolution_cache_n_detectors = 3
+
+
+@lru_equality_cache(maxsize=_resolution_cache_n_detectors)
 def _get_resolution_masker(beam, panel):
     t0 = time.perf_counter()
     masker = ResolutionMaskGenerator(beam, panel)
@@ -197,8 +212,25 @@ def _get_resolution_masker(beam, panel):
     return masker
 
 
-def _apply_resolution_mask(mask, beam, panel, *args):
-    _get_resolution_masker(beam, panel).apply(mask, *args)
+def _apply_resolution_mask(mask, beam, panel, ranges):
+    """Mask all pixels with a resolution inside any of the (d_min, d_max) ranges.
+
+    The ranges are merged into sorted, disjoint intervals so that they can all
+    be applied in a single pass over the cached per-pixel resolution map.
+    """
+    if not ranges:
+        return
+    merged = []
+    for d_min, d_max in sorted(ranges):
+        if merged and d_min <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], d_max)
+        else:
+            merged.append([d_min, d_max])
+    starts, ends = np.array(merged).T
+    resolution = flumpy.to_numpy(_get_resolution_masker(beam, panel).resolution())
+    index = np.searchsorted(starts, resolution, side="right") - 1
+    masked = (index >= 0) & (resolution <= ends[np.maximum(index, 0)])
+    mask.set_selected(flumpy.from_numpy(masked), False)
 
 
 def generate_mask(
@@ -222,6 +254,10 @@ def generate_mask(
                 f"d_min = {params.d_min} > d_max = {params.d_max}: no spots will be found"
             )
 
+    maxsize = _resolution_cache_n_detectors * len(detector)
+    if _get_resolution_masker.cache_info().maxsize < maxsize:
+        _get_resolution_masker.cache_resize(maxsize)
+
     # Create the mask for each panel
     masks = []
     for index, panel in enumerate(detector):
@@ -295,14 +331,15 @@ def generate_mask(
             panel.set_px_mm_strategy(SimplePxMmStrategy())
 
         # Generate high and low resolution masks
+        resolution_ranges = []
         if params.d_min is not None:
             logger.debug(f"Generating high resolution mask:\n d_min = {params.d_min}")
-            _apply_resolution_mask(mask, beam, panel, 0, params.d_min)
+            resolution_ranges.append((0, params.d_min))
         if params.d_max is not None:
             logger.debug(f"Generating low resolution mask:\n d_max = {params.d_max}")
             d_max = params.d_max
             d_inf = max(d_max + 1, 1e9)
-            _apply_resolution_mask(mask, beam, panel, d_max, d_inf)
+            resolution_ranges.append((d_max, d_inf))
 
         try:
             # Mask out the resolution range
@@ -315,7 +352,7 @@ def generate_mask(
                     + f" d_min = {d_min}\n"
                     + f" d_max = {d_max}"
                 )
-                _apply_resolution_mask(mask, beam, panel, d_min, d_max)
+                resolution_ranges.append((d_min, d_max))
         except TypeError:
             # Catch the default value None of params.resolution_range
             if any(params.resolution_range):
@@ -333,7 +370,8 @@ def generate_mask(
                 + f" d_min = {d_min:.4f}\n"
                 + f" d_max = {d_max:.4f}"
             )
-            _apply_resolution_mask(mask, beam, panel, d_min, d_max)
+            resolution_ranges.append((d_min, d_max))
+        _apply_resolution_mask(mask, beam, panel, resolution_ranges)
 
         # Add to the list
         masks.append(mask)
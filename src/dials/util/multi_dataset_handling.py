@@ -8,9 +8,11 @@
 import copy
 import logging
 
+import numpy as np
 from orderedset import OrderedSet
 
 import iotbx.phil
+from dxtbx import flumpy
 from dxtbx.util import ersatz_uuid4
 
 from dials.array_family import flex
@@ -139,6 +141,49 @@ def renumber_table_id_columns(reflection_tables):
     return reflection_tables
 
 
+def _split_by_experiment_id(reflection_table):
+    """
+    Split a reflection table into one table per dataset, ignoring unindexed
+    reflections (id = -1).
+
+    Equivalent to selecting the indexed reflections and calling
+    split_by_experiment_id, but each dataset is selected directly from the
+    input table, so that only one copy of the data is made. Each table keeps
+    only the experiment identifier of its own dataset.
+
+    Args:
+        reflection_table: A reflection table containing multiple datasets
+
+    Returns:
+        (list): a list of reflection tables, ordered by id
+    """
+    ids = flumpy.to_numpy(reflection_table["id"])
+    order = np.argsort(ids, kind="stable")
+    unique_ids, starts = np.unique(ids[order], return_index=True)
+    ends = np.append(starts[1:], len(ids))
+
+    # Detach the identifiers while selecting, rather than copying the full
+    # mapping into every table and then deleting all but one entry.
+    identifiers = dict(reflection_table.experiment_identifiers())
+    for k in identifiers:
+        del reflection_table.experiment_identifiers()[k]
+    tables = []
+    try:
+        for id_, start, end in zip(unique_ids.tolist(), starts, ends):
+            if id_ == -1:
+                continue
+            table = reflection_table.select(
+                flex.size_t(order[start:end].astype(np.uint64))
+            )
+            if id_ in identifiers:
+                table.experiment_identifiers()[id_] = identifiers[id_]
+            tables.append(table)
+    finally:
+        for k, v in identifiers.items():
+            reflection_table.experiment_identifiers()[k] = v
+    return tables
+
+
 def parse_multiple_datasets(reflections):
     """
     Split a list of multi-dataset reflection tables, selecting on id
@@ -164,12 +209,7 @@ def parse_multiple_datasets(reflections):
                 "containing %s datasets. \n",
                 len(dataset_ids),
             )
-            # FIXME fix split_by_experiment_id so that don't need to filter
-            # unindxeded reflections here to get rid of id = -1
-            if -1 in refl_table["id"]:
-                refl_table = refl_table.select(refl_table["id"] != -1)
-            result = refl_table.split_by_experiment_id()
-            single_reflection_tables.extend(result)
+            single_reflection_tables.extend(_split_by_experiment_id(refl_table))
         else:
             single_reflection_tables.append(refl_table)
     if len(dataset_id_list) != len(set(dataset_id_list)):  # need to reset some ids
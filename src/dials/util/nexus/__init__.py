@@ -20,9 +20,9 @@ def get_entry(filename, mode="a"):
     return entry
 
 
-def load(filename):
+def load(filename, columns=None, rows=None):
     entry = get_entry(filename, "r")
-    ref, exp_index = nx_reflections.load(entry)
+    ref, exp_index = nx_reflections.load(entry, columns=columns, rows=rows)
     exp = nx_mx.load(entry, exp_index)
     return exp, ref
 
@@ -31,4 +31,11 @@ def dump(experiments, reflections, params):
     filename = params.hklout
     entry = get_entry(filename, "w")
     experiments = nx_mx.dump(entry, experiments, params)
-    nx_reflections.dump(entry, reflections, experiments)
+    compression = None if params.compression == "none" else params.compression
+    nx_reflections.dump(
+        entry,
+        reflections,
+        experiments,
+        compression=compression,
+        chunk_size=params.chunk_size,
+    )
@@ -5,30 +5,45 @@
 from dials.array_family import flex
 
 
-def make_dataset(handle, name, dtype, data, description, units=None):
-    dset = handle.create_dataset(
-        name, data.focus(), dtype=dtype, data=data.as_numpy_array().astype(dtype)
-    )
+def make_dataset(
+    handle,
+    name,
+    dtype,
+    data,
+    description,
+    units=None,
+    compression=None,
+    chunk_size=65536,
+):
+    data = data.as_numpy_array().astype(dtype)
+    kwargs = {}
+    if compression is not None and len(data):
+        # Chunk by rows, so that a row range can be read without decompressing
+        # the whole column
+        kwargs["chunks"] = (min(chunk_size, len(data)),) + data.shape[1:]
+        kwargs["compression"] = compression
+        kwargs["shuffle"] = True
+    dset = handle.create_dataset(name, data=data, **kwargs)
     dset.attrs["description"] = description
     if units is not None:
         dset.attrs["units"] = units
     return dset
 
 
-def make_uint(handle, name, data, description, units=None):
-    return make_dataset(handle, name, "uint64", data, description, units)
+def make_uint(handle, name, data, description, units=None, **kwargs):
+    return make_dataset(handle, name, "uint64", data, description, units, **kwargs)
 
 
-def make_int(handle, name, data, description, units=None):
-    return make_dataset(handle, name, "int64", data, description, units)
+def make_int(handle, name, data, description, units=None, **kwargs):
+    return make_dataset(handle, name, "int64", data, description, units, **kwargs)
 
 
-def make_bool(handle, name, data, description, units=None):
-    return make_dataset(handle, name, "int8", data, description, units)
+def make_bool(handle, name, data, description, units=None, **kwargs):
+    return make_dataset(handle, name, "int8", data, description, units, **kwargs)
 
 
-def make_float(handle, name, data, description, units=None):
-    return make_dataset(handle, name, "float64", data, description, units)
+def make_float(handle, name, data, description, units=None, **kwargs):
+    return make_dataset(handle, name, "float64", data, description, units, **kwargs)
 
 
 def make_vlen_uint(handle, name, data, description, units=None):
@@ -36,63 +51,61 @@ def make_vlen_uint(handle, name, data, description, units=None):
 
     dtype = h5py.special_dtype(vlen=np.dtype("uint64"))
     dset = handle.create_dataset(name, (len(data),), dtype=dtype)
+    values = np.empty(len(data), dtype=object)
     for i, d in enumerate(data):
-        if len(d) > 0:
-            dset[i] = d
+        values[i] = np.asarray(d, dtype=np.uint64)
+    dset[...] = values
     dset.attrs["description"] = description
     if units is not None:
         dset.attrs["units"] = units
     return dset
 
 
-def write(handle, key, data):
+def write(handle, key, data, **kwargs):
     if key == "miller_index":
-        col1, col2, col3 = zip(*list(data))
-        col1 = flex.int(col1)
-        col2 = flex.int(col2)
-        col3 = flex.int(col3)
+        col1, col2, col3 = data.as_vec3_double().parts()
         dsc1 = "The h component of the miller index"
         dsc2 = "The k component of the miller index"
         dsc3 = "The l component of the miller index"
-        make_int(handle, "h", col1, dsc1)
-        make_int(handle, "k", col2, dsc2)
-        make_int(handle, "l", col3, dsc3)
+        make_int(handle, "h", col1, dsc1, **kwargs)
+        make_int(handle, "k", col2, dsc2, **kwargs)
+        make_int(handle, "l", col3, dsc3, **kwargs)
     elif key == "id":
         col = data
         dsc = "The experiment id"
-        make_int(handle, "id", col, dsc)
+        make_int(handle, "id", col, dsc, **kwargs)
     elif key == "partial_id":
         col = data
         desc = "The reflection id"
-        make_uint(handle, "reflection_id", col, desc)
+        make_uint(handle, "reflection_id", col, desc, **kwargs)
     elif key == "entering":
         col = data
         dsc = "Entering or exiting the Ewald sphere"
-        make_bool(handle, "entering", col, dsc)
+        make_bool(handle, "entering", col, dsc, **kwargs)
     elif key == "flags":
         col = data
         dsc = "Status of the reflection in processing"
-        make_uint(handle, "flags", col, dsc)
+        make_uint(handle, "flags", col, dsc, **kwargs)
     elif key == "panel":
         col = data
         dsc = "The detector module on which the reflection was recorded"
-        make_uint(handle, "det_module", col, dsc)
+        make_uint(handle, "det_module", col, dsc, **kwargs)
     elif key == "d":
         col = data
         dsc = "The resolution of the reflection"
-        make_float(handle, "d", col, dsc)
+        make_float(handle, "d", col, dsc, **kwargs)
     elif key == "partiality":
         col = data
         dsc = "The partiality of the reflection"
-        make_float(handle, "partiality", col, dsc)
+        make_float(handle, "partiality", col, dsc, **kwargs)
     elif key == "xyzcal.px":
         col1, col2, col3 = data.parts()
         dsc1 = "The predicted bragg peak fast pixel location"
         dsc2 = "The predicted bragg peak slow pixel location"
         dsc3 = "The predicted bragg peak frame number"
-        make_float(handle, "predicted_px_x", col1, dsc1)
-        make_float(handle, "predicted_px_y", col2, dsc2)
-        make_float(handle, "predicted_frame", col3, dsc3)
+        make_float(handle, "predicted_px_x", col1, dsc1, **kwargs)
+        make_float(handle, "predicted_px_y", col2, dsc2, **kwargs)
+        make_float(handle, "predicted_frame", col3, dsc3, **kwargs)
         handle["predicted_px_x"].attrs["units"] = ""
         handle["predicted_px_y"].attrs["units"] = ""
         handle["predicted_frame"].attrs["units"] = ""
@@ -101,22 +114,22 @@ def write(handle, key, data):
         dsc1 = "The predicted bragg peak fast millimeter location"
         dsc2 = "The predicted bragg peak slow millimeter location"
         dsc3 = "The predicted bragg peak rotation angle number"
-        make_float(handle, "predicted_x", col1, dsc1, units="mm")
-        make_float(handle, "predicted_y", col2, dsc2, units="mm")
-        make_float(handle, "predicted_phi", col3, dsc3, units="rad")
+        make_float(handle, "predicted_x", col1, dsc1, units="mm", **kwargs)
+        make_float(handle, "predicted_y", col2, dsc2, units="mm", **kwargs)
+        make_float(handle, "predicted_phi", col3, dsc3, units="rad", **kwargs)
     elif key == "bbox":
         d = data.as_int()
         d.reshape(flex.grid((len(data)), 6))
-        make_int(handle, "bounding_box", d, "The reflection bounding box")
+        make_int(handle, "bounding_box", d, "The reflection bounding box", **kwargs)
         handle["bounding_box"].attrs["units"] = ""
     elif key == "xyzobs.px.value":
         col1, col2, col3 = data.parts()
         dsc1 = "The observed centroid fast pixel value"
         dsc2 = "The observed centroid slow pixel value"
         dsc3 = "The observed centroid frame value"
-        make_float(handle, "observed_px_x", col1, dsc1)
-        make_float(handle, "observed_px_y", col2, dsc2)
-        make_float(handle, "observed_frame", col3, dsc3)
+        make_float(handle, "observed_px_x", col1, dsc1, **kwargs)
+        make_float(handle, "observed_px_y", col2, dsc2, **kwargs)
+        make_float(handle, "observed_frame", col3, dsc3, **kwargs)
         handle["observed_px_x"].attrs["units"] = ""
         handle["observed_px_y"].attrs["units"] = ""
         handle["observed_frame"].attrs["units"] = ""
@@ -125,9 +138,9 @@ def write(handle, key, data):
         dsc1 = "The observed centroid fast pixel variance"
         dsc2 = "The observed centroid slow pixel variance"
         dsc3 = "The observed centroid frame variance"
-        make_float(handle, "observed_px_x_var", col1, dsc1)
-        make_float(handle, "observed_px_y_var", col2, dsc2)
-        make_float(handle, "observed_frame_var", col3, dsc3)
+        make_float(handle, "observed_px_x_var", col1, dsc1, **kwargs)
+        make_float(handle, "observed_px_y_var", col2, dsc2, **kwargs)
+        make_float(handle, "observed_frame_var", col3, dsc3, **kwargs)
         handle["observed_px_x_var"].attrs["units"] = ""
         handle["observed_px_y_var"].attrs["units"] = ""
         handle["observed_frame_var"].attrs["units"] = ""
@@ -136,189 +149,194 @@ def write(handle, key, data):
         dsc1 = "The observed centroid fast pixel value"
         dsc2 = "The observed centroid slow pixel value"
         dsc3 = "The observed centroid phi value"
-        make_float(handle, "observed_x", col1, dsc1, units="mm")
-        make_float(handle, "observed_y", col2, dsc2, units="mm")
-        make_float(handle, "observed_phi", col3, dsc3, units="rad")
+        make_float(handle, "observed_x", col1, dsc1, units="mm", **kwargs)
+        make_float(handle, "observed_y", col2, dsc2, units="mm", **kwargs)
+        make_float(handle, "observed_phi", col3, dsc3, units="rad", **kwargs)
     elif key == "xyzobs.mm.variance":
         col1, col2, col3 = data.parts()
         dsc1 = "The observed centroid fast pixel variance"
         dsc2 = "The observed centroid slow pixel variance"
         dsc3 = "The observed centroid phi variance"
-        make_float(handle, "observed_x_var", col1, dsc1, units="mm")
-        make_float(handle, "observed_y_var", col2, dsc2, units="mm")
-        make_float(handle, "observed_phi_var", col3, dsc3, units="rad")
+        make_float(handle, "observed_x_var", col1, dsc1, units="mm", **kwargs)
+        make_float(handle, "observed_y_var", col2, dsc2, units="mm", **kwargs)
+        make_float(handle, "observed_phi_var", col3, dsc3, units="rad", **kwargs)
     elif key == "background.mean":
         col = data
         dsc = "The mean background value"
-        make_float(handle, "background_mean", col, dsc)
+        make_float(handle, "background_mean", col, dsc, **kwargs)
     elif key == "intensity.sum.value":
         col = data
         dsc = "The value of the summed intensity"
-        make_float(handle, "int_sum", col, dsc)
+        make_float(handle, "int_sum", col, dsc, **kwargs)
     elif key == "intensity.sum.variance":
         col = data
         dsc = "The variance of the summed intensity"
-        make_float(handle, "int_sum_var", col, dsc)
+        make_float(handle, "int_sum_var", col, dsc, **kwargs)
     elif key == "intensity.prf.value":
         col = data
         dsc = "The value of the profile fitted intensity"
-        make_float(handle, "int_prf", col, dsc)
+        make_float(handle, "int_prf", col, dsc, **kwargs)
     elif key == "intensity.prf.variance":
         col = data
         dsc = "The variance of the profile fitted intensity"
-        make_float(handle, "int_prf_var", col, dsc)
+        make_float(handle, "int_prf_var", col, dsc, **kwargs)
     elif key == "profile.correlation":
         col = data
         dsc = "Profile fitting correlations"
-        make_float(handle, "prf_cc", col, dsc)
+        make_float(handle, "prf_cc", col, dsc, **kwargs)
     elif key == "lp":
         col = data
         dsc = "The lorentz-polarization correction factor"
-        make_float(handle, "lp", col, dsc)
+        make_float(handle, "lp", col, dsc, **kwargs)
     elif key == "num_pixels.background":
         col = data
         dsc = "Number of background pixels"
-        make_int(handle, "num_bg", col, dsc)
+        make_int(handle, "num_bg", col, dsc, **kwargs)
     elif key == "num_pixels.background_used":
         col = data
         dsc = "Number of background pixels used"
-        make_int(handle, "num_bg_used", col, dsc)
+        make_int(handle, "num_bg_used", col, dsc, **kwargs)
     elif key == "num_pixels.foreground":
         col = data
         dsc = "Number of foreground pixels"
-        make_int(handle, "num_fg", col, dsc)
+        make_int(handle, "num_fg", col, dsc, **kwargs)
     elif key == "num_pixels.valid":
         col = data
         dsc = "Number of valid pixels"
-        make_int(handle, "num_valid", col, dsc)
+        make_int(handle, "num_valid", col, dsc, **kwargs)
     elif key == "profile.rmsd":
         col = data
         dsc = "Profile rmsd"
-        make_float(handle, "prf_rmsd", col, dsc)
+        make_float(handle, "prf_rmsd", col, dsc, **kwargs)
     else:
         raise KeyError(f"Column {key} not written to file")
 
 
-def read(handle, key):
+def read(handle, key, rows=slice(None)):
     from dxtbx.format.nexus import convert_units
 
     if key == "miller_index":
-        h = flex.int(handle["h"][:].astype(np.int32))
-        k = flex.int(handle["k"][:].astype(np.int32))
-        l = flex.int(handle["l"][:].astype(np.int32))
+        h = flex.int(handle["h"][rows].astype(np.int32))
+        k = flex.int(handle["k"][rows].astype(np.int32))
+        l = flex.int(handle["l"][rows].astype(np.int32))
         return flex.miller_index(h, k, l)
     elif key == "id":
-        return flex.int(handle["id"][:].astype(int))
+        return flex.int(handle["id"][rows].astype(int))
     elif key == "partial_id":
-        return flex.size_t(handle["reflection_id"][:].astype(int))
+        return flex.size_t(handle["reflection_id"][rows].astype(int))
     elif key == "entering":
-        return flex.bool(handle["entering"][:].astype(bool))
+        return flex.bool(handle["entering"][rows].astype(bool))
     elif key == "flags":
-        return flex.size_t(handle["flags"][:].astype(int))
+        return flex.size_t(handle["flags"][rows].astype(int))
     elif key == "panel":
-        return flex.size_t(handle["det_module"][:].astype(int))
+        return flex.size_t(handle["det_module"][rows].astype(int))
     elif key == "d":
-        return flex.double(handle["d"][:])
+        return flex.double(handle["d"][rows])
     elif key == "partiality":
-        return flex.double(handle["partiality"][:])
+        return flex.double(handle["partiality"][rows])
     elif key == "xyzcal.px":
-        x = flex.double(handle["predicted_px_x"][:])
-        y = flex.double(handle["predicted_px_y"][:])
-        z = flex.double(handle["predicted_frame"][:])
+        x = flex.double(handle["predicted_px_x"][rows])
+        y = flex.double(handle["predicted_px_y"][rows])
+        z = flex.double(handle["predicted_frame"][rows])
         return flex.vec3_double(x, y, z)
     elif key == "xyzcal.mm":
         x = convert_units(
-            flex.double(handle["predicted_x"][:]),
+            flex.double(handle["predicted_x"][rows]),
             handle["predicted_x"].attrs["units"],
             "mm",
         )
         y = convert_units(
-            flex.double(handle["predicted_y"][:]),
+            flex.double(handle["predicted_y"][rows]),
             handle["predicted_y"].attrs["units"],
             "mm",
         )
         z = convert_units(
-            flex.double(handle["predicted_phi"][:]),
+            flex.double(handle["predicted_phi"][rows]),
             handle["predicted_phi"].attrs["units"],
             "rad",
         )
         return flex.vec3_double(x, y, z)
     elif key == "bbox":
-        b = flex.int(handle["bounding_box"][:].astype(np.int32))
+        b = flex.int(handle["bounding_box"][rows].astype(np.int32))
         return flex.int6(b.as_1d())
     elif key == "xyzobs.px.value":
-        x = flex.double(handle["observed_px_x"][:])
-        y = flex.double(handle["observed_px_y"][:])
-        z = flex.double(handle["observed_frame"][:])
+        x = flex.double(handle["observed_px_x"][rows])
+        y = flex.double(handle["observed_px_y"][rows])
+        z = flex.double(handle["observed_frame"][rows])
         return flex.vec3_double(x, y, z)
     elif key == "xyzobs.px.variance":
-        x = flex.double(handle["observed_px_x_var"][:])
-        y = flex.double(handle["observed_px_y_var"][:])
-        z = flex.double(handle["observed_frame_var"][:])
+        x = flex.double(handle["observed_px_x_var"][rows])
+        y = flex.double(handle["observed_px_y_var"][rows])
+        z = flex.double(handle["observed_frame_var"][rows])
         return flex.vec3_double(x, y, z)
     elif key == "xyzobs.mm.value":
         x = convert_units(
-            flex.double(handle["observed_x"][:]),
+            flex.double(handle["observed_x"][rows]),
             handle["observed_x"].attrs["units"],
             "mm",
         )
         y = convert_units(
-            flex.double(handle["observed_y"][:]),
+            flex.double(handle["observed_y"][rows]),
             handle["observed_y"].attrs["units"],
             "mm",
         )
         z = convert_units(
-            flex.double(handle["observed_phi"][:]),
+            flex.double(handle["observed_phi"][rows]),
             handle["observed_phi"].attrs["units"],
             "rad",
         )
         return flex.vec3_double(x, y, z)
     elif key == "xyzobs.mm.variance":
         x = convert_units(
-            flex.double(handle["observed_x_var"][:]),
+            flex.double(handle["observed_x_var"][rows]),
             handle["observed_x_var"].attrs["units"],
             "mm",
         )
         y = convert_units(
-            flex.double(handle["observed_y_var"][:]),
+            flex.double(handle["observed_y_var"][rows]),
             handle["observed_y_var"].attrs["units"],
             "mm",
         )
         z = convert_units(
-            flex.double(handle["observed_phi_var"][:]),
+            flex.double(handle["observed_phi_var"][rows]),
             handle["observed_phi_var"].attrs["units"],
             "rad",
         )
         return flex.vec3_double(x, y, z)
     elif key == "background.mean":
-        return flex.double(handle["background_mean"][:])
+        return flex.double(handle["background_mean"][rows])
     elif key == "intensity.sum.value":
-        return flex.double(handle["int_sum"][:])
+        return flex.double(handle["int_sum"][rows])
     elif key == "intensity.sum.variance":
-        return flex.double(handle["int_sum_var"][:])
+        return flex.double(handle["int_sum_var"][rows])
     elif key == "intensity.prf.value":
-        return flex.double(handle["int_prf"][:])
+        return flex.double(handle["int_prf"][rows])
     elif key == "intensity.prf.variance":
-        return flex.double(handle["int_prf_var"][:])
+        return flex.double(handle["int_prf_var"][rows])
     elif key == "profile.correlation":
-        return flex.double(handle["prf_cc"][:])
+        return flex.double(handle["prf_cc"][rows])
     elif key == "lp":
-        return flex.double(handle["lp"][:])
+        return flex.double(handle["lp"][rows])
     elif key == "num_pixels.background":
-        return flex.int(handle["num_bg"][:].astype(np.int32))
+        return flex.int(handle["num_bg"][rows].astype(np.int32))
     elif key == "num_pixels.background_used":
-        return flex.int(handle["num_bg_used"][:].astype(np.int32))
+        return flex.int(handle["num_bg_used"][rows].astype(np.int32))
     elif key == "num_pixels.foreground":
-        return flex.int(handle["num_fg"][:].astype(np.int32))
+        return flex.int(handle["num_fg"][rows].astype(np.int32))
     elif key == "num_pixels.valid":
-        return flex.int(handle["num_valid"][:].astype(np.int32))
+        return flex.int(handle["num_valid"][rows].astype(np.int32))
     elif key == "profile.rmsd":
-        return flex.double(handle["prf_rmsd"][:])
+        return flex.double(handle["prf_rmsd"][rows])
     else:
         raise KeyError(f"Column {key} not read from file")
 
 
-def dump(entry, reflections, experiments):
+def dump(entry, reflections, experiments, compression="gzip", chunk_size=65536):
+    """Write the reflections to an NXreflections group of the entry.
+
+    Each column is written as a dataset chunked along the rows, and compressed
+    with the given HDF5 filter (or uncompressed if compression is None).
+    """
     print("Dumping NXreflections")
 
     # Add the feature
@@ -347,7 +365,7 @@ def dump(entry, reflections, experiments):
     # For each column in the reflection table dump to file
     for key, data in reflections.cols():
         try:
-            write(refls, key, data)
+            write(refls, key, data, compression=compression, chunk_size=chunk_size)
         except KeyError as e:
             print(e.args[0])
 
@@ -362,7 +380,11 @@ def dump(entry, reflections, experiments):
     # make_vlen_uint(refls, "overlaps", overlaps, "Reflection overlap list")
 
 
-def load(entry):
+def load(entry, columns=None, rows=None):
+    """Read the reflections from the NXreflections group of the entry.
+
+    Optionally only a subset of the columns, and a slice of the rows, are read.
+    """
     print("Loading NXreflections")
 
     # Check the feature is present
@@ -384,7 +406,7 @@ def load(entry):
     experiments = list(refls["experiments"])
 
     # The columns to try
-    columns = [
+    columns_all = [
         "miller_index",
         "id",
         "partial_id",
@@ -414,13 +436,20 @@ def load(entry):
         "profile.rmsd",
     ]
 
+    if columns is not None:
+        columns = [key for key in columns_all if key in columns]
+    else:
+        columns = columns_all
+    if rows is None:
+        rows = slice(None)
+
     # The reflection table
     table = None
 
     # For each column in the reflection table dump to file
     for key in columns:
         try:
-            col = read(refls, key)
+            col = read(refls, key, rows)
         except KeyError:
             continue
         if table is None:
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import copy
 import itertools
 import logging
+import operator
 import os
 import pickle
 import sys
@@ -14,7 +16,10 @@
 
 from orderedset import OrderedSet
 
+import dxtbx.sequence_filenames
 import libtbx.phil
+from dxtbx.format.Registry import get_format_class_for_file
+from dxtbx.imageset import ImageSequence
 from dxtbx.model import ExperimentList
 from dxtbx.model.experiment_list import ExperimentListFactory
 from dxtbx.util import get_url_scheme
@@ -149,6 +154,154 @@ class InvalidPhilError(ValueError):
 )
 
 
+def _read_experiments_from_filenames_worker(filenames, kwargs):
+    unhandled = []
+    experiments = ExperimentListFactory.from_filenames(
+        filenames, unhandled=unhandled, **kwargs
+    )
+    return experiments, unhandled
+
+
+def _is_stills_template(filename, format_kwargs=None):
+    """Check whether the first image of a template is a still, rather than part
+    of a rotation sequence, by reading it with its format class"""
+    format_class = get_format_class_for_file(filename)
+    if format_class is None:
+        return False
+    try:
+        scan = format_class.get_instance(filename, **(format_kwargs or {})).get_scan()
+    except Exception:
+        return False
+    return scan is None or scan.is_still()
+
+
+def _share_equal_models(
+    experiments, compare_beam=None, compare_detector=None, compare_goniometer=None
+):
+    """Share equal beam, detector and goniometer models between the rotation
+    sequences read in different processes, as for sequences read in a single
+    call to ExperimentListFactory.from_filenames"""
+    comparisons = {
+        "beam": compare_beam or operator.eq,
+        "detector": compare_detector or operator.eq,
+        "goniometer": compare_goniometer or operator.eq,
+    }
+    models = {name: [] for name in comparisons}
+    for imageset in experiments.imagesets():
+        if not isinstance(imageset, ImageSequence):
+            continue
+        for name, compare in comparisons.items():
+            model = getattr(imageset, f"get_{name}")()
+            if model is None:
+                continue
+            for other in models[name]:
+                if other is model:
+                    break
+                if compare(other, model):
+                    getattr(imageset, f"set_{name}")(other)
+                    break
+            else:
+                models[name].append(model)
+    for experiment in experiments:
+        if isinstance(experiment.imageset, ImageSequence):
+            experiment.beam = experiment.imageset.get_beam()
+            experiment.detector = experiment.imageset.get_detector()
+            experiment.goniometer = experiment.imageset.get_goniometer()
+
+
+def _expand_directories(filenames):
+    """Replace any directories in a list of paths by the files they contain, in
+    sorted order, as ExperimentListFactory.from_filenames would read them"""
+    paths = []
+    for filename in filenames:
+        if os.path.isdir(filename):
+            paths.extend(
+                _expand_directories(
+                    sorted(os.path.join(filename, f) for f in os.listdir(filename))
+                )
+            )
+        else:
+            paths.append(filename)
+    return paths
+
+
+def read_experiments_from_filenames(filenames, nproc=1, unhandled=None, **kwargs):
+    """
+    Read experiments from a list of image files or directories, using nproc
+    processes to read the image headers.
+
+    The files are grouped by their template, and each process reads whole
+    groups so that the format class found for the first image of a template is
+    reused for the rest of it. Templates of still images with more images than
+    a single process should read are divided between processes, and are then
+    imported as more than one imageset. Templates whose first image is part of
+    a rotation sequence are always read whole by a single process, so that the
+    sequence is kept whole, and equal beam, detector and goniometer models of
+    sequences read by different processes are shared afterwards, as with
+    nproc=1. Equal models of still images read by different processes are not
+    shared.
+
+    Args:
+        filenames: The image files and directories to read.
+        nproc: The number of processes to use.
+        unhandled: If not None, a list to append any unrecognised files to.
+        **kwargs: Further arguments to ExperimentListFactory.from_filenames.
+
+    Returns:
+        The ExperimentList read from the files.
+    """
+    if nproc > 1:
+        filenames = _expand_directories(filenames)
+    if nproc == 1 or len(filenames) < 2:
+        return ExperimentListFactory.from_filenames(
+            filenames, unhandled=unhandled, **kwargs
+        )
+
+    # Divide the files into chunks of whole templates, splitting any template of
+    # still images that is larger than a chunk
+    chunk_size = -(-len(filenames) // (4 * nproc))
+    chunks = []
+    split = False
+    for template, group in itertools.groupby(
+        filenames, key=lambda f: dxtbx.sequence_filenames.template_regex(f)[0]
+    ):
+        group = list(group)
+        if len(group) > chunk_size and _is_stills_template(
+            group[0], kwargs.get("format_kwargs")
+        ):
+            chunks.extend(
+                group[i : i + chunk_size] for i in range(0, len(group), chunk_size)
+            )
+            split = True
+        elif chunks and not split and len(chunks[-1]) + len(group) <= chunk_size:
+            chunks[-1].extend(group)
+        else:
+            chunks.append(group)
+            split = False
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=nproc) as pool:
+        results = list(
+            pool.map(
+                _read_experiments_from_filenames_worker,
+                chunks,
+                itertools.repeat(kwargs),
+            )
+        )
+
+    experiments = ExperimentList()
+    for chunk_experiments, chunk_unhandled in results:
+        experiments.extend(chunk_experiments)
+        if unhandled is not None:
+            unhandled.extend(chunk_unhandled)
+    _share_equal_models(
+        experiments,
+        compare_beam=kwargs.get("compare_beam"),
+        compare_detector=kwargs.get("compare_detector"),
+        compare_goniometer=kwargs.get("compare_goniometer"),
+    )
+    return experiments
+
+
 # Simple tuple to hold basic information on why an argument failed
 ArgumentHandlingErrorInfo = namedtuple(
     "ArgumentHandlingErrorInfo",
@@ -173,6 +326,7 @@ def __init__(
         scan_tolerance=None,
         format_kwargs=None,
         load_models=True,
+        nproc=1,
     ):
         """
         Parse the arguments. Populates its instance attributes in an intelligent way
@@ -193,6 +347,7 @@ def __init__(
         :param check_format: Check the format when reading images
         :param verbose: True/False print out some stuff
         :param load_models: Whether to load all models for ExperimentLists
+        :param nproc: The number of processes to use to read images
         """
 
         # Initialise output
@@ -213,6 +368,7 @@ def __init__(
                 scan_tolerance,
                 format_kwargs,
                 load_models,
+                nproc,
             )
 
         # Second try to read experiment files
@@ -248,6 +404,7 @@ def try_read_experiments_from_images(
         scan_tolerance,
         format_kwargs,
         load_models=True,
+        nproc=1,
     ):
         """
         Try to import images.
@@ -260,10 +417,9 @@ def try_read_experiments_from_images(
         :param scan_tolerance:
         :param format_kwargs:
         :param load_models: Whether to load all models for ExperimentLists
+        :param nproc: The number of processes to use to read the image headers
         :return: Unhandled arguments
         """
-        from dxtbx.model.experiment_list import ExperimentListFactory
-
         # If filenames contain wildcards, expand
         args_new = []
         for arg in args:
@@ -281,8 +437,9 @@ def try_read_experiments_from_images(
         unhandled = []
 
         try:
-            experiments = ExperimentListFactory.from_filenames(
+            experiments = read_experiments_from_filenames(
                 args,
+                nproc=nproc,
                 unhandled=unhandled,
                 compare_beam=compare_beam,
                 compare_detector=compare_detector,
@@ -554,6 +711,11 @@ def _is_a_phil_file(filename):
         except AttributeError:
             load_models = True
 
+        try:
+            nproc = params.input.nproc
+        except AttributeError:
+            nproc = 1
+
         # Try to import everything
         importer = Importer(
             unhandled,
@@ -568,6 +730,7 @@ def _is_a_phil_file(filename):
             scan_tolerance=scan_tolerance,
             format_kwargs=format_kwargs,
             load_models=load_models,
+            nproc=nproc,
         )
 
         # Grab a copy of the errors that occurred in case the caller wants them
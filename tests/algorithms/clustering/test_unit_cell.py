@@ -3,8 +3,12 @@
 import random
 
 import numpy as np
+import pytest
+import scipy.spatial.distance as ssd
+from scipy.cluster import hierarchy
 
-from cctbx import sgtbx
+from cctbx import crystal, sgtbx, uctbx
+from cctbx.uctbx.determine_unit_cell import NCDist
 
 from dials.algorithms.clustering.unit_cell import cluster_unit_cells
 
@@ -22,3 +26,33 @@ def test_unit_cell():
     assert len(result.clusters) == 1
     assert "dcoord" in result.dendrogram.keys()
     assert isinstance(result.linkage_matrix, np.ndarray)
+
+
+@pytest.mark.parametrize("nproc", [1, 2])
+def test_unit_cell_linkage_matches_scipy(nproc):
+    rng = np.random.default_rng(42)
+    crystal_symmetries = []
+    for i in range(40):
+        params = [78, 78, 38, 90, 90, 90] if i % 3 else [60, 80, 100, 90, 95, 90]
+        params = np.array(params) + rng.normal(0, 0.5, 6)
+        crystal_symmetries.append(
+            crystal.symmetry(
+                unit_cell=uctbx.unit_cell(list(params)).niggli_cell(),
+                space_group_symbol="P1",
+            )
+        )
+    result = cluster_unit_cells(crystal_symmetries, threshold=1000, nproc=nproc)
+    assert len(result.clusters) == 2
+
+    uc = np.array([cs.unit_cell().parameters() for cs in crystal_symmetries])
+    cos = np.cos(np.radians(uc[:, 3:]))
+    g6_cells = np.column_stack(
+        [
+            uc[:, :3] ** 2,
+            2 * uc[:, 1] * uc[:, 2] * cos[:, 0],
+            2 * uc[:, 0] * uc[:, 2] * cos[:, 1],
+            2 * uc[:, 0] * uc[:, 1] * cos[:, 2],
+        ]
+    )
+    expected = hierarchy.linkage(ssd.pdist(g6_cells, metric=NCDist), method="single")
+    assert np.array_equal(result.linkage_matrix, expected)
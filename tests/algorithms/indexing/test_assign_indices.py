@@ -26,6 +26,7 @@
 from dials.algorithms.indexing.assign_indices import (
     AssignIndicesGlobal,
     AssignIndicesLocal,
+    count_indexed_for_candidates,
 )
 from dials.array_family import flex
 
@@ -246,6 +247,41 @@ def test_index_reflections(dials_regression: Path):
     assert dict(counts) == {-1: 1390, 0: 114692}
 
 
+def test_count_indexed_for_candidates(experiment, crystal_factory):
+    cryst_model = crystal_factory("P 2 2 2")
+    experiment.crystal = cryst_model
+
+    reflections = flex.reflection_table.from_predictions(experiment)
+    reflections["xyzobs.mm.value"] = reflections["xyzcal.mm"]
+    reflections["imageset_id"] = flex.int(len(reflections), 0)
+    reflections.map_centroids_to_reciprocal_space(ExperimentList([experiment]))
+
+    A = matrix.sqr(cryst_model.get_A())
+    candidates = [A] + [random_rotation(angle_max=5) * A for i in range(4)]
+    # exercise the chunking of candidates
+    n_indexed = count_indexed_for_candidates(
+        reflections["rlp"], candidates, max_elements=6 * len(reflections)
+    )
+    assert list(n_indexed) == list(
+        count_indexed_for_candidates(reflections["rlp"], candidates)
+    )
+    assert n_indexed[0] == len(reflections)
+
+    for A_cand, n in zip(candidates, n_indexed):
+        direct_matrix = A_cand.inverse()
+        experiment.crystal = Crystal(
+            direct_matrix[0:3],
+            direct_matrix[3:6],
+            direct_matrix[6:9],
+            space_group=cryst_model.get_space_group(),
+        )
+        refl = copy.deepcopy(reflections)
+        refl["id"] = flex.int(len(refl), -1)
+        AssignIndicesGlobal(tolerance=0.3)(refl, ExperimentList([experiment]))
+        # duplicate miller indices are not resolved, so this is an upper bound
+        assert refl["id"].count(0) <= n
+
+
 def test_local_multiple_rotations(dials_data):
     """Test the fix for https://github.com/dials/dials/issues/1458"""
 
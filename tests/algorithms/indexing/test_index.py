@@ -416,6 +416,84 @@ def test_index_insulin_force_stills(insulin_spotfinding_stills, tmp_path, method
     )
 
 
+@pytest.mark.parametrize(
+    "candidate_args",
+    [
+        ["stills.candidate_evaluation.method=threads", "indexing.nproc=2"],
+        ["stills.candidate_evaluation.method=processes", "indexing.nproc=2"],
+        [
+            "stills.candidate_evaluation.min_fraction_indexed=0.1",
+            "stills.candidate_evaluation.stop.rmsd_px=1.0",
+        ],
+    ],
+)
+def test_index_insulin_force_stills_candidate_evaluation(
+    insulin_spotfinding_stills, tmp_path, candidate_args
+):
+    experiment, reflections = insulin_spotfinding_stills
+    expected_unit_cell = uctbx.unit_cell(
+        (78.092, 78.092, 78.092, 90.000, 90.000, 90.000)
+    )
+    expected_hall_symbol = " I 2 2 3"
+    expected_rmsds = (0.05, 0.06, 0.01)
+
+    extra_args = [
+        "stills.indexer=stills",
+        'known_symmetry.unit_cell="%s %s %s %s %s %s"'
+        % expected_unit_cell.parameters(),
+        f'known_symmetry.space_group="Hall: {expected_hall_symbol}"',
+        "indexing.method=fft3d",
+    ] + candidate_args
+
+    run_indexing(
+        reflections,
+        experiment,
+        tmp_path,
+        extra_args,
+        expected_unit_cell,
+        expected_rmsds,
+        expected_hall_symbol,
+    )
+
+
+@pytest.mark.parametrize("method", ["serial", "threads"])
+def test_stills_candidate_evaluation_identify_outliers_override(monkeypatch, method):
+    from types import SimpleNamespace
+
+    from dials.algorithms.indexing import stills_indexer
+
+    class CustomStillsIndexer(stills_indexer.StillsIndexer):
+        def identify_outliers(self, params, experiments, indexed):
+            called.append(experiments)
+            return indexed
+
+    def fake_refine_candidate(
+        params, symmetry_handler, icm, experiments, indexed, identify_outliers
+    ):
+        identify_outliers(params, experiments, indexed)
+        return stills_indexer.CandidateInfo(icm=icm, rmsd=None)
+
+    monkeypatch.setattr(stills_indexer, "refine_candidate", fake_refine_candidate)
+    called = []
+    indexer = CustomStillsIndexer.__new__(CustomStillsIndexer)
+    indexer.params = SimpleNamespace(
+        nproc=2,
+        known_symmetry=SimpleNamespace(space_group=None),
+        stills=SimpleNamespace(
+            candidate_evaluation=SimpleNamespace(
+                method=method, stop=SimpleNamespace(rmsd_px=None, min_indexed=None)
+            )
+        ),
+    )
+    prescored = [
+        SimpleNamespace(icm=i, experiments=f"experiments_{i}", indexed=None)
+        for i in range(3)
+    ]
+    candidates = indexer._refine_candidates(prescored, params=None)
+    assert [c.icm for c in candidates] == [0, 1, 2]
+    assert sorted(called) == ["experiments_0", "experiments_1", "experiments_2"]
+
+
 def test_multiple_experiments(dials_regression: pathlib.Path, tmp_path):
     # Test indexing 4 lysozyme still shots in a single dials.index job
     #   - the first image doesn't index
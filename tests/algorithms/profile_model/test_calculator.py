@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import random
+
+import pytest
+
+from dxtbx.model import ScanFactory
+
 from dials.algorithms.profile_model.gaussian_rs.calculator import (
+    _calculate_tau_and_zeta,
     _select_reflections_for_sigma_calc,
 )
+from dials.algorithms.shoebox import MaskCode
 from dials.array_family import flex
+from dials.model.data import Shoebox
 
 
 def test_select_reflections_for_sigma_calc():
@@ -40,3 +49,68 @@ def test_select_reflections_for_sigma_calc():
     )
     assert reflections.size() > 700
     assert reflections.size() < 1000
+
+
+@pytest.mark.parametrize("use_intensity", [False, True])
+def test_calculate_tau_and_zeta(use_intensity):
+    """Compare the vectorised tau/zeta calculation to a per-frame loop."""
+    random.seed(0)
+    scan = ScanFactory.make_scan(
+        image_range=(1, 30),
+        exposure_times=0.1,
+        oscillation=(10, 0.2),
+        epochs=[0] * 30,
+    )
+    mask_code = MaskCode.Valid | MaskCode.Foreground
+    mask_values = [0, MaskCode.Valid, mask_code, MaskCode.Foreground]
+
+    reflections = flex.reflection_table()
+    shoeboxes = flex.shoebox()
+    for _ in range(20):
+        x0, y0, z0 = random.randint(0, 50), random.randint(0, 50), random.randint(0, 25)
+        bbox = (x0, x0 + random.randint(1, 4), y0, y0 + random.randint(1, 4))
+        bbox += (z0, z0 + random.randint(1, 5))
+        shoebox = Shoebox(bbox)
+        shoebox.allocate()
+        grid = shoebox.mask.accessor()
+        mask = flex.int(random.choice(mask_values) for _ in range(grid.size_1d()))
+        data = flex.float(random.uniform(-1, 5) for _ in range(grid.size_1d()))
+        mask.reshape(grid)
+        data.reshape(grid)
+        shoebox.mask = mask
+        shoebox.data = data
+        shoeboxes.append(shoebox)
+    reflections["shoebox"] = shoeboxes
+    reflections["xyzcal.mm"] = flex.vec3_double(
+        [(0, 0, random.uniform(0.17, 0.27)) for _ in range(20)]
+    )
+    reflections["zeta"] = flex.double([random.uniform(0.1, 1) for _ in range(20)])
+
+    tau, zeta, num, indices = _calculate_tau_and_zeta(
+        scan, reflections, use_intensity=use_intensity
+    )
+
+    expected_tau, expected_zeta, expected_num, expected_indices = [], [], [], [0]
+    for s, (_, _, p), z in zip(
+        shoeboxes, reflections["xyzcal.mm"], reflections["zeta"]
+    ):
+        for z0, f in enumerate(range(s.bbox[4], s.bbox[5])):
+            phi0 = scan.get_angle_from_array_index(f, deg=False)
+            phi1 = scan.get_angle_from_array_index(f + 1, deg=False)
+            m = s.mask[z0 : z0 + 1, :, :].as_1d()
+            d = s.data[z0 : z0 + 1, :, :].as_1d()
+            if use_intensity:
+                value = flex.sum(d.select(m == mask_code))
+            else:
+                value = m.count(mask_code)
+            if value > 0:
+                expected_tau.append((phi1 + phi0) / 2.0 - p)
+                expected_zeta.append(z)
+                expected_num.append(value)
+        if len(expected_zeta) > expected_indices[-1]:
+            expected_indices.append(len(expected_zeta))
+
+    assert list(tau) == pytest.approx(expected_tau)
+    assert list(zeta) == pytest.approx(expected_zeta)
+    assert list(num) == pytest.approx(expected_num, rel=1e-5)
+    assert list(indices) == expected_indices
@@ -214,3 +214,29 @@ def test_cross_validate_script():
             param.cross_validation.cross_validation_mode = "bad"
             with pytest.raises(ValueError):
                 cross_validate(param, crossvalidator)
+
+
+class OffsetCrossValidator(DialsScaleCrossValidator):
+    """A cross validator returning results that identify the job run."""
+
+    def calculate_results(self, params):
+        offset = params.scaling_options.free_set_offset
+        return [float(offset), 0.0, 0.0, 0.0, 0.0, 0.0]
+
+
+def test_cross_validate_nproc():
+    """Test the spreading of the configuration runs over several processes."""
+    param = generated_param()
+    param.cross_validation.cross_validation_mode = "multi"
+    param.cross_validation.parameter = "physical.absorption_correction"
+    param.cross_validation.nfolds = 3
+    param.cross_validation.nproc = 2
+
+    crossvalidator = OffsetCrossValidator([], [])
+    fpath = "dials.algorithms.scaling.cross_validation."
+    with mock.patch(fpath + "crossvalidator.CrossValidator.interpret_results"):
+        cross_validate(param, crossvalidator)
+    for config_no, config in enumerate(["True", "False"]):
+        result = crossvalidator.results_dict[config_no]
+        assert result["configuration"] == [f"physical.absorption_correction={config}"]
+        assert result["work Rmeas"] == [0.0, 1.0, 2.0]
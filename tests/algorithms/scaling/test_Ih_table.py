@@ -10,7 +10,13 @@
 from dxtbx import flumpy
 from scitbx import sparse
 
-from dials.algorithms.scaling.Ih_table import IhTable, IhTableBlock, map_indices_to_asu
+from dials.algorithms.scaling.Ih_table import (
+    AsuIndexLookup,
+    IhTable,
+    IhTableBlock,
+    map_indices_to_asu,
+    pack_miller_indices,
+)
 from dials.array_family import flex
 
 
@@ -633,6 +639,24 @@ def test_set_Ih_values_to_target(test_sg):
     assert list(block_list[1].Ih_values) == [0.4, 0.4, 0.4]
 
 
+def test_asu_index_lookup():
+    """Test the vectorised matching of miller indices against a target."""
+    target = flex.miller_index(
+        [(1, 0, 0), (0, 0, 2), (-3, 1, 5), (1, 0, 0), (0, -2, 0)]
+    )
+    keys = pack_miller_indices(target)
+    assert len(set(keys)) == 4
+    assert keys[0] == keys[3]
+
+    lookup = AsuIndexLookup(target)
+    indices = flex.miller_index(
+        [(0, 0, 2), (4, 0, 0), (1, 0, 0), (0, -2, 0), (-3, 1, 5), (0, 2, 0)]
+    )
+    # the last occurrence of a repeated index is returned, as for a dict
+    assert list(lookup.find(indices)) == [1, -1, 3, 4, 2, -1]
+    assert list(lookup.find(flex.miller_index())) == []
+
+
 '''@pytest.mark.xfail(reason='not yet updated code')
 def test_apply_iterative_weighting(reflection_table_for_block, test_sg):
   """Test the setting of iterative weights."""
@@ -174,7 +174,7 @@ def test_error_model_on_simulated_data(
 
     error_model = BasicErrorModel()
     error_model.configure_for_refinement(block)
-    assert error_model.binner.summation_matrix.n_rows > 400
+    assert error_model.binner.summation_matrix.shape[0] > 400
     refinery = ErrorModelRefinery(error_model, parameters_to_refine=["a", "b"])
     refinery.run()
     assert refinery.model.parameters[0] == pytest.approx(model_a, abs=abs_tolerances[0])
@@ -206,7 +206,7 @@ def test_errormodel(large_reflection_table, test_sg, use_stills_filtering):
     assert error_model.binner.summation_matrix[2, 0] == 1
     assert error_model.binner.summation_matrix[3, 0] == 1
     assert error_model.binner.summation_matrix[4, 0] == 1
-    assert error_model.binner.summation_matrix.non_zeroes == 5
+    assert error_model.binner.summation_matrix.nnz == 5
     assert list(error_model.binner.binning_info["refl_per_bin"]) == [3, 2]
 
     # Test calc sigmaprime
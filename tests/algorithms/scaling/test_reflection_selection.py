@@ -7,9 +7,11 @@
 import itertools
 from unittest.mock import Mock
 
+import numpy as np
+from scipy.sparse import csc_matrix
+
 from cctbx import sgtbx, uctbx
 from libtbx import phil
-from scitbx import sparse
 
 from dials.algorithms.scaling.Ih_table import IhTable
 from dials.algorithms.scaling.reflection_selection import (
@@ -94,18 +96,15 @@ def test_loop_over_class_matrix():
     { 2, 2, 0, 0, 3, 1, 0 },
     { 1, 4, 2, 1, 0, 0, 5 },
     """
-    sorted_class_matrix = sparse.matrix(
-        3,
-        7,
-        elements_by_columns=[
-            {0: 3, 1: 2, 2: 1},
-            {0: 1, 1: 2, 2: 4},
-            {0: 3, 2: 2},
-            {0: 2, 2: 1},
-            {0: 1, 1: 3},
-            {0: 1},
-            {2: 5},
-        ],
+    sorted_class_matrix = csc_matrix(
+        np.array(
+            [
+                [3, 1, 3, 2, 1, 1, 0],
+                [2, 2, 0, 0, 3, 0, 0],
+                [1, 4, 2, 1, 0, 0, 5],
+            ],
+            dtype=np.float64,
+        )
     )
 
     # first test if don't meet the minimum number
@@ -773,6 +773,48 @@ def test_scale_and_filter_dataset_mode(dials_data, tmp_path):
     assert set(refls["id"]) == {0, 1, 2, 3, 5, 6}
 
 
+def test_scale_and_filter_warm_start(dials_data, tmp_path):
+    """Test that reusing the scalers between cycles gives the same filtering."""
+    location = dials_data("multi_crystal_proteinase_k", pathlib=True)
+    results = {}
+    for warm_start in (True, False):
+        run_dir = tmp_path / str(warm_start)
+        run_dir.mkdir()
+        command = [
+            shutil.which("dials.scale"),
+            "filtering.method=deltacchalf",
+            "stdcutoff=1.0",
+            "mode=dataset",
+            "max_cycles=2",
+            "d_min=1.4",
+            f"filtering.deltacchalf.warm_start={warm_start}",
+            "scale_and_filter_results=analysis_results.json",
+            "error_model=None",
+        ]
+        for i in [1, 2, 3, 4, 5, 7, 10]:
+            command.append(location / f"experiments_{i}.json")
+            command.append(location / f"reflections_{i}.pickle")
+
+        result = subprocess.run(command, cwd=run_dir, capture_output=True)
+        assert not result.returncode and not result.stderr
+        with open(run_dir / "analysis_results.json") as fh:
+            results[warm_start] = json.load(fh)
+
+    warm, cold = results[True], results[False]
+    assert warm["termination_reason"] == cold["termination_reason"]
+    assert warm["cycle_results"].keys() == cold["cycle_results"].keys()
+    for cycle, cycle_results in warm["cycle_results"].items():
+        expected = cold["cycle_results"][cycle]
+        assert cycle_results["removed_datasets"] == expected["removed_datasets"]
+        assert cycle_results["merging_stats"]["overall"] == pytest.approx(
+            expected["merging_stats"]["overall"], rel=0.02
+        )
+    if cold["final_stats"]:
+        assert warm["final_stats"]["overall"] == pytest.approx(
+            cold["final_stats"]["overall"], rel=0.02
+        )
+
+
 def test_scale_array(dials_data, tmp_path):
     """Test a standard dataset - ideally needs a large dataset or full matrix
     round may fail. Currently turning off absorption term to avoid
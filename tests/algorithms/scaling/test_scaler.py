@@ -19,7 +19,7 @@
     TargetScaler,
     calc_sf_variances,
 )
-from dials.algorithms.scaling.scaler_factory import create_scaler
+from dials.algorithms.scaling.scaler_factory import SingleScalerFactory, create_scaler
 from dials.algorithms.scaling.scaling_library import create_scaling_model
 from dials.algorithms.scaling.scaling_utilities import calculate_prescaling_correction
 from dials.algorithms.scaling.target_function import ScalingTarget
@@ -390,6 +390,39 @@ def test_multiscaler_initialisation():
         )
 
 
+def test_SingleScaler_reset_reflection_table():
+    """Test reuse of a scaler with a new table of the same reflections."""
+    p, e, r = (generated_param(), generated_exp(), generated_refl())
+    r["intensity.sum.value"] = flex.double(r["intensity"])
+    r["intensity.sum.variance"] = flex.double(8, 1.0)
+    exp = create_scaling_model(p, e, [r])
+    scaler = SingleScalerFactory.create(p, exp[0], r, for_multi=True)
+    outliers = [False] * 3 + [True] + [False] * 3
+    scaler.outliers = flex.bool(outliers)
+
+    # adjust the table as when preparing the reflection tables for output
+    r["variance"] *= 2.0
+    r["inverse_scale_factor"] = flex.double(8, 2.0)
+    scaler.clean_reflection_table()
+    new_table = r.select(flex.bool(8, True))
+
+    scaler.reset_reflection_table(new_table)
+    assert scaler.reflection_table is new_table
+    assert list(new_table["intensity"]) == list(new_table["intensity.sum.value"])
+    assert list(new_table["variance"]) == [1.0] * 8
+    assert scaler.var_cov_matrix.non_zeroes == 0
+    assert list(scaler.outliers) == outliers
+    assert list(scaler.scaling_selection) == [not o for o in outliers]
+    assert scaler.global_Ih_table is None
+
+    # the reused scaler can be used to configure a new multiscaler
+    multiscaler = MultiScaler([scaler])
+    assert multiscaler.Ih_table.size == 6
+    assert list(multiscaler.Ih_table.blocked_data_list[0].inverse_scale_factors) == (
+        [2.0] * 6
+    )
+
+
 def test_targetscaler_initialisation():
     """Unit tests for the MultiScalerBase class."""
     p, e = (generated_param(), generated_exp(2))
@@ -3,6 +3,7 @@
 import pytest
 
 from cctbx import crystal, miller, sgtbx
+from scitbx.array_family import flex
 
 from dials.algorithms.symmetry.cosym._generate_test_data import generate_intensities
 from dials.algorithms.symmetry.laue_group import LaueGroupAnalysis
@@ -74,3 +75,23 @@ def test_determine_space_group_best_monoclinic_beta():
     assert cs.change_basis(
         sgtbx.change_of_basis_op(d["subgroup_scores"][0]["cb_op"])
     ).is_similar_symmetry(result.best_solution.subgroup["best_subsym"])
+
+
+def test_determine_space_group_nproc():
+    sgi = sgtbx.space_group_info(symbol="P422")
+    cs = sgi.any_compatible_crystal_symmetry(volume=10000).minimum_cell()
+    intensities = generate_fake_intensities(cs)
+    results = []
+    for nproc in (1, 2):
+        flex.set_random_seed(0)
+        results.append(
+            LaueGroupAnalysis([intensities], normalisation=None, nproc=nproc)
+        )
+    assert results[0].cc_sig_fac == results[1].cc_sig_fac
+    assert [score.as_dict() for score in results[0].sym_op_scores] == [
+        score.as_dict() for score in results[1].sym_op_scores
+    ]
+    assert (
+        results[1].best_solution.subgroup["best_subsym"].space_group()
+        == sgi.group().build_derived_patterson_group()
+    )
@@ -9,8 +9,13 @@
 import shutil
 import subprocess
 
+import numpy as np
 import pytest
 
+from dxtbx import flumpy
+from dxtbx.format.Format import Reader
+from dxtbx.imageset import ImageSet, ImageSetData
+from dxtbx.model import Beam, Crystal, DetectorFactory, Experiment, ExperimentList
 from dxtbx.model.experiment_list import ExperimentListFactory
 from dxtbx.serialize import load
 
@@ -465,3 +470,85 @@ def test_combine_imagesets(dials_data, tmp_path):
     expts2 = combine_experiments_no_reflections(params, list_of_elists)
     assert len(expts2) == 4
     assert expts2.identifiers() == expts.identifiers()
+
+
+def test_combine_many_experiments():
+    """Combine synthetic multi-lattice stills with many experiments per file"""
+    n_files, n_imagesets, n_refl = 3, 100, 20000
+    beam = Beam((0, 0, 1), 1.0)
+    detector = DetectorFactory.simple(
+        "PAD", 100, (50, 50), "+x", "-y", (0.172, 0.172), (1000, 1000)
+    )
+    rng = np.random.default_rng(0)
+
+    list_of_elists = []
+    list_of_tables = []
+    for f in range(n_files):
+        elist = ExperimentList()
+        for j in range(n_imagesets):
+            imageset = ImageSet(
+                ImageSetData(Reader(None, [f"image_{f}_{j}.cbf"]), None)
+            )
+            # Two lattices per image
+            for _ in range(2):
+                elist.append(
+                    Experiment(
+                        imageset=imageset,
+                        beam=beam,
+                        detector=detector,
+                        crystal=Crystal((10, 0, 0), (0, 11, 0), (0, 0, 12), "P1"),
+                        identifier=f"{f}-{len(elist)}",
+                    )
+                )
+        ids = rng.integers(-1, len(elist), n_refl).astype(np.int32)
+        imageset_ids = np.where(
+            ids >= 0, ids // 2, rng.integers(0, n_imagesets, n_refl)
+        ).astype(np.int32)
+        table = flex.reflection_table()
+        table["id"] = flumpy.from_numpy(ids)
+        table["imageset_id"] = flumpy.from_numpy(imageset_ids)
+        table["row"] = flumpy.from_numpy(np.arange(n_refl, dtype=np.int32))
+        for i, expt in enumerate(elist):
+            table.experiment_identifiers()[i] = expt.identifier
+        list_of_elists.append(elist)
+        list_of_tables.append(table)
+    expected = [
+        (
+            flumpy.to_numpy(t["id"]).copy(),
+            flumpy.to_numpy(t["imageset_id"]).copy(),
+        )
+        for t in list_of_tables
+    ]
+
+    params = phil_scope.extract()
+    expts, refls = combine_experiments(params, list_of_elists, list_of_tables)
+
+    n_expts = 2 * n_imagesets
+    assert len(expts) == n_files * n_expts
+    assert len(expts.imagesets()) == n_files * n_imagesets
+    assert len(refls) == n_files * n_refl
+    assert list(expts.identifiers()) == list(refls.experiment_identifiers().values())
+
+    new_ids = flumpy.to_numpy(refls["id"])
+    new_imageset_ids = flumpy.to_numpy(refls["imageset_id"])
+    rows = flumpy.to_numpy(refls["row"])
+    offset = 0
+    for f, (ids, imageset_ids) in enumerate(expected):
+        # Indexed reflections come first, in experiment order, with the
+        # input order preserved within each experiment
+        for i in range(n_expts):
+            sel = np.flatnonzero(ids == i)
+            block = slice(offset, offset + len(sel))
+            assert (rows[block] == sel).all()
+            assert (new_ids[block] == f * n_expts + i).all()
+            assert (new_imageset_ids[block] == f * n_imagesets + i // 2).all()
+            offset += len(sel)
+        # followed by the unindexed reflections, grouped by imageset
+        n_unindexed = np.count_nonzero(ids == -1)
+        block = slice(offset, offset + n_unindexed)
+        assert (new_ids[block] == -1).all()
+        assert (
+            new_imageset_ids[block] == f * n_imagesets + imageset_ids[rows[block]]
+        ).all()
+        assert sorted(rows[block]) == list(np.flatnonzero(ids == -1))
+        offset += n_unindexed
@@ -933,3 +933,75 @@ def test_import_stills(dials_data, tmp_path):
         in result.stdout.decode()
     )
     assert result.stdout.count(b"template:") == 1
+
+
+def test_import_nproc(dials_data, tmp_path):
+    # Still images may be divided between imagesets
+    data_dir = (
+        dials_data("4fluoro_cxi", pathlib=True)
+        / "lcls_2022_smSFX_workshop_data"
+        / "ten_cbfs"
+    )
+    result = subprocess.run(
+        [
+            shutil.which("dials.import"),
+            data_dir / "cxily6520_r0164_*.cbf",
+            "input.nproc=2",
+            "output.experiments=stills.expt",
+        ],
+        capture_output=True,
+        cwd=tmp_path,
+    )
+    assert not result.returncode and not result.stderr
+    experiments = load.experiment_list(tmp_path / "stills.expt", check_format=False)
+    assert len(experiments) == 10
+    assert [p for imageset in experiments.imagesets() for p in imageset.paths()] == [
+        str(p) for p in sorted(data_dir.glob("cxily6520_r0164_*.cbf"))
+    ]
+
+    # A rotation sequence must be kept whole
+    image_files = sorted(
+        dials_data("centroid_test_data", pathlib=True).glob("centroid*.cbf")
+    )
+    result = subprocess.run(
+        [shutil.which("dials.import"), "input.nproc=2", "output.experiments=rot.expt"]
+        + image_files,
+        cwd=tmp_path,
+        capture_output=True,
+    )
+    assert not result.returncode and not result.stderr
+    experiments = load.experiment_list(tmp_path / "rot.expt", check_format=False)
+    assert len(experiments) == 1
+    assert isinstance(experiments[0].imageset, ImageSequence)
+    assert len(experiments[0].imageset) == len(image_files)
+
+
+def test_import_nproc_shared_models(dials_data, tmp_path):
+    # Sweeps read by different processes share equal models, as with nproc=1
+    data_dir = dials_data("l_cysteine_dials_output", pathlib=True)
+    image_files = sorted(data_dir.glob("l-cyst_01_000*.cbf")) + sorted(
+        data_dir.glob("l-cyst_02_000*.cbf")
+    )
+    models = {}
+    for nproc in (1, 2):
+        result = subprocess.run(
+            [
+                shutil.which("dials.import"),
+                f"input.nproc={nproc}",
+                f"output.experiments=imported_{nproc}.expt",
+            ]
+            + image_files,
+            cwd=tmp_path,
+            capture_output=True,
+        )
+        assert not result.returncode and not result.stderr
+        experiments = load.experiment_list(
+            tmp_path / f"imported_{nproc}.expt", check_format=False
+        )
+        assert len(experiments) == 2
+        models[nproc] = (
+            len(experiments.beams()),
+            len(experiments.detectors()),
+            len(experiments.goniometers()),
+        )
+    assert models[2] == models[1]
@@ -173,6 +173,43 @@ def test_basic_threaded_integrate(dials_data, tmp_path):
     assert table.select(table["id"] == 0).size() == 3526
 
 
+def test_scan_varying_profile_model_nproc(dials_data, tmp_path):
+    """The scan-varying profile model is the same when calculated in parallel."""
+
+    expts = dials_data("centroid_test_data", pathlib=True) / "indexed.expt"
+    refls = dials_data("centroid_test_data", pathlib=True) / "indexed.refl"
+
+    profiles = []
+    for nproc in (1, 2):
+        # with nproc=2 the 9 images are split into blocks of one or two frames,
+        # so that blocks start and end part way through the scan
+        result = subprocess.run(
+            [
+                shutil.which("dials.integrate"),
+                "nproc=1",
+                expts,
+                refls,
+                "profile.fitting=False",
+                "profile.gaussian_rs.scan_varying=True",
+                f"profile.gaussian_rs.nproc={nproc}",
+                f"output.experiments=integrated_{nproc}.expt",
+                f"output.reflections=integrated_{nproc}.refl",
+            ],
+            cwd=tmp_path,
+            capture_output=True,
+        )
+        assert not result.returncode and not result.stderr
+        experiments = load.experiment_list(
+            tmp_path / f"integrated_{nproc}.expt", check_format=False
+        )
+        profiles.append(experiments[0].profile)
+
+    assert profiles[0].is_scan_varying()
+    assert len(profiles[0].sigma_b()) == 9
+    assert list(profiles[1].sigma_b()) == list(profiles[0].sigma_b())
+    assert list(profiles[1].sigma_m()) == list(profiles[0].sigma_m())
+
+
 def test_basic_integrate_output_integrated_only(dials_data, tmp_path):
     exp = load.experiment_list(
         dials_data("centroid_test_data", pathlib=True) / "experiments.json"
@@ -384,6 +384,33 @@ def test_dials_show_image_statistics(dials_regression: Path):
     )
 
 
+def test_dials_show_image_statistics_nproc(dials_data):
+    # Run on several images, in parallel and per panel
+    images = sorted(
+        str(f)
+        for f in dials_data("centroid_test_data", pathlib=True).glob("centroid_*.cbf")
+    )
+    outputs = []
+    for nproc in (1, 2):
+        result = subprocess.run(
+            [
+                shutil.which("dials.show"),
+                "image_statistics.show_raw=true",
+                "image_statistics.per_panel=true",
+                f"image_statistics.nproc={nproc}",
+                *images,
+            ],
+            env={"DIALS_NOBANNER": "1", **os.environ},
+            capture_output=True,
+        )
+        assert not result.returncode and not result.stderr
+        output = result.stdout.decode("latin-1").split("\n")
+        outputs.append([s for s in output if " panel 0: Min:" in s])
+    assert len(outputs[0]) == len(images)
+    assert outputs[0][0].startswith("centroid_0001.cbf panel 0: Min:")
+    assert outputs[1] == outputs[0]
+
+
 def test_dials_show_on_scaled_data(dials_data):
     """Test that dials.show works on scaled data."""
     location = dials_data("l_cysteine_4_sweeps_scaled", pathlib=True)
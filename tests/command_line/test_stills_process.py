@@ -257,3 +257,52 @@ def test_pseudo_scan(dials_data, tmp_path):
         tmp_path / "idx-0000_refined.expt", check_format=False
     )
     assert len(experiments) == 2
+
+
+def test_pseudo_scan_nproc(dials_data, tmp_path):
+    result = subprocess.run(
+        (
+            shutil.which("dials.stills_process"),
+            dials_data("centroid_test_data", pathlib=True) / "centroid_000[1-2].cbf",
+            "convert_sequences_to_stills=True",
+            "squash_errors=False",
+            "composite_output=True",
+            "mp.nproc=2",
+        ),
+        cwd=tmp_path,
+        capture_output=True,
+    )
+    assert not result.returncode and not result.stderr
+
+    # Each process writes its own composite output
+    n_experiments = 0
+    for expt in tmp_path.glob("idx-000[0-1]_refined.expt"):
+        n_experiments += len(
+            ExperimentListFactory.from_json_file(expt, check_format=False)
+        )
+    assert n_experiments == 2
+
+
+def test_pseudo_scan_composite_chunks(dials_data, tmp_path):
+    result = subprocess.run(
+        (
+            shutil.which("dials.stills_process"),
+            dials_data("centroid_test_data", pathlib=True) / "centroid_000[1-2].cbf",
+            "convert_sequences_to_stills=True",
+            "squash_errors=False",
+            "composite_output=True",
+            "composite_chunk.images=1",
+        ),
+        cwd=tmp_path,
+        capture_output=True,
+    )
+    assert not result.returncode and not result.stderr
+
+    for chunk in ("idx-0000_0000", "idx-0000_0001"):
+        experiments = ExperimentListFactory.from_json_file(
+            tmp_path / f"{chunk}_refined.expt", check_format=False
+        )
+        assert len(experiments) == 1
+    with open(tmp_path / "idx-0000_composite_index.txt") as f:
+        chunks = [line.split()[1] for line in f]
+    assert chunks == ["idx-0000_0000", "idx-0000_0001"]
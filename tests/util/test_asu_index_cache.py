@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import pytest
+
+from cctbx import crystal, miller, sgtbx
+
+from dials.util import asu_index_cache
+
+
+@pytest.fixture
+def miller_set():
+    cs = crystal.symmetry(unit_cell=(40, 40, 60, 90, 90, 90), space_group_symbol="P1")
+    return miller.build_set(cs, anomalous_flag=True, d_min=4.0)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    asu_index_cache.clear_cache()
+    yield
+    asu_index_cache.clear_cache()
+
+
+@pytest.mark.parametrize("anomalous", [False, True])
+@pytest.mark.parametrize("cb_op", [None, "-x,-y,-z", "y,x,-z", "-y,x,z"])
+def test_map_indices_to_asu(miller_set, anomalous, cb_op):
+    space_group = sgtbx.space_group_info("P 4 2 2").group()
+    cs = crystal.symmetry(miller_set.unit_cell(), space_group=space_group)
+    ms = miller_set.customized_copy(crystal_symmetry=cs, anomalous_flag=anomalous)
+    if cb_op is not None:
+        ms = ms.change_basis(sgtbx.change_of_basis_op(cb_op))
+    expected = ms.map_to_asu().indices()
+
+    for i in range(2):
+        indices = asu_index_cache.map_indices_to_asu(
+            miller_set.indices(), space_group, cb_op, anomalous=anomalous
+        )
+        assert list(indices) == list(expected)
+        info = asu_index_cache.cache_info()
+        assert (info.hits, info.misses) == (i, 1)
+
+    # The cached result must not be affected by modifying the returned array
+    indices.fill((0, 0, 0))
+    indices = asu_index_cache.map_indices_to_asu(
+        miller_set.indices(), space_group, cb_op, anomalous=anomalous
+    )
+    assert list(indices) == list(expected)
+
+
+def test_map_indices_to_asu_eviction(miller_set, monkeypatch):
+    indices = miller_set.indices()
+    monkeypatch.setattr(
+        asu_index_cache._cache, "max_bytes", int(1.5 * indices.size() * 12)
+    )
+    p1 = sgtbx.space_group()
+    p222 = sgtbx.space_group_info("P 2 2 2").group()
+    asu_index_cache.map_indices_to_asu(indices, p1)
+    asu_index_cache.map_indices_to_asu(indices, p222)
+    assert asu_index_cache.cache_info().currbytes == indices.size() * 12
+    # The P1 entry was evicted to make room for the P222 entry
+    asu_index_cache.map_indices_to_asu(indices, p222)
+    asu_index_cache.map_indices_to_asu(indices, p1)
+    info = asu_index_cache.cache_info()
+    assert (info.hits, info.misses) == (1, 3)
@@ -0,0 +1,160 @@
+"""
+Unit testing for the export_xds_ascii.py routines
+"""
+
+from __future__ import annotations
+
+import copy
+import random
+
+import numpy as np
+import pytest
+
+from cctbx.miller import map_to_asu
+from dxtbx.serialize import load
+from rstbx.cftbx.coordinate_frame_helpers import align_reference_frame
+from scitbx import matrix
+
+from dials.array_family import flex
+from dials.command_line.export import phil_scope
+from dials.util.export_xds_ascii import _calculate_psi, export_xds_ascii
+from dials.util.filter_reflections import (
+    FilteringReductionMethods,
+    filter_reflection_table,
+)
+
+
+def _reference_psi(hkl, phi, UB, axis, s0):
+    """The psi calculation for a single reflection, with scitbx.matrix"""
+    h, k, l = hkl
+    X = (UB * (h, k, l)).rotate(axis, phi, deg=True)
+    s = s0 + X
+    g = s.cross(s0).normalize()
+
+    # find component of beam perpendicular to f, e
+    e = -(s + s0).normalize()
+    if h == k and k == l:
+        u = (h, -h, 0)
+    else:
+        u = (k - l, l - h, h - k)
+    q = (
+        (matrix.col(u).transpose() * UB.inverse())
+        .normalize()
+        .transpose()
+        .rotate(axis, phi, deg=True)
+    )
+
+    psi = q.angle(g, deg=True)
+    if q.dot(e) < 0:
+        psi *= -1
+    return psi
+
+
+def _reference_records(integrated_data, experiment, params):
+    """The data records, as written by the per-reflection export loop"""
+    integrated_data = filter_reflection_table(
+        integrated_data,
+        intensity_choice=params.intensity,
+        partiality_threshold=params.mtz.partiality_threshold,
+        combine_partials=params.mtz.combine_partials,
+        min_isigi=params.mtz.min_isigi,
+        filter_ice_rings=params.mtz.filter_ice_rings,
+        d_min=params.mtz.d_min,
+    )
+    (
+        integrated_data,
+        scl,
+    ) = FilteringReductionMethods.calculate_lp_qe_correction_and_filter(integrated_data)
+
+    nref = len(integrated_data["miller_index"])
+    unique = copy.deepcopy(integrated_data["miller_index"])
+    map_to_asu(experiment.crystal.get_space_group().type(), False, unique)
+    perm = sorted(flex.size_t_range(nref), key=lambda k: unique[k])
+    integrated_data = integrated_data.select(flex.size_t(perm))
+
+    image_range = experiment.scan.get_image_range()
+    phi_start, phi_range = experiment.scan.get_image_oscillation(image_range[0])
+    panel = experiment.detector[0]
+    Rd = align_reference_frame(
+        panel.get_fast_axis(), (1, 0, 0), panel.get_slow_axis(), (0, 1, 0)
+    )
+    UB = Rd * matrix.sqr(experiment.crystal.get_A())
+    axis = Rd * experiment.goniometer.get_rotation_axis()
+    s0 = Rd * matrix.col(experiment.beam.get_s0())
+
+    I = integrated_data["intensity.sum.value"]
+    sigI = flex.sqrt(integrated_data["intensity.sum.variance"])
+    partiality = 100 * integrated_data["partiality"]
+    if "profile.correlation" in integrated_data:
+        prof_corr = 100.0 * integrated_data["profile.correlation"]
+    else:
+        prof_corr = flex.double(nref, 100.0)
+
+    records = []
+    for j in range(nref):
+        x, y, z = integrated_data["xyzcal.px"][j]
+        h, k, l = integrated_data["miller_index"][j]
+        psi = _reference_psi(
+            (h, k, l), phi_start + z * phi_range, UB, matrix.col(axis), s0
+        )
+        records.append(
+            "%d %d %d %f %f %f %f %f %f %.1f %.1f %f"
+            % (
+                h,
+                k,
+                l,
+                I[j],
+                sigI[j],
+                x,
+                y,
+                z,
+                scl[j],
+                partiality[j],
+                prof_corr[j],
+                psi,
+            )
+        )
+    return records
+
+
+def test_calculate_psi(dials_data):
+    data_dir = dials_data("x4wide_processed", pathlib=True)
+    experiment = load.experiment_list(
+        data_dir / "AUTOMATIC_DEFAULT_scaled.expt", check_format=False
+    )[0]
+    UB = matrix.sqr(experiment.crystal.get_A())
+    axis = matrix.col(experiment.goniometer.get_rotation_axis())
+    s0 = matrix.col(experiment.beam.get_s0())
+
+    random.seed(0)
+    hkl = [tuple(random.randint(-20, 20) for _ in range(3)) for _ in range(200)]
+    # include reflections with h == k == l
+    hkl += [(i, i, i) for i in (-3, 1, 4)]
+    phi = [random.uniform(-180, 360) for _ in hkl]
+
+    psi = _calculate_psi(np.array(hkl), np.array(phi), UB, axis, s0)
+    expected = [_reference_psi(i, p, UB, axis, s0) for i, p in zip(hkl, phi)]
+    assert list(psi) == pytest.approx(expected, rel=1e-12, abs=1e-12)
+
+
+def test_export_xds_ascii_records(dials_data, tmp_path):
+    data_dir = dials_data("x4wide_processed", pathlib=True)
+    experiments = load.experiment_list(
+        data_dir / "AUTOMATIC_DEFAULT_scaled.expt", check_format=False
+    )
+    reflections = flex.reflection_table.from_file(
+        data_dir / "AUTOMATIC_DEFAULT_scaled.refl"
+    )
+    params = phil_scope.extract()
+    params.intensity = ["sum"]
+    params.xds_ascii.hklout = str(tmp_path / "DIALS.HKL")
+
+    export_xds_ascii(reflections, experiments, params)
+
+    with open(tmp_path / "DIALS.HKL") as fh:
+        records = [line.rstrip("\n") for line in fh if not line.startswith("!")]
+    expected = _reference_records(
+        reflections.select(reflections["id"] >= 0), experiments[0], params
+    )
+    assert len(records) == len(expected)
+    assert records == expected
@@ -717,3 +717,20 @@ def test_sum_partial_reflections():
     # Add test to check calculation in case where both prf and sum - but this
     # requires knowing how the values will be weighted, so leave until that is
     # decided.
+
+
+def test_sum_partial_reflections_interleaved_groups():
+    """Partials of several reflections, interleaved and with different numbers
+    of components, are combined into the first component of each."""
+    r = flex.reflection_table()
+    r["intensity.sum.value"] = flex.double([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0])
+    r["intensity.sum.variance"] = flex.double([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0])
+    r["partial_id"] = flex.size_t([5, 3, 5, 8, 3, 5, 1])
+    r["partiality"] = flex.double([0.25, 0.5, 0.25, 0.5, 0.25, 0.25, 0.5])
+    r["identifier"] = flex.int([1, 2, 3, 4, 5, 6, 7])
+
+    r = sum_partial_reflections(r)
+    assert list(r["identifier"]) == [1, 2, 4, 7]
+    assert list(r["intensity.sum.value"]) == [10.0, 7.0, 4.0, 7.0]
+    assert list(r["intensity.sum.variance"]) == [10.0, 7.0, 4.0, 7.0]
+    assert list(r["partiality"]) == [0.75, 0.75, 0.5, 0.5]
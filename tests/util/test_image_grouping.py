@@ -26,6 +26,7 @@
     _determine_groupings,
     example_yaml,
     get_grouping_handler,
+    save_subset,
     simple_template_example,
 )
 
@@ -304,6 +305,20 @@ def test_real_h5_example(tmp_path, dials_data):
     indices2 = [expt.imageset.indices()[0] for expt in expts2]
     assert indices2 == expected_group2_file1
 
+    # Splitting each (file, group) pair separately gives the same result
+    (tmp_path / "per_group").mkdir()
+    fd_per_group = handler.split_files_to_groups(
+        tmp_path / "per_group", fps, function_to_apply=save_subset
+    )
+    for name in ["group_1", "group_2"]:
+        refls = flex.reflection_table.from_file(fd[name][0].refl)
+        refls_per_group = flex.reflection_table.from_file(fd_per_group[name][0].refl)
+        assert list(refls["id"]) == list(refls_per_group["id"])
+        assert dict(refls.experiment_identifiers()) == dict(
+            refls_per_group.experiment_identifiers()
+        )
+        assert list(refls["miller_index"]) == list(refls_per_group["miller_index"])
+
     # Check writing the group ids to the file. Don't overwrite dials_data files though
     fps_copy = [
         FilePair(
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import io
+
+import numpy as np
+import pytest
+
+from dials.util.ioutil import write_formatted_rows
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100000])
+def test_write_formatted_rows(chunk_size):
+    rng = np.random.default_rng(0)
+    n = 250000 if chunk_size == 100000 else 100
+    h, k, l = rng.integers(-50, 50, (3, n))
+    intensities = rng.normal(1000, 500, n)
+    sigmas = rng.uniform(0, 100, n)
+    fmt = "%4d %4d %4d %f %.1f\n"
+
+    handle = io.StringIO()
+    write_formatted_rows(handle, fmt, (h, k, l, intensities, sigmas), chunk_size)
+    expected = "".join(
+        fmt % row
+        for row in zip(
+            h.tolist(), k.tolist(), l.tolist(), intensities.tolist(), sigmas.tolist()
+        )
+    )
+    assert handle.getvalue() == expected
+
+    # sequences other than numpy arrays are also accepted
+    handle = io.StringIO()
+    write_formatted_rows(handle, "%d %s\n", ([1, 2], ("a", "b")), chunk_size)
+    assert handle.getvalue() == "1 a\n2 b\n"
+
+    handle = io.StringIO()
+    write_formatted_rows(handle, fmt, ([], [], [], [], []), chunk_size)
+    assert handle.getvalue() == ""
+
+
+def _write_rows_per_row(handle, row_format, columns):
+    """The per-row writer that write_formatted_rows replaced"""
+    for row in zip(*(column.tolist() for column in columns)):
+        handle.write(row_format % row)
+
+
+def test_write_formatted_rows_large_xds_ascii_table():
+    # a large synthetic table with the columns of an XDS_ASCII data record
+    rng = np.random.default_rng(1)
+    n = 500000
+    h, k, l = rng.integers(-60, 60, (3, n))
+    intensities = rng.normal(1000, 500, n)
+    sigmas = rng.uniform(0, 100, n)
+    x, y, z = rng.uniform(0, 2500, (3, n))
+    scales = rng.uniform(0.5, 2, n)
+    partiality = rng.uniform(0, 100, n)
+    correlation = rng.uniform(-100, 100, n)
+    psi = rng.uniform(-180, 180, n)
+    columns = (
+        h,
+        k,
+        l,
+        intensities,
+        sigmas,
+        x,
+        y,
+        z,
+        scales,
+        partiality,
+        correlation,
+        psi,
+    )
+    fmt = "%d %d %d %f %f %f %f %f %f %.1f %.1f %f\n"
+
+    handle = io.StringIO()
+    write_formatted_rows(handle, fmt, columns)
+    expected = io.StringIO()
+    _write_rows_per_row(expected, fmt, columns)
+    assert handle.getvalue() == expected.getvalue()
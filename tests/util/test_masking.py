@@ -9,6 +9,7 @@
 import pytest
 
 import libtbx
+from dxtbx.model import BeamFactory, Detector
 from dxtbx.model.experiment_list import ExperimentListFactory
 from dxtbx.serialize import load
 
@@ -103,7 +104,8 @@ def test_shadow_plot(dials_data, tmp_path):
     assert tmp_path.joinpath("shadow_2d.png").is_file()
 
 
-def test_filter_shadowed_reflections(dials_regression: Path):
+@pytest.mark.parametrize("nproc", [1, 2])
+def test_filter_shadowed_reflections(dials_regression: Path, nproc):
     experiments_json = os.path.join(
         dials_regression, "shadow_test_data", "DLS_I04_SmarGon", "experiments.json"
     )
@@ -116,7 +118,10 @@ def test_filter_shadowed_reflections(dials_regression: Path):
 
     for experiment_goniometer in (True, False):
         shadowed = filter_shadowed_reflections(
-            experiments, predicted, experiment_goniometer=experiment_goniometer
+            experiments,
+            predicted,
+            experiment_goniometer=experiment_goniometer,
+            nproc=nproc,
         )
         assert shadowed.count(True) == 17
         assert shadowed.count(False) == 674
@@ -187,6 +192,54 @@ def __hash__(self):
     assert fun.cache_info() == (1, 1, 1, 1)
 
 
+def test_lru_equality_cache_resize():
+    fun = dials.util.masking.lru_equality_cache(maxsize=2)(lambda i: i)
+    for i in range(3):
+        fun(i)
+    assert fun.cache_info() == (0, 3, 2, 2)
+    fun.cache_resize(4)
+    for i in range(4):
+        fun(i)
+    assert fun.cache_info() == (2, 5, 4, 4)
+    fun.cache_resize(1)
+    assert fun.cache_info() == (2, 5, 1, 1)
+    fun(3)
+    assert fun.cache_info() == (3, 5, 1, 1)
+
+
+def test_generate_mask_multi_panel_cache():
+    class MockImageSet:
+        def __init__(self, detector, beam):
+            self._detector = detector
+            self._beam = beam
+
+        def get_detector(self):
+            return self._detector
+
+        def get_beam(self):
+            return self._beam
+
+    beam = BeamFactory.simple(1.0)
+    detector = Detector()
+    for i in range(8):
+        panel = detector.add_panel()
+        panel.set_image_size((20, 10))
+        panel.set_pixel_size((0.1, 0.1))
+        panel.set_frame((1, 0, 0), (0, 1, 0), (-4 + i, -0.5, -100))
+    params = dials.util.masking.phil_scope.extract()
+    params.d_min = 2
+    params.d_max = 40
+    params.untrusted = []
+
+    masker = dials.util.masking._get_resolution_masker
+    dials.util.masking.generate_mask(MockImageSet(detector, beam), params)
+    hits, misses, _, _ = masker.cache_info()
+    # the maps for all the panels are reused by the next call
+    dials.util.masking.generate_mask(MockImageSet(detector, beam), params)
+    assert masker.cache_info().hits == hits + len(detector)
+    assert masker.cache_info().misses == misses
+
+
 def test_generate_mask(dials_data):
     imageset = load.imageset(
         dials_data("centroid_test_data", pathlib=True) / "sweep.json"
@@ -228,3 +281,21 @@ def test_generate_mask_parallax_correction(
     for m, im in zip(mask, imageset.get_raw_data(0)):
         assert m.all() == im.all()
     assert mask[0].count(False) == expected
+
+
+def test_apply_resolution_mask(dials_data):
+    imageset = load.imageset(
+        dials_data("centroid_test_data", pathlib=True) / "sweep.json"
+    )
+    beam = imageset.get_beam()
+    panel = imageset.get_detector()[0]
+    ranges = [(0, 1.5), (40, 1e9), (3.1, 3.2), (3.15, 3.4), (5.1, 5.2)]
+
+    expected = flex.bool(flex.grid(reversed(panel.get_image_size())), True)
+    masker = dials.util.masking.ResolutionMaskGenerator(beam, panel)
+    for d_min, d_max in ranges:
+        masker.apply(expected, d_min, d_max)
+
+    mask = flex.bool(flex.grid(reversed(panel.get_image_size())), True)
+    dials.util.masking._apply_resolution_mask(mask, beam, panel, ranges)
+    assert mask.all_eq(expected)
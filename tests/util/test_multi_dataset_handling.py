@@ -272,6 +272,23 @@ def test_parse_multiple_datasets():
     assert single_tables[3].experiment_identifiers()[3] == "5"
 
 
+def test_parse_multiple_datasets_with_unindexed_reflections():
+    rt = flex.reflection_table()
+    rt["id"] = flex.int([1, -1, 0, 1, -1, 0, 1])
+    rt["intensity"] = flex.double(range(7))
+    rt.experiment_identifiers()[0] = "a"
+    rt.experiment_identifiers()[1] = "b"
+    single_tables = parse_multiple_datasets([rt])
+    assert len(single_tables) == 2
+    assert list(single_tables[0]["intensity"]) == [2, 5]
+    assert list(single_tables[1]["intensity"]) == [0, 3, 6]
+    assert dict(single_tables[0].experiment_identifiers()) == {0: "a"}
+    assert dict(single_tables[1].experiment_identifiers()) == {1: "b"}
+    # The input table is left unchanged
+    assert len(rt) == 7
+    assert dict(rt.experiment_identifiers()) == {0: "a", 1: "b"}
+
+
 def test_sort_tables_to_experiments_order_multi_dataset_files():
     """Test reflection table sorting when a table contains multiple datasets."""
     # Reflection tables in the wrong order
@@ -142,3 +142,39 @@ def test_run(dials_regression: Path, run_in_tmp_path):
         uc2 = c2.get_unit_cell_at_scan_point(i)
         for p1, p2 in zip(uc1.parameters(), uc2.parameters()):
             assert abs(p1 - p2) < EPS
+
+
+def test_partial_read(tmp_path):
+    import h5py
+
+    from dials.array_family import flex
+    from dials.util.nexus import nx_reflections
+
+    n = 1000
+    table = flex.reflection_table()
+    table["miller_index"] = flex.miller_index(
+        [(i % 7 - 3, i % 11 - 5, i % 13 - 6) for i in range(n)]
+    )
+    table["id"] = flex.int(n, 0)
+    table["intensity.sum.value"] = flex.double(range(n))
+    table["xyzobs.px.value"] = flex.vec3_double(
+        flex.double(range(n)), flex.double(n, 1), flex.double(n, 2)
+    )
+
+    filename = str(tmp_path / "reflections.nxs")
+    with h5py.File(filename, "w") as handle:
+        entry = handle.create_group("entry")
+        nx_reflections.dump(entry, table, ["experiment"], chunk_size=100)
+        assert entry["reflections/int_sum"].chunks == (100,)
+        assert entry["reflections/int_sum"].compression == "gzip"
+
+    with h5py.File(filename, "r") as handle:
+        subset, _ = nx_reflections.load(
+            handle["entry"],
+            columns=["miller_index", "intensity.sum.value"],
+            rows=slice(250, 300),
+        )
+    assert sorted(subset.keys()) == ["intensity.sum.value", "miller_index"]
+    assert len(subset) == 50
+    assert subset["miller_index"].all_eq(table["miller_index"][250:300])
+    assert subset["intensity.sum.value"].all_eq(table["intensity.sum.value"][250:300])